@@ -0,0 +1,104 @@
+"""合成学生志愿数据：按固定种子生成，可写出为 csv/xlsx/xls
+
+分数与志愿分布参照 2023 年选课结果：分数近似正态（均值约 81.5，标准差约 6.9），
+志愿 A–F 的比例取自实际数据。列的顺序与 2023 年选课结果一致，
+导入时按表头读取 序号、学号、姓名、分数、志愿选择（见 src/core/validation.py）。
+"""
+import csv
+
+import numpy as np
+
+HEADERS = ['序号', '学号', '姓名', '班级', '分数', '是否选课', '志愿选择', '专业']
+CHOICES = np.array(['a', 'b', 'c', 'd', 'e', 'f'], dtype=object)
+# 2023 年实际选择比例
+CHOICE_WEIGHTS = np.array([131, 7, 9, 6, 105, 23], dtype=np.float64)
+SCORE_MEAN = 81.5
+SCORE_STD = 6.9
+CLASSES = np.array(['电信', '通信', '电磁'], dtype=object)
+
+_SURNAMES = list('王李张刘陈杨黄赵吴周徐孙马朱胡郭何高林罗郑梁谢宋唐许韩冯邓曹彭曾肖田董袁潘')
+_GIVEN = list('子涵浩宇一诺欣怡梓轩雨泽思远佳琪俊杰晨阳嘉怡雅婷博文明轩若曦天佑心怡')
+
+# xls 单张工作表最多 65536 行（含表头）
+XLS_MAX_ROWS = 65535
+CHUNK_SIZE = 100_000
+
+
+class Cohort:
+    """一届学生的合成数据，字符串列按块生成，1e7 人时也只常驻数值列"""
+    
+    def __init__(self, size, seed=0):
+        self.size = size
+        self.seed = seed
+        rng = np.random.default_rng(seed)
+        self.scores = np.clip(rng.normal(SCORE_MEAN, SCORE_STD, size), 40, 100).round(2)
+        # 序号即排名：分数从高到低
+        self.order = np.argsort(-self.scores, kind='stable')
+        self.choice_codes = rng.choice(len(CHOICES), size, p=CHOICE_WEIGHTS / CHOICE_WEIGHTS.sum()).astype(np.int8)
+    
+    def quotas(self, majors=('电子信息工程', '通信工程', '电磁场与无线技术'), shares=(0.4, 0.35, 0.2)):
+        """约 5% 的学生无专业可录"""
+        return {major: int(self.size * share) for major, share in zip(majors, shares)}
+    
+    def iter_rows(self, stop=None):
+        """按排名顺序逐行产出，字符串列每 CHUNK_SIZE 行生成一次"""
+        stop = self.size if stop is None else min(stop, self.size)
+        for start in range(0, stop, CHUNK_SIZE):
+            end = min(start + CHUNK_SIZE, stop)
+            rng = np.random.default_rng([self.seed, start])
+            index = self.order[start:end]
+            surnames = rng.integers(0, len(_SURNAMES), end - start)
+            given = rng.integers(0, len(_GIVEN), (end - start, 2))
+            given_length = rng.integers(1, 3, end - start)
+            classes = rng.integers(0, len(CLASSES), end - start)
+            class_numbers = rng.integers(1, 9, end - start)
+            for offset, student in enumerate(index.tolist()):
+                name = _SURNAMES[surnames[offset]] + ''.join(
+                    _GIVEN[code] for code in given[offset, :given_length[offset]]
+                )
+                yield [
+                    start + offset + 1,
+                    f"U{2023_0000000 + student}",
+                    name,
+                    f"{CLASSES[classes[offset]]}23{class_numbers[offset]:02d}",
+                    float(self.scores[student]),
+                    1,
+                    CHOICES[self.choice_codes[student]],
+                    ''
+                ]
+    
+    def write_csv(self, file_name):
+        with open(file_name, 'w', newline='', encoding='utf-8') as f:
+            writer = csv.writer(f)
+            writer.writerow(HEADERS)
+            writer.writerows(self.iter_rows())
+    
+    def write_xlsx(self, file_name):
+        from openpyxl import Workbook
+        
+        wb = Workbook(write_only=True)
+        ws = wb.create_sheet('Sheet1')
+        ws.append(HEADERS)
+        for row in self.iter_rows():
+            ws.append(row)
+        wb.save(file_name)
+    
+    def write_xls(self, file_name):
+        """超过 XLS_MAX_ROWS 行时抛出 ValueError"""
+        import xlwt
+        
+        if self.size > XLS_MAX_ROWS:
+            raise ValueError(f"xls 最多 {XLS_MAX_ROWS} 行，当前 {self.size} 行")
+        wb = xlwt.Workbook(encoding='utf-8')
+        ws = wb.add_sheet('Sheet1')
+        for column, header in enumerate(HEADERS):
+            ws.write(0, column, header)
+        for row_index, row in enumerate(self.iter_rows(), 1):
+            for column, value in enumerate(row):
+                ws.write(row_index, column, value)
+        wb.save(file_name)
+    
+    def write(self, file_name):
+        """按扩展名写出"""
+        extension = file_name.rsplit('.', 1)[-1]
+        getattr(self, f"write_{extension}")(file_name)
@@ -0,0 +1,209 @@
+"""性能基准：导入、录取、导出各环节计时，结果写入 JSON 以便不同版本之间比较
+
+用法示例：
+    python benchmarks/run_benchmarks.py --sizes 1000 10000 100000 -o bench.json
+    python benchmarks/run_benchmarks.py --sizes 1000 10000 --compare bench.json
+
+每个环节重复 --repeat 次取最短时间。xls 格式最多 65535 行，超过时跳过；
+xlsx 的生成和解析很慢，默认只测到 --xlsx-max 行。
+"""
+import argparse
+import json
+import os
+import platform
+import shutil
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+SRC_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'src')
+if SRC_DIR not in sys.path:
+    sys.path.insert(0, SRC_DIR)
+
+from admission_algorithm import AdmissionAlgorithm
+from core.allocation import allocate
+from core.exporter import write_results
+from core.importer import read_columnar_frame, read_students
+from core.store import StudentStore
+
+from cohort import Cohort, XLS_MAX_ROWS
+
+INPUT_FORMATS = ('csv', 'xlsx', 'xls')
+EXPORT_FORMATS = ('csv', 'xlsx', 'adm')
+
+
+def timed(func, repeat):
+    """重复 repeat 次，返回 (最短用时, 最后一次的返回值)"""
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+
+class BenchmarkRun:
+    def __init__(self, repeat, xlsx_max, loop_max, work_dir):
+        self.repeat = repeat
+        self.xlsx_max = xlsx_max
+        self.loop_max = loop_max
+        self.work_dir = work_dir
+        self.results = []
+    
+    def record(self, name, size, seconds=None, skipped=None, **extra):
+        entry = {'name': name, 'size': size}
+        if skipped is not None:
+            entry['skipped'] = skipped
+            print(f"{name:<28}{size:>10}  跳过：{skipped}")
+        else:
+            entry['seconds'] = seconds
+            entry['rows_per_second'] = size / seconds if seconds else None
+            print(f"{name:<28}{size:>10}  {seconds:10.4f} s  {entry['rows_per_second'] or 0:>14,.0f} 行/秒")
+        entry.update(extra)
+        self.results.append(entry)
+    
+    def skip_reason(self, extension, size):
+        if extension == 'xls' and size > XLS_MAX_ROWS:
+            return f"xls 最多 {XLS_MAX_ROWS} 行"
+        if extension == 'xlsx' and size > self.xlsx_max:
+            return f"超过 --xlsx-max {self.xlsx_max}"
+        return None
+    
+    def run_size(self, size, seed):
+        cohort = Cohort(size, seed)
+        quotas = cohort.quotas()
+        students = None
+        
+        for extension in INPUT_FORMATS:
+            name = f"import_{extension}"
+            reason = self.skip_reason(extension, size)
+            if reason:
+                self.record(name, size, skipped=reason)
+                continue
+            file_name = os.path.join(self.work_dir, f"cohort_{size}.{extension}")
+            generate_seconds, _ = timed(lambda: cohort.write(file_name), 1)
+            
+            def load():
+                store = StudentStore()
+                read_students(file_name, store)
+                return store
+            
+            seconds, loaded = timed(load, self.repeat)
+            self.record(name, size, seconds, file_bytes=os.path.getsize(file_name), generate_seconds=generate_seconds)
+            if students is None:
+                students = loaded
+            os.remove(file_name)
+        
+        # 图形界面与命令行使用的录取核心（按分数分轮次）
+        def gui_allocate():
+            return allocate(students.scores_array(), students.preference_matrix(), quotas)
+        
+        seconds, (admitted, adjusted, _) = timed(gui_allocate, self.repeat)
+        self.record('allocate', size, seconds)
+        students.set_results(admitted, adjusted)
+        
+        # AdmissionAlgorithm（按排名顺序录取），输入为列存文件映射出的 DataFrame
+        frame_file = os.path.join(self.work_dir, f"cohort_{size}.adm")
+        write_results(frame_file, students)
+        seconds, frame = timed(lambda: read_columnar_frame(frame_file), self.repeat)
+        self.record('load_adm_frame', size, seconds, file_bytes=os.path.getsize(frame_file))
+        seconds, vectorized = timed(
+            lambda: AdmissionAlgorithm(quotas).process_admissions(frame), self.repeat
+        )
+        self.record('process_admissions', size, seconds)
+        if size <= self.loop_max:
+            seconds, loop = timed(
+                lambda: AdmissionAlgorithm(quotas).process_admissions(frame, engine='loop'), 1
+            )
+            matches = bool((loop['录取专业'].to_numpy() == vectorized['录取专业'].to_numpy()).all())
+            self.record('process_admissions_loop', size, seconds, matches_vectorized=matches)
+            if not matches:
+                print("警告：loop 与 vectorized 结果不一致", file=sys.stderr)
+        else:
+            self.record('process_admissions_loop', size, skipped=f"超过 --loop-max {self.loop_max}")
+        del frame
+        os.remove(frame_file)
+        
+        for extension in EXPORT_FORMATS:
+            name = f"export_{extension}"
+            reason = self.skip_reason(extension, size)
+            if reason:
+                self.record(name, size, skipped=reason)
+                continue
+            file_name = os.path.join(self.work_dir, f"result_{size}.{extension}")
+            seconds, _ = timed(lambda: write_results(file_name, students), self.repeat)
+            self.record(name, size, seconds, file_bytes=os.path.getsize(file_name))
+            os.remove(file_name)
+
+
+def environment():
+    return {
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'pandas': pd.__version__,
+        'platform': platform.platform(),
+        'processor': platform.processor(),
+        'cpu_count': os.cpu_count(),
+        'time': time.strftime('%Y-%m-%d %H:%M:%S')
+    }
+
+
+def compare(results, previous_file):
+    """与之前的结果逐项比较，ratio > 1 表示变慢"""
+    with open(previous_file, encoding='utf-8') as f:
+        previous = {
+            (entry['name'], entry['size']): entry['seconds']
+            for entry in json.load(f)['results'] if 'seconds' in entry
+        }
+    print(f"\n与 {previous_file} 比较（本次/上次）：")
+    for entry in results:
+        before = previous.get((entry['name'], entry['size']))
+        if before and 'seconds' in entry:
+            entry['previous_seconds'] = before
+            entry['ratio'] = entry['seconds'] / before
+            flag = '  变慢' if entry['ratio'] > 1.1 else ''
+            print(f"{entry['name']:<28}{entry['size']:>10}  {entry['ratio']:6.2f}x{flag}")
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="录取工具性能基准")
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 10000, 100000], help="学生人数，可指定多个（1e3–1e7）")
+    parser.add_argument('--seed', type=int, default=0, help="随机种子")
+    parser.add_argument('--repeat', type=int, default=3, help="每个环节重复次数，取最短用时")
+    parser.add_argument('--xlsx-max', type=int, default=100000, help="xlsx 导入导出只测到此人数")
+    parser.add_argument('--loop-max', type=int, default=10000, help="逐行录取（loop）只测到此人数，并与向量化结果核对")
+    parser.add_argument('-o', '--output', default='benchmark_results.json', help="结果输出文件（JSON）")
+    parser.add_argument('--compare', help="之前的结果文件，输出逐项比值")
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    work_dir = tempfile.mkdtemp(prefix='admission_bench_')
+    run = BenchmarkRun(args.repeat, args.xlsx_max, args.loop_max, work_dir)
+    try:
+        for size in args.sizes:
+            run.run_size(size, args.seed)
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+    
+    if args.compare:
+        compare(run.results, args.compare)
+    
+    report = {
+        'environment': environment(),
+        'parameters': {'seed': args.seed, 'repeat': args.repeat, 'sizes': args.sizes},
+        'results': run.results
+    }
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    print(f"\n结果已写入 {args.output}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,7 +1,6 @@
 # -*- mode: python ; coding: utf-8 -*-
 import os
 import sys
-from PyInstaller.utils.hooks import collect_data_files
 
 block_cipher = None
 
@@ -16,19 +15,13 @@ a = Analysis(
         os.path.join(current_dir, 'src/gui'),
     ],
     binaries=[],
+    # 只打包预先缩放的LOGO，单文件版每次启动都要解压全部数据
     datas=[
-        ('resources/logo.png', 'resources'),
+        ('resources/logo_250.png', 'resources'),
         ('resources/logo.ico', 'resources')
     ],
+    # 表格库在首次读写文件时才导入；界面直接用 Tk 读取 PNG，不再需要 PIL 的 Tk 支持
     hiddenimports=[
-        'PIL._tkinter_finder',
-        'PIL._imaging',
-        'PIL._imagingft',
-        'PIL._imagingmath',
-        'PIL._imagingtk',
-        'PIL._webp',
-        'PIL.Image',
-        'PIL.ImageTk',
         'openpyxl',
         'openpyxl.cell',
         'openpyxl.workbook',
@@ -43,16 +36,13 @@ a = Analysis(
     hookspath=[],
     hooksconfig={},
     runtime_hooks=[],
-    excludes=[],
+    excludes=['matplotlib', 'scipy', 'IPython', 'pytest', 'tkinter.test'],
     win_no_prefer_redirects=False,
     win_private_assemblies=False,
     cipher=block_cipher,
     noarchive=False,
 )
 
-# 添加所有数据文件
-a.datas += collect_data_files('PIL')
-
 pyz = PYZ(a.pure, a.zipped_data, cipher=block_cipher)
 
 exe = EXE(
@@ -66,7 +56,8 @@ exe = EXE(
     debug=False,
     bootloader_ignore_signals=False,
     strip=False,
-    upx=True,
+    # UPX 压缩的DLL每次加载都要解压，关闭以加快启动
+    upx=False,
     upx_exclude=[],
     runtime_tmpdir=None,
     console=True,  # 临时设置为True以查看错误信息
@@ -6,19 +6,20 @@ a = Analysis(
     ['src/gui/simple_main.py'],
     pathex=[],
     binaries=[],
+    # 只打包预先缩放的LOGO，单文件版每次启动都要解压全部数据
     datas=[
-        ('resources/logo.png', 'resources'),
+        ('resources/logo_250.png', 'resources'),
         ('resources/logo.ico', 'resources'),
     ],
+    # 表格库在首次读写文件时才导入，静态分析看不到时由此补充
     hiddenimports=[
-        'PIL',
         'openpyxl',
         'xlrd',
     ],
     hookspath=[],
     hooksconfig={},
     runtime_hooks=[],
-    excludes=[],
+    excludes=['matplotlib', 'scipy', 'IPython', 'pytest', 'tkinter.test'],
     win_no_prefer_redirects=False,
     win_private_assemblies=False,
     cipher=block_cipher,
@@ -38,7 +39,8 @@ exe = EXE(
     debug=False,
     bootloader_ignore_signals=False,
     strip=False,
-    upx=True,
+    # UPX 压缩的DLL每次加载都要解压，关闭以加快启动
+    upx=False,
     upx_exclude=[],
     runtime_tmpdir=None,
     console=False,
@@ -1,31 +1,93 @@
+from itertools import chain
+
+import numpy as np
+import pandas as pd
+
+from core.instrumentation import span
+from core.preferences import (
+    PREFERENCE_MAPPING, NO_MAJOR, parse_preferences, encode_preference_lists
+)
+from core.ranking import RankingIndex
+
+
 class AdmissionAlgorithm:
-    MAJOR_MAPPING = {
-        'A': ['电子信息工程', '通信工程', '电磁场与无线技术'],
-        'B': ['电子信息工程', '电磁场与无线技术', '通信工程'],
-        'C': ['电磁场与无线技术', '电子信息工程', '通信工程'],
-        'D': ['电磁场与无线技术', '通信工程', '电子信息工程'],
-        'E': ['通信工程', '电子信息工程', '电磁场与无线技术'],
-        'F': ['通信工程', '电磁场与无线技术', '电子信息工程']
-    }
-    
-    def __init__(self, quotas):
+    MAJOR_MAPPING = PREFERENCE_MAPPING
+    # Optional column with a per-student preference list (a list of majors or a
+    # delimited string); when present it takes precedence over 志愿选择 codes
+    PREFERENCE_LIST_COLUMN = '志愿列表'
+    UNASSIGNED = '未分配'
+    ENGINES = ('vectorized', 'loop')
+    # Columns compared when 排名 ties, before 学号; a leading '-' sorts descending.
+    # Distinct from core.ranking.SCORE_TIEBREAKS, which breaks ties on 分数 instead.
+    RANK_TIEBREAKS = ('-分数',)
+    
+    def __init__(self, quotas, preference_mapping=None, tiebreaks=None):
         self.quotas = quotas.copy()
         self.remaining_quotas = quotas.copy()
+        self.preference_mapping = preference_mapping or self.MAJOR_MAPPING
+        self.tiebreaks = tiebreaks
+    
+    def ranking_index(self, student_data):
+        """
+        Build the rank order of a cohort once, for reuse across runs.
+        
+        Students are ordered by 排名, then by ``tiebreaks`` (by default 分数
+        descending when that column exists), then by 学号, so tied ranks no
+        longer depend on input order.
+        
+        Returns:
+            RankingIndex: ``order`` holds row positions in rank order.
+        """
+        tiebreaks = self.tiebreak_columns(student_data.columns)
+        columns = {name: student_data[name].to_numpy() for name in student_data.columns}
+        return RankingIndex.build(
+            (student_data['排名'].to_numpy(), False), columns, student_data['学号'].to_numpy(), tiebreaks
+        )
+    
+    def tiebreak_columns(self, columns):
+        """Return the tie-break names used for a cohort with the given columns."""
+        if self.tiebreaks is not None:
+            return list(self.tiebreaks)
+        return [name for name in self.RANK_TIEBREAKS if name.lstrip('-') in columns]
     
-    def process_admissions(self, student_data):
+    def sort_students(self, student_data, ranking=None):
+        """Return ``student_data`` in rank order, building the index unless given."""
+        if ranking is None:
+            ranking = self.ranking_index(student_data)
+        return student_data.iloc[ranking.order]
+    
+    def process_admissions(self, student_data, engine='vectorized', ranking=None):
         """
         Process student admissions based on their rankings and preferences.
         
+        Any number of majors is supported: the majors are the keys of ``quotas``
+        plus whatever the preference code table and preference lists mention.
+        
         Args:
             student_data (pd.DataFrame): DataFrame containing student information
-                with columns: ['学号', '排名', '志愿选择']
+                with columns: ['学号', '排名', '志愿选择'], or '志愿列表' instead
+                of '志愿选择' for per-student preference lists of any length
+            engine (str): 'vectorized' allocates on an integer preference matrix,
+                'loop' is the original row-by-row implementation. Both return
+                the same DataFrame.
+            ranking (RankingIndex): Order from ``ranking_index(student_data)``;
+                pass it when running the same cohort repeatedly to skip sorting.
         
         Returns:
             pd.DataFrame: DataFrame with admission results
         """
+        if engine not in self.ENGINES:
+            raise ValueError(f"Unknown engine {engine!r}, expected one of {self.ENGINES}")
+        
         # Sort students by ranking
-        sorted_students = student_data.sort_values('排名')
+        with span('sort', rows=len(student_data), reused=ranking is not None):
+            sorted_students = self.sort_students(student_data, ranking)
         
+        if engine == 'loop':
+            return self._process_loop(sorted_students)
+        return self._process_vectorized(sorted_students)
+    
+    def _process_loop(self, sorted_students):
         # Initialize results
         results = sorted_students.copy()
         results['录取专业'] = ''
@@ -33,7 +95,7 @@ class AdmissionAlgorithm:
         # Process each student in order of ranking
         for _, student in sorted_students.iterrows():
             assigned = False
-            preferences = self.MAJOR_MAPPING[student['志愿选择']]
+            preferences = self._student_preferences(student)
             
             # Try to assign student to their preferred major
             for major in preferences:
@@ -45,14 +107,150 @@ class AdmissionAlgorithm:
             
             # If no major is available, mark as unassigned
             if not assigned:
-                results.loc[student.name, '录取专业'] = '未分配'
+                results.loc[student.name, '录取专业'] = self.UNASSIGNED
         
         return results
     
+    def _student_preferences(self, student):
+        if self.PREFERENCE_LIST_COLUMN not in student.index:
+            return self.preference_mapping[student['志愿选择']]
+        value = student[self.PREFERENCE_LIST_COLUMN]
+        preferences = parse_preferences(value, self.preference_mapping, self.quotas)
+        if preferences is None:
+            raise KeyError(value)
+        return preferences
+    
+    def _process_vectorized(self, sorted_students):
+        with span('encode', rows=len(sorted_students)):
+            majors, prefs = self.encode_sorted(sorted_students)
+        remaining = np.array([self.remaining_quotas[major] for major in majors], dtype=np.int64)
+        
+        with span('allocate', rows=len(prefs), majors=len(majors)):
+            admitted = allocate_serial(prefs, remaining)
+        
+        for i, major in enumerate(majors):
+            self.remaining_quotas[major] = int(remaining[i])
+        
+        # Index -1 (unassigned) picks the trailing label
+        labels = np.array(majors + [self.UNASSIGNED], dtype=object)
+        results = sorted_students.copy()
+        # Assign plain str values so the column dtype matches the loop engine
+        results['录取专业'] = labels[admitted].tolist() if len(admitted) else ''
+        return results
+    
+    def encode_sorted(self, sorted_students, skip_invalid=False):
+        """
+        Integer-encode the preferences of students already sorted by ranking.
+        
+        Distinct preference codes or lists are parsed once and expanded into a
+        compact matrix, so the cost does not depend on how often they repeat.
+        
+        Args:
+            sorted_students (pd.DataFrame): Students in rank order.
+            skip_invalid (bool): Encode blank or unknown preferences as rows of
+                NO_MAJOR (never admitted) instead of raising KeyError.
+        
+        Returns:
+            tuple: (majors, prefs) where ``prefs`` is an int16 matrix with one
+            row per student holding indices into ``majors``, padded with
+            NO_MAJOR.
+        """
+        if self.PREFERENCE_LIST_COLUMN in sorted_students:
+            values = sorted_students[self.PREFERENCE_LIST_COLUMN]
+            try:
+                codes, uniques = pd.factorize(values)
+            except TypeError:
+                # Lists are unhashable; tuples factorize the same way
+                keys = values.map(lambda value: tuple(value) if isinstance(value, list) else value)
+                codes, uniques = pd.factorize(keys)
+            lists = [parse_preferences(value, self.preference_mapping, self.quotas) for value in uniques.tolist()]
+        else:
+            values = sorted_students['志愿选择']
+            categories = list(self.preference_mapping)
+            # Unknown codes map to -1
+            codes = pd.Index(categories).get_indexer(values).astype(np.int64)
+            lists = [self.preference_mapping[code] for code in categories]
+        
+        unparsed = [code for code, preferences in enumerate(lists) if preferences is None]
+        invalid = np.flatnonzero((codes < 0) | np.isin(codes, unparsed))
+        if len(invalid) and not skip_invalid:
+            # Match the loop engine, which fails on the first unknown preference
+            raise KeyError(values.iloc[invalid[0]])
+        
+        majors = list(dict.fromkeys(chain(self.quotas, chain.from_iterable(filter(None, lists)))))
+        table = encode_preference_lists([preferences or [] for preferences in lists], majors)
+        prefs = table[np.maximum(codes, 0)]
+        prefs[invalid] = NO_MAJOR
+        return majors, prefs
+    
     def get_remaining_quotas(self):
         """Return the remaining quotas for each major."""
         return self.remaining_quotas.copy()
     
     def reset_quotas(self):
         """Reset the remaining quotas to their original values."""
-        self.remaining_quotas = self.quotas.copy() 
\ No newline at end of file
+        self.remaining_quotas = self.quotas.copy()
+
+
+def allocate_serial(prefs, remaining, block_size=16384):
+    """
+    Serial allocation in rank order over a per-student preference matrix.
+    
+    Students are processed in blocks. Within a block every student keeps a
+    next-open-major pointer into their preference row that only moves forward
+    past closed majors, and the whole block takes its pointed-to majors at once
+    until the first student who would overflow a major. Each major closes once,
+    so the run costs O(students x preference length) plus O(majors x block).
+    
+    Args:
+        prefs (np.ndarray): ``(n_students, n_prefs)`` major indices in rank
+            order, padded with NO_MAJOR.
+        remaining (np.ndarray): Seats left per major, updated in place.
+        block_size (int): Students evaluated per vectorized step.
+    
+    Returns:
+        np.ndarray: Admitted major index per student, -1 when unassigned.
+    """
+    n, width = prefs.shape
+    admitted = np.full(n, -1, dtype=np.int64)
+    # Trailing False makes NO_MAJOR (-1) look like a closed major
+    is_open = np.append(remaining > 0, False)
+    
+    for block_start in range(0, n, block_size):
+        if not is_open.any():
+            break
+        block = prefs[block_start:block_start + block_size]
+        rows = np.arange(len(block))
+        pointer = np.zeros(len(block), dtype=np.int64)
+        done = 0
+        
+        while done < len(block):
+            # Advance pending students past closed majors
+            pending_rows = rows[done:]
+            pending_pointer = pointer[done:]
+            while True:
+                in_range = pending_pointer < width
+                current = np.where(
+                    in_range,
+                    block[pending_rows, np.minimum(pending_pointer, width - 1)],
+                    NO_MAJOR
+                )
+                stuck = in_range & ~is_open[current]
+                if not stuck.any():
+                    break
+                pending_pointer[stuck] += 1
+            targets = current.astype(np.int64)
+            
+            # Take everyone up to the first student who would overflow a major
+            stop = len(targets)
+            counts = np.bincount(targets[targets >= 0], minlength=len(remaining))
+            for major in np.flatnonzero(counts > remaining):
+                stop = min(stop, np.flatnonzero(targets == major)[remaining[major]])
+            
+            accepted = targets[:stop]
+            admitted[block_start + done:block_start + done + stop] = accepted
+            remaining -= np.bincount(accepted[accepted >= 0], minlength=len(remaining))
+            is_open[:-1] = remaining > 0
+            done += stop
+    
+    return admitted
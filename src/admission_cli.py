@@ -0,0 +1,338 @@
+"""命令行批处理入口：无需图形界面即可完成导入、录取、导出与统计
+
+用法示例：
+    python src/admission_cli.py data/input/test_sample.csv -o result.csv \
+        -q 电子信息工程=5 -q 通信工程=5 -q 电磁场与无线技术=4
+
+输入为目录或通配符（如 "data/2024/*.xlsx"）时进入批量模式：每个文件在进程池中
+独立录取，-o 为输出目录，每个文件写出录取结果与统计信息，另写一份汇总表。
+单个文件出错只记入汇总表，不影响其它文件。
+    python src/admission_cli.py data/2024 -o out/ -q 电子信息工程=50 -q 通信工程=40 -j 4
+
+对比两次导出的录取结果（按学号），列出录取专业有变化的学生和各专业人数变化：
+    python src/admission_cli.py diff 旧结果.xlsx 新结果.xlsx -o 变化名单.xlsx
+"""
+import argparse
+import csv
+import glob
+import logging
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from itertools import chain
+
+from core.allocation import AdmissionCounters, allocate, format_summary
+from core.cache import CohortCache
+from core.instrumentation import RECORDER, setup_logging
+from core.exporter import write_results
+from core.importer import read_students
+from core.preferences import MAJORS, parse_preferences
+from core.ranking import SCORE_TIEBREAKS
+from core.run_diff import ResultSet, diff_runs, format_diff, write_diff
+from core.store import StudentStore
+
+
+def parse_quota(text):
+    """解析 专业=名额 形式的参数"""
+    major, sep, value = text.partition('=')
+    if not sep or not major:
+        raise argparse.ArgumentTypeError(f"名额格式应为 专业=人数：{text}")
+    try:
+        quota = int(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"名额必须是整数：{text}")
+    if quota < 0:
+        raise argparse.ArgumentTypeError(f"名额不能为负数：{text}")
+    return major.strip(), quota
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="本科生专业方向录取（命令行批处理）")
+    parser.add_argument('input', help="学生志愿文件（.csv/.xlsx/.xls），或批量模式下的目录、通配符")
+    parser.add_argument('-o', '--output', required=True, help="录取结果输出文件（.csv/.xlsx/.adm），批量模式下为输出目录")
+    parser.add_argument(
+        '-q', '--quota', action='append', type=parse_quota, default=[], metavar='专业=人数',
+        help="专业录取名额，可重复指定；专业数量不限，未指定的专业视为没有名额"
+    )
+    parser.add_argument('-s', '--summary', help="统计信息输出文件（默认仅打印到终端）；批量模式下为汇总表（默认输出目录下的 汇总.csv）")
+    parser.add_argument('--report', metavar='文件', help="数据校验报告输出文件（.csv，列出每个有问题的行；默认只写入日志）")
+    parser.add_argument('--no-cache', action='store_true', help="不使用已解析输入的缓存，总是重新解析")
+    parser.add_argument('--log-dir', help="日志目录，写入 app.log 与各阶段耗时记录 timings.jsonl")
+    parser.add_argument(
+        '--tiebreak', action='append', metavar='列名',
+        help="分数相同时依次比较的列（序号/姓名/志愿选择），列名前加 - 表示降序，可重复指定；"
+             "最后总是比较学号（默认：序号）"
+    )
+    batch = parser.add_argument_group("批量模式")
+    batch.add_argument('-j', '--processes', type=int, default=None, help="进程数（默认CPU核数）")
+    batch.add_argument(
+        '--result-format', choices=('xlsx', 'csv', 'adm'), default='xlsx',
+        help="每个文件录取结果的格式（默认 xlsx）"
+    )
+    batch.add_argument('--recursive', action='store_true', help="输入为目录时包含子目录")
+    return parser
+
+
+def build_diff_parser():
+    parser = argparse.ArgumentParser(
+        prog='admission_cli.py diff', description="按学号对比两次导出的录取结果"
+    )
+    parser.add_argument('old', help="之前导出的录取结果（.xlsx/.csv/.adm）")
+    parser.add_argument('new', help="新导出的录取结果（.xlsx/.csv/.adm）")
+    parser.add_argument('-o', '--output', help="变化名单输出文件（.xlsx/.csv，默认仅打印统计）")
+    return parser
+
+
+class UnknownMajorError(ValueError):
+    """名额中的专业既不是默认专业，也没有出现在任何学生的志愿中（多为专业名称写错）"""
+
+
+def cohort_majors(students):
+    """一届学生可录取的专业：默认专业，加上志愿中直接填写的其它专业（按出现顺序）"""
+    lists = (
+        parse_preferences(label, students.preference_mapping, students.majors) or []
+        for label in students.choice_labels
+    )
+    return list(dict.fromkeys(chain(students.majors, chain.from_iterable(lists))))
+
+
+def cohort_quotas(students, quotas):
+    """按该届学生的专业补全名额（未指定的专业为 0），名额中有未知专业时抛出 UnknownMajorError"""
+    majors = cohort_majors(students)
+    unknown = [major for major in quotas if major not in majors]
+    if unknown:
+        raise UnknownMajorError(f"未知专业: {'、'.join(unknown)}（可用专业：{'、'.join(majors)}）")
+    return {major: quotas.get(major, 0) for major in majors}
+
+
+def run(input_file, output_file, quotas, summary_file=None, cache=None, tiebreaks=SCORE_TIEBREAKS,
+        report_file=None):
+    """执行一次完整的录取流程，返回统计信息；report_file 给定时写出数据校验报告
+    
+    quotas 中未列出的专业名额为 0；有该届学生中不存在的专业时抛出 UnknownMajorError。
+    """
+    students = StudentStore()
+    report = read_students(input_file, students, cache)
+    if report:
+        logging.warning(f"{input_file} 校验发现问题：\n{report.format()}")
+    if report_file:
+        report.write(report_file)
+        logging.info(f"校验报告已写入: {report_file}")
+    if len(students) == 0:
+        raise ValueError("没有读取到学生数据，请检查文件格式")
+    logging.info(f"已读取 {len(students)} 条学生数据: {input_file}")
+    
+    quotas = cohort_quotas(students, quotas)
+    students.majors = list(quotas)
+    counters = AdmissionCounters(quotas)
+    admitted, adjusted, remaining_quotas = allocate(
+        students.scores_array(), students.preference_matrix(), quotas,
+        order=students.ranking_index(tiebreaks).order, counters=counters
+    )
+    students.set_results(admitted, adjusted)
+    
+    write_results(output_file, students)
+    logging.info(f"录取结果已写入: {output_file}")
+    
+    stats = counters.summary()
+    if summary_file:
+        with open(summary_file, 'w', encoding='utf-8') as f:
+            f.write(format_summary(stats))
+    return stats
+
+
+INPUT_EXTENSIONS = ('.csv', '.xlsx', '.xls', '.adm')
+BATCH_SUMMARY_FILE = '汇总.csv'
+
+
+def is_batch_input(path):
+    """目录或带通配符的路径按批量模式处理"""
+    return os.path.isdir(path) or any(char in path for char in '*?[')
+
+
+def find_input_files(path, recursive=False):
+    """目录下（或通配符匹配）的全部学生志愿文件，按路径排序"""
+    if os.path.isdir(path):
+        pattern = os.path.join(path, '**', '*') if recursive else os.path.join(path, '*')
+    else:
+        pattern = path
+    return sorted(
+        name for name in glob.glob(pattern, recursive=recursive)
+        if os.path.isfile(name) and name.lower().endswith(INPUT_EXTENSIONS)
+        # 跳过 Excel 打开文件时生成的临时文件
+        and not os.path.basename(name).startswith('~$')
+    )
+
+
+def batch_outputs(input_files, output_dir, result_format):
+    """每个输入文件的 (录取结果文件, 统计信息文件)，同名文件加序号区分"""
+    outputs = []
+    used = set()
+    for input_file in input_files:
+        stem = os.path.splitext(os.path.basename(input_file))[0]
+        name, index = stem, 1
+        while name in used:
+            index += 1
+            name = f"{stem}_{index}"
+        used.add(name)
+        outputs.append((
+            os.path.join(output_dir, f"{name}_录取结果.{result_format}"),
+            os.path.join(output_dir, f"{name}_统计.txt")
+        ))
+    return outputs
+
+
+def _run_batch_job(job):
+    """进程池中处理一个文件，出错时返回错误信息而不是抛出"""
+    input_file, output_file, summary_file, quotas, cache_dir, tiebreaks = job
+    try:
+        cache = CohortCache(cache_dir) if cache_dir else None
+        return input_file, run(input_file, output_file, quotas, summary_file, cache, tiebreaks), None
+    except Exception as e:
+        return input_file, None, f"{type(e).__name__}: {str(e)}"
+
+
+def run_batch(input_files, output_dir, quotas, processes=None, result_format='xlsx', cache_dir=None,
+              tiebreaks=SCORE_TIEBREAKS):
+    """并行处理多个文件，返回 [(输入文件, 统计信息或 None, 错误信息或 None)]，顺序与 input_files 一致"""
+    os.makedirs(output_dir, exist_ok=True)
+    jobs = [
+        (input_file, output_file, summary_file, quotas, cache_dir, tiebreaks)
+        for input_file, (output_file, summary_file)
+        in zip(input_files, batch_outputs(input_files, output_dir, result_format))
+    ]
+    if processes is None:
+        processes = os.cpu_count() or 1
+    
+    if processes == 1 or len(jobs) < 2:
+        results = [_run_batch_job(job) for job in jobs]
+    else:
+        with ProcessPoolExecutor(max_workers=min(processes, len(jobs))) as pool:
+            results = list(pool.map(_run_batch_job, jobs))
+    
+    for input_file, stats, error in results:
+        if error:
+            logging.error(f"处理失败: {input_file}: {error}")
+        else:
+            logging.info(f"处理完成: {input_file}，录取 {stats['admitted']}/{stats['total']} 人")
+    return results
+
+
+def write_batch_summary(file_name, results, majors):
+    """汇总表：每个文件一行，最后一行为合计"""
+    headers = ['文件', '状态', '总人数', '已录取', '未录取']
+    for major in majors:
+        headers += [f'{major}录取', f'{major}调剂', f'{major}剩余名额']
+    headers.append('错误信息')
+    
+    totals = [0] * (len(headers) - 3)
+    rows = []
+    for input_file, stats, error in results:
+        if error:
+            rows.append([input_file, '失败'] + [''] * (len(headers) - 3) + [error])
+            continue
+        values = [stats['total'], stats['admitted'], stats['unassigned']]
+        for major in majors:
+            major_stats = stats['majors'].get(major)
+            if major_stats is None:
+                values += [0, 0, 0]
+            else:
+                values += [major_stats['total'], major_stats['adjust'], major_stats['remaining']]
+        totals = [total + value for total, value in zip(totals, values)]
+        rows.append([input_file, '成功'] + values + [''])
+    
+    failed = sum(1 for _, _, error in results if error)
+    rows.append(['合计', f'成功 {len(results) - failed}，失败 {failed}'] + totals + [''])
+    
+    with open(file_name, 'w', newline='', encoding='utf-8-sig') as f:
+        writer = csv.writer(f)
+        writer.writerow(headers)
+        writer.writerows(rows)
+
+
+def tiebreaks(args):
+    return SCORE_TIEBREAKS if args.tiebreak is None else tuple(args.tiebreak)
+
+
+def main_batch(args, quotas):
+    input_files = find_input_files(args.input, args.recursive)
+    if not input_files:
+        logging.error(f"没有找到学生志愿文件: {args.input}")
+        return 2
+    logging.info(f"批量处理 {len(input_files)} 个文件")
+    
+    cache_dir = None if args.no_cache else CohortCache().directory
+    results = run_batch(
+        input_files, args.output, quotas, args.processes, args.result_format, cache_dir, tiebreaks(args)
+    )
+    
+    # 各文件的专业可能不同（志愿中直接填写的专业），汇总表列出全部出现过的专业
+    majors = list(dict.fromkeys(chain(
+        quotas, chain.from_iterable(stats['majors'] for _, stats, _ in results if stats)
+    )))
+    summary_file = args.summary or os.path.join(args.output, BATCH_SUMMARY_FILE)
+    write_batch_summary(summary_file, results, majors)
+    logging.info(f"汇总表已写入: {summary_file}")
+    
+    failed = sum(1 for _, _, error in results if error)
+    print(f"共 {len(results)} 个文件，成功 {len(results) - failed} 个，失败 {failed} 个")
+    if any(error and error.startswith(UnknownMajorError.__name__) for _, _, error in results):
+        return 2
+    return 1 if failed else 0
+
+
+def main_diff(argv):
+    args = build_diff_parser().parse_args(argv)
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    try:
+        diff = diff_runs(ResultSet.read(args.old), ResultSet.read(args.new), MAJORS)
+        if args.output:
+            write_diff(args.output, diff)
+            logging.info(f"变化名单已写入: {args.output}")
+    except Exception as e:
+        logging.error(f"对比录取结果时发生错误: {str(e)}")
+        return 1
+    
+    print(format_diff(diff))
+    return 0
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else list(argv)
+    if argv[:1] == ['diff']:
+        return main_diff(argv[1:])
+    
+    args = build_parser().parse_args(argv)
+    if args.log_dir:
+        setup_logging(args.log_dir, level=logging.INFO)
+    else:
+        logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    
+    quotas = dict(args.quota)
+    if all(quota == 0 for quota in quotas.values()):
+        logging.error("请先设置专业录取名额")
+        return 2
+    
+    if is_batch_input(args.input):
+        return main_batch(args, quotas)
+    
+    try:
+        cache = None if args.no_cache else CohortCache()
+        stats = run(args.input, args.output, quotas, args.summary, cache, tiebreaks(args), args.report)
+    except UnknownMajorError as e:
+        logging.error(str(e))
+        return 2
+    except Exception as e:
+        logging.error(f"处理录取时发生错误: {str(e)}")
+        return 1
+    
+    for record in RECORDER.recent:
+        rows = '' if record['rows'] is None else f"，{record['rows']} 行"
+        logging.info(f"耗时 {record['stage']}: {record['seconds']:.3f} 秒{rows}")
+    
+    print(format_summary(stats))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,63 @@
+"""本机录取服务入口：载入的数据常驻内存，供多个界面或脚本共用（接口见 core/service.py）
+
+用法示例：
+    python src/admission_service.py --port 8765 data/input/2023年选课结果.xlsx
+    python src/gui/simple_main.py --service http://127.0.0.1:8765
+"""
+import argparse
+import asyncio
+import logging
+import sys
+
+from core.cache import CohortCache
+from core.instrumentation import setup_logging
+from core.service import AdmissionService, DEFAULT_HOST, DEFAULT_PORT, is_loopback
+
+
+def loopback_host(text):
+    """服务没有身份验证且可读写本机文件，只允许监听回环地址"""
+    if not is_loopback(text):
+        raise argparse.ArgumentTypeError(f"只能监听本机回环地址（如 127.0.0.1、::1、localhost）：{text}")
+    return text
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="本科生专业方向录取（本机服务）")
+    parser.add_argument('preload', nargs='*', help="启动时载入的学生志愿文件")
+    parser.add_argument(
+        '--host', type=loopback_host, default=DEFAULT_HOST,
+        help=f"监听的回环地址（默认 {DEFAULT_HOST}），不能监听其它地址，只接受本机连接"
+    )
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT, help=f"端口（默认 {DEFAULT_PORT}）")
+    parser.add_argument('--no-cache', action='store_true', help="不使用已解析输入的缓存，总是重新解析")
+    parser.add_argument('--log-dir', help="日志目录，写入 app.log 与各阶段耗时记录 timings.jsonl")
+    return parser
+
+
+async def serve(service, args):
+    for file_name in args.preload:
+        info = await service.load(file_name)
+        logging.info(f"预先载入 {info['rows']} 名学生，编号 {info['id']}")
+    await service.serve(args.host, args.port)
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    if args.log_dir:
+        setup_logging(args.log_dir, level=logging.INFO)
+    else:
+        logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    
+    service = AdmissionService(cache=None if args.no_cache else CohortCache())
+    try:
+        asyncio.run(serve(service, args))
+    except KeyboardInterrupt:
+        logging.info("录取服务已停止")
+    except Exception as e:
+        logging.error(f"录取服务运行失败: {str(e)}")
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
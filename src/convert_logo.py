@@ -1,6 +1,10 @@
 from PIL import Image
 import os
 
+# 界面中LOGO的显示宽度及对应的预缩放文件
+LOGO_WIDTH = 250
+LOGO_FILE = f'logo_{LOGO_WIDTH}.png'
+
 def convert_png_to_ico():
     # 获取脚本所在目录
     script_dir = os.path.dirname(os.path.abspath(__file__))
@@ -24,5 +28,18 @@ def convert_png_to_ico():
     # 保存为ICO
     new_img.save(output_path, format='ICO', sizes=[(256, 256), (128, 128), (64, 64), (32, 32), (16, 16)])
 
+def make_presized_logo(width=LOGO_WIDTH):
+    """生成界面直接使用的小尺寸LOGO，启动时无需再缩放原图"""
+    script_dir = os.path.dirname(os.path.abspath(__file__))
+    project_root = os.path.dirname(script_dir)
+    
+    input_path = os.path.join(project_root, 'resources', 'logo.png')
+    output_path = os.path.join(project_root, 'resources', LOGO_FILE)
+    
+    img = Image.open(input_path)
+    height = int(img.size[1] * width / img.size[0])
+    img.resize((width, height), Image.Resampling.LANCZOS).save(output_path, optimize=True)
+
 if __name__ == '__main__':
-    convert_png_to_ico() 
\ No newline at end of file
+    convert_png_to_ico()
+    make_presized_logo() 
\ No newline at end of file
@@ -1,77 +1,87 @@
-import pandas as pd
-import os
-
-def convert_xlsx_to_csv():
-    try:
-        # 获取当前目录
-        current_dir = os.path.dirname(os.path.abspath(__file__))
-        project_root = os.path.dirname(current_dir)
-        
-        # 输入和输出路径
-        input_path = os.path.join(project_root, 'data', 'input', '2023年选课结果.xlsx')
-        output_path = os.path.join(project_root, 'data', 'input', '2023年选课结果.csv')
-        
-        # 检查文件是否存在
-        if not os.path.exists(input_path):
-            print(f"错误：找不到输入文件 {input_path}")
-            return
-            
-        # 读取xlsx
-        print("正在读取Excel文件...")
-        df = pd.read_excel(input_path)
-        
-        # 保存为csv
-        print("正在转换为CSV文件...")
-        df.to_csv(output_path, index=False, encoding='utf-8-sig')
-        
-        # 输出调剂录取的学生名单
-        print("\n=== 调剂录取学生名单 ===")
-        print("以下学生的第一志愿选择与最终录取结果不同：\n")
-        
-        # 专业选项对应表
-        major_choices = {
-            'a': ['电子信息工程', '通信工程', '电磁场与无线技术'],
-            'b': ['电子信息工程', '电磁场与无线技术', '通信工程'],
-            'c': ['电磁场与无线技术', '电子信息工程', '通信工程'],
-            'd': ['电磁场与无线技术', '通信工程', '电子信息工程'],
-            'e': ['通信工程', '电子信息工程', '电磁场与无线技术'],
-            'f': ['通信工程', '电磁场与无线技术', '电子信息工程']
-        }
-        
-        # 计数器
-        adjustment_count = 0
-        
-        # 遍历每个学生
-        for _, row in df.iterrows():
-            if pd.isna(row['选课选项']):
-                continue
-                
-            choice = row['选课选项'].lower()
-            if choice in major_choices:
-                first_choice = major_choices[choice][0]
-                final_result = row['最终结果']
-                
-                # 标准化最终结果
-                if '电信' in final_result:
-                    final_result = '电子信息工程'
-                elif '通信' in final_result:
-                    final_result = '通信工程'
-                elif '电磁' in final_result:
-                    final_result = '电磁场与无线技术'
-                    
-                if first_choice != final_result:
-                    adjustment_count += 1
-                    print(f"姓名：{row['姓名']}")
-                    print(f"班级：{row['班级']}")
-                    print(f"成绩：{row['成绩']}")
-                    print(f"第一志愿：{first_choice}")
-                    print(f"最终录取：{final_result}")
-                    print("-" * 30)
-        
-        print(f"\n总共有 {adjustment_count} 名学生被调剂录取")
-        
-    except Exception as e:
-        print(f"发生错误：{str(e)}")
-
-if __name__ == '__main__':
+import pandas as pd
+import os
+
+from core.cache import CohortCache
+from core.instrumentation import span
+from core.preferences import PREFERENCE_MAPPING
+
+# 最终结果中的简称 -> 专业全称，按顺序取第一个包含的简称
+RESULT_ALIASES = {
+    '电信': '电子信息工程',
+    '通信': '通信工程',
+    '电磁': '电磁场与无线技术'
+}
+AUDIT_COLUMNS = ['排名', '学号', '姓名', '班级', '成绩', '选课选项', '第一志愿', '最终录取']
+
+def normalize_results(results):
+    """最终结果列 -> 专业全称；不含任何简称的值原样保留
+    
+    不同取值只有几种，先为每种取值建查找表，再整列查表。
+    """
+    values = results.fillna('').astype(str)
+    lookup = {
+        value: next((major for alias, major in RESULT_ALIASES.items() if alias in value), value)
+        for value in values.unique()
+    }
+    return values.map(lookup)
+
+def audit_adjustments(df):
+    """第一志愿与最终录取结果不同的学生（调剂录取），未选课或选项无法识别的学生不计入"""
+    with span('audit', rows=len(df)):
+        first_choices = {code.lower(): majors[0] for code, majors in PREFERENCE_MAPPING.items()}
+        first_choice = df['选课选项'].str.lower().map(first_choices)
+        final_result = normalize_results(df['最终结果'])
+        mask = first_choice.notna() & (first_choice != final_result)
+        
+        adjusted = df[mask].assign(第一志愿=first_choice[mask], 最终录取=final_result[mask])
+        return adjusted[[column for column in AUDIT_COLUMNS if column in adjusted]]
+
+def write_audit(adjusted, output_path):
+    """按扩展名写出 xlsx 或 csv"""
+    os.makedirs(os.path.dirname(output_path), exist_ok=True)
+    if output_path.lower().endswith('.csv'):
+        adjusted.to_csv(output_path, index=False, encoding='utf-8-sig')
+    else:
+        adjusted.to_excel(output_path, index=False, sheet_name='调剂录取名单')
+
+def convert_xlsx_to_csv():
+    try:
+        # 获取当前目录
+        current_dir = os.path.dirname(os.path.abspath(__file__))
+        project_root = os.path.dirname(current_dir)
+        
+        # 输入和输出路径
+        input_path = os.path.join(project_root, 'data', 'input', '2023年选课结果.xlsx')
+        output_path = os.path.join(project_root, 'data', 'input', '2023年选课结果.csv')
+        
+        # 检查文件是否存在
+        if not os.path.exists(input_path):
+            print(f"错误：找不到输入文件 {input_path}")
+            return
+            
+        # 读取xlsx，文件未改动时直接使用缓存
+        cache = CohortCache()
+        key = cache.key(input_path)
+        df = cache.load_frame(key)
+        if df is None:
+            print("正在读取Excel文件...")
+            df = pd.read_excel(input_path)
+            cache.save_frame(key, df)
+        else:
+            print("Excel文件未改动，使用缓存数据")
+        
+        # 保存为csv
+        print("正在转换为CSV文件...")
+        df.to_csv(output_path, index=False, encoding='utf-8-sig')
+        
+        # 调剂录取的学生名单写入文件
+        audit_path = os.path.join(project_root, 'data', 'output', '2023年调剂录取名单.xlsx')
+        adjusted = audit_adjustments(df)
+        write_audit(adjusted, audit_path)
+        print(f"\n总共有 {len(adjusted)} 名学生被调剂录取（第一志愿与最终录取结果不同），名单已保存到 {audit_path}")
+    
+    except Exception as e:
+        print(f"发生错误：{str(e)}")
+
+if __name__ == '__main__':
     convert_xlsx_to_csv() 
\ No newline at end of file
@@ -0,0 +1,261 @@
+"""专业录取分配核心，图形界面与命令行共用"""
+import numpy as np
+
+from core.instrumentation import span
+from core.preferences import NO_MAJOR
+
+UNASSIGNED = '未分配'
+ADJUST_SUFFIX = '(调剂)'
+
+# 录取结果编码：非负数为专业下标
+NOT_PROCESSED = -1
+UNASSIGNED_CODE = -2
+
+# 录取分数分布的最多分段数
+HISTOGRAM_BINS = 20
+
+
+class AdmissionCounters:
+    """录取过程中逐轮累加的统计，由 allocate() 更新
+    
+    各专业的正常录取、调剂人数和最低录取名次在每轮录取时按本轮被录取的学生累加，
+    同时按志愿代码（groups，如 StudentStore.choices_array()）统计录取去向，
+    按分数段统计各专业录取分数的分布。summary() 等只与专业数、志愿代码数有关，
+    不再遍历学生；allocate() 的 progress 回调中调用即为当时的统计。
+    
+    groups 为按导入顺序排列的志愿代码，group_labels 为各代码的文字；省略时不按志愿统计。
+    """
+    
+    def __init__(self, quotas, groups=None, group_labels=(), bins=HISTOGRAM_BINS):
+        self.majors = list(quotas)
+        self.quotas = np.array([quotas[major] for major in self.majors], dtype=np.int64)
+        self.groups = None if groups is None else np.asarray(groups, dtype=np.int64)
+        self.group_labels = list(group_labels)
+        self.bins = bins
+        self.total = 0
+        self.rounds = 0
+        self._scores = self._order = self.edges = None
+    
+    def start(self, scores, order, rounds):
+        """开始一次录取：scores 为按导入顺序的分数，order 为排名顺序，rounds 为志愿轮数"""
+        majors = len(self.majors)
+        self.total = len(order)
+        self.rounds = rounds
+        self._scores = scores
+        self._order = order
+        self.normal = np.zeros(majors, dtype=np.int64)
+        self.adjust = np.zeros(majors, dtype=np.int64)
+        self.unassigned = 0
+        # 排名位置（从 0 开始），越大分数越低；-1 表示尚无录取
+        self.lowest_position = np.full(majors, -1, dtype=np.int64)
+        # 每个志愿代码的去向：第 1..rounds 志愿录取、调剂、未分配
+        self.outcomes = np.zeros((len(self.group_labels), rounds + 2), dtype=np.int64)
+        self.edges = self._histogram_edges(scores)
+        self.histogram = np.zeros((majors, len(self.edges) - 1), dtype=np.int64)
+    
+    def _histogram_edges(self, scores):
+        """整数分数段的边界，段数不超过 bins"""
+        if len(scores) == 0:
+            return np.array([0.0, 1.0])
+        low, high = np.floor(scores.min()), np.floor(scores.max()) + 1
+        width = max(np.ceil((high - low) / self.bins), 1.0)
+        return low + width * np.arange(int(np.ceil((high - low) / width)) + 1)
+    
+    def admit(self, positions, majors, round_idx=None):
+        """排名位置为 positions 的学生被录取到 majors，round_idx 为志愿轮次，None 表示调剂"""
+        count = len(self.majors)
+        added = np.bincount(majors, minlength=count)
+        if round_idx is None:
+            self.adjust += added
+            column = self.rounds
+        else:
+            self.normal += added
+            column = round_idx
+        np.maximum.at(self.lowest_position, majors, positions)
+        
+        students = self._order[positions]
+        self._count_groups(students, column)
+        segments = self.histogram.shape[1]
+        segment = np.searchsorted(self.edges, self._scores[students], side='right') - 1
+        segment = np.clip(segment, 0, segments - 1)
+        self.histogram += np.bincount(
+            majors * segments + segment, minlength=self.histogram.size
+        ).reshape(self.histogram.shape)
+    
+    def leave_unassigned(self, positions):
+        self.unassigned += len(positions)
+        self._count_groups(self._order[positions], self.rounds + 1)
+    
+    def _count_groups(self, students, column):
+        if self.groups is not None and len(students):
+            self.outcomes[:, column] += np.bincount(self.groups[students], minlength=len(self.outcomes))
+    
+    def remaining(self):
+        return self.quotas - self.normal - self.adjust
+    
+    def lowest(self):
+        """各专业最低录取分数和名次（从 1 开始），无人录取的专业为 None"""
+        lowest = []
+        for position in self.lowest_position.tolist():
+            if position < 0:
+                lowest.append((None, None))
+            else:
+                lowest.append((float(self._scores[self._order[position]]), position + 1))
+        return lowest
+    
+    def summary(self):
+        """统计信息：总人数、已确定结果人数、录取与未分配人数，
+        以及各专业的名额、正常录取、调剂录取、剩余名额、最低录取分数与名次
+        """
+        remaining = self.remaining()
+        majors = {}
+        for i, (major, (score, rank)) in enumerate(zip(self.majors, self.lowest())):
+            majors[major] = {
+                'total': int(self.normal[i] + self.adjust[i]),
+                'adjust': int(self.adjust[i]),
+                'normal': int(self.normal[i]),
+                'remaining': int(remaining[i]),
+                'quota': int(self.quotas[i]),
+                'lowest_score': score,
+                'lowest_rank': rank
+            }
+        decided = int(self.normal.sum() + self.adjust.sum()) + self.unassigned
+        return {
+            'total': self.total,
+            'decided': decided,
+            'admitted': decided - self.unassigned,
+            'unassigned': self.unassigned,
+            'majors': majors
+        }
+    
+    def group_summary(self):
+        """志愿代码 -> 人数及各去向人数，只列出有学生的代码
+        
+        'rounds' 为第 1..n 志愿录取的人数，另有调剂、未分配人数。
+        """
+        result = {}
+        for label, row in zip(self.group_labels, self.outcomes.tolist()):
+            total = sum(row)
+            if total:
+                result[label] = {
+                    'total': total,
+                    'rounds': row[:self.rounds],
+                    'adjust': row[self.rounds],
+                    'unassigned': row[self.rounds + 1]
+                }
+        return result
+    
+    def histograms(self):
+        """(分数段边界, {专业: 各分数段录取人数})"""
+        return self.edges.tolist(), dict(zip(self.majors, self.histogram.tolist()))
+    
+    def snapshot(self):
+        """当前的全部统计（summary()、group_summary()、histograms()），可交给界面线程显示"""
+        edges, histograms = self.histograms()
+        return {
+            'summary': self.summary(),
+            'groups': self.group_summary(),
+            'edges': edges,
+            'histograms': histograms
+        }
+
+
+def allocate(scores, preferences, quotas, progress=None, order=None, counters=None):
+    """按分数从高到低逐轮录取，返回 (录取专业下标, 是否调剂, 剩余名额)
+    
+    scores 为按导入顺序排列的分数，preferences 为对应的志愿矩阵
+    （每行为 list(quotas) 中的专业下标，空位为 NO_MAJOR，见 core.preferences），
+    志愿数不限，整行为空的视为无效志愿。返回的专业下标对应 list(quotas)，
+    未分配记为 UNASSIGNED_CODE。
+    
+    第k轮处理仍未录取学生的第k志愿，最后将未录取的学生（含无效志愿）
+    调剂到仍有名额的专业。每轮结束后以已确定结果的人数调用 progress（如提供）。
+    
+    order 为按排名排好的学生下标（如 StudentStore.ranking_index().order），
+    提供时直接使用，不再排序；省略时按分数排序，同分保持导入顺序。
+    
+    counters 为 AdmissionCounters 时，录取过程中随之更新各项统计。
+    """
+    majors = list(quotas)
+    remaining = np.array([quotas[major] for major in majors], dtype=np.int64)
+    
+    scores = np.asarray(scores, dtype=np.float64)
+    preferences = np.asarray(preferences)
+    
+    # 将所有学生按分数排序（同分保持导入顺序）
+    with span('sort', rows=len(scores), reused=order is not None):
+        if order is None:
+            order = np.argsort(-scores, kind='stable')
+        ranked = preferences[order]
+    rounds = ranked.shape[1] if ranked.ndim == 2 else 0
+    if counters is not None:
+        counters.start(scores, order, rounds)
+    with span('allocate', rows=len(order), majors=len(majors)):
+        admitted = np.full(len(order), NOT_PROCESSED, dtype=np.int64)
+        
+        for round_idx in range(rounds):
+            targets = ranked[:, round_idx].astype(np.int64)
+            pending = np.flatnonzero((admitted == NOT_PROCESSED) & (targets != NO_MAJOR))
+            
+            # 同一轮中每名学生只报一个专业：按专业稳定分组后，
+            # 每组中分数最高的 remaining 名候选者被录取
+            grouped = pending[np.argsort(targets[pending], kind='stable')]
+            group_majors = targets[grouped]
+            counts = np.bincount(group_majors, minlength=len(majors))
+            within_group = np.arange(len(grouped)) - (np.cumsum(counts) - counts)[group_majors]
+            accepted = within_group < remaining[group_majors]
+            
+            admitted[grouped[accepted]] = group_majors[accepted]
+            remaining -= np.bincount(group_majors[accepted], minlength=len(majors))
+            if counters is not None:
+                counters.admit(grouped[accepted], group_majors[accepted], round_idx)
+            
+            if progress is not None:
+                progress(int(np.count_nonzero(admitted != NOT_PROCESSED)))
+        
+        # 处理未被录取的学生（调剂），按专业顺序依次填满剩余名额
+        adjusted = np.zeros(len(order), dtype=bool)
+        leftover = np.flatnonzero(admitted == NOT_PROCESSED)
+        start = 0
+        for major in range(len(majors)):
+            take = leftover[start:start + remaining[major]]
+            admitted[take] = major
+            adjusted[take] = True
+            remaining[major] -= len(take)
+            start += len(take)
+        admitted[leftover[start:]] = UNASSIGNED_CODE
+        if counters is not None:
+            counters.admit(leftover[:start], admitted[leftover[:start]])
+            counters.leave_unassigned(leftover[start:])
+        if progress is not None:
+            progress(len(admitted))
+        
+        # 还原为导入顺序
+        admitted_in_order = np.empty_like(admitted)
+        admitted_in_order[order] = admitted
+        adjusted_in_order = np.empty_like(adjusted)
+        adjusted_in_order[order] = adjusted
+    
+    remaining_quotas = {major: int(remaining[i]) for i, major in enumerate(majors)}
+    return admitted_in_order, adjusted_in_order, remaining_quotas
+
+
+def format_summary(stats):
+    """生成录取统计信息文本"""
+    result_msg = "录取完成！\n\n"
+    result_msg += f"总人数：{stats['total']}人\n"
+    result_msg += f"已录取：{stats['admitted']}人\n"
+    result_msg += f"未录取：{stats['unassigned']}人\n\n"
+    result_msg += "各专业录取情况：\n"
+    
+    for major, data in stats['majors'].items():
+        result_msg += f"\n{major}：\n"
+        result_msg += f"  - 总计：{data['total']}人\n"
+        result_msg += f"  - 正常录取：{data['normal']}人\n"
+        result_msg += f"  - 调剂录取：{data['adjust']}人\n"
+        result_msg += f"  - 剩余名额：{data['remaining']}人\n"
+        if data.get('lowest_score') is not None:
+            result_msg += f"  - 最低录取：{data['lowest_score']:g}分，第{data['lowest_rank']}名\n"
+    
+    result_msg += f"\n未分配人数：{stats['unassigned']}人"
+    return result_msg
@@ -0,0 +1,216 @@
+"""已解析输入文件的磁盘缓存
+
+同一个 xlsx/xls/csv 再次打开时直接读取缓存的列存文件（格式见 core/columnar.py），
+跳过 openpyxl/xlrd 的解析。
+
+- 缓存文件以文件内容哈希命名，与文件路径无关，复制或移动过的文件同样命中
+- 索引记录 路径 -> (大小, 修改时间, 内容哈希)，大小和修改时间未变时不必重新计算哈希
+- 缓存总大小超过上限时按最近使用时间淘汰
+"""
+import hashlib
+import json
+import logging
+import os
+import sys
+import time
+
+import numpy as np
+
+from core.columnar import ColumnarWriter, ColumnarFile
+from core.instrumentation import span
+
+# 缓存内容或布局变化时递增，旧缓存自动失效
+CACHE_VERSION = 1
+MAX_BYTES = 512 * 1024 * 1024
+_INDEX_FILE = 'index.json'
+_HASH_BLOCK = 1024 * 1024
+_CHUNK_SIZE = 65536
+
+
+def default_cache_dir():
+    """与日志目录并列，位于程序所在目录下"""
+    return os.path.join(os.path.dirname(os.path.abspath(sys.argv[0])), 'cache')
+
+
+def _chunks(values, rows):
+    for start in range(0, rows, _CHUNK_SIZE):
+        yield values[start:start + _CHUNK_SIZE]
+
+
+def file_hash(file_name):
+    """文件内容的 blake2b 哈希"""
+    digest = hashlib.blake2b(digest_size=20)
+    with open(file_name, 'rb') as f:
+        for block in iter(lambda: f.read(_HASH_BLOCK), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class CohortCache:
+    """按内容哈希缓存解析结果
+    
+    用法::
+        
+        cache = CohortCache()
+        key = cache.key(file_name)          # 解析前取键，避免解析期间文件被改动
+        students = StudentStore()
+        if not cache.load_students(key, students):
+            ...                             # 正常解析，追加到 students
+            cache.save_students(key, students)
+    """
+    
+    def __init__(self, directory=None, max_bytes=MAX_BYTES):
+        self.directory = directory or default_cache_dir()
+        self.max_bytes = max_bytes
+        os.makedirs(self.directory, exist_ok=True)
+        self._index = self._read_index()
+    
+    def _read_index(self):
+        try:
+            with open(os.path.join(self.directory, _INDEX_FILE), encoding='utf-8') as f:
+                index = json.load(f)
+        except (OSError, ValueError):
+            return {'paths': {}, 'entries': {}}
+        index.setdefault('paths', {})
+        index.setdefault('entries', {})
+        return index
+    
+    def _write_index(self):
+        # 先写临时文件再替换，多个进程同时写入时也不会留下半截索引
+        path = os.path.join(self.directory, _INDEX_FILE)
+        temp = f"{path}.{os.getpid()}.tmp"
+        with open(temp, 'w', encoding='utf-8') as f:
+            json.dump(self._index, f, ensure_ascii=False)
+        os.replace(temp, path)
+    
+    def key(self, file_name):
+        """文件的缓存键：路径、大小、修改时间和内容哈希"""
+        path = os.path.abspath(file_name)
+        stat = os.stat(path)
+        known = self._index['paths'].get(path)
+        if known and known['size'] == stat.st_size and known['mtime_ns'] == stat.st_mtime_ns:
+            digest = known['hash']
+        else:
+            digest = file_hash(path)
+        return {'path': path, 'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns, 'hash': digest}
+    
+    def _entry_name(self, key, kind):
+        return f"{key['hash']}-{kind}-v{CACHE_VERSION}.adm"
+    
+    def _open(self, key, kind):
+        """命中时返回 ColumnarFile，并记录路径与使用时间"""
+        name = self._entry_name(key, kind)
+        try:
+            columns = ColumnarFile(os.path.join(self.directory, name))
+        except (OSError, ValueError):
+            return None
+        self._touch(key, name)
+        return columns
+    
+    def _touch(self, key, name):
+        self._index['paths'][key['path']] = {
+            'size': key['size'], 'mtime_ns': key['mtime_ns'], 'hash': key['hash']
+        }
+        entry = self._index['entries'].setdefault(name, {})
+        entry['used'] = time.time()
+        entry['bytes'] = os.path.getsize(os.path.join(self.directory, name))
+        self._write_index()
+    
+    def _save(self, key, kind, write):
+        """write(file_name) 写出缓存文件；失败只记日志，不影响正常流程"""
+        name = self._entry_name(key, kind)
+        path = os.path.join(self.directory, name)
+        temp = f"{path}.{os.getpid()}.tmp"
+        try:
+            with span('cache_save', kind=kind):
+                write(temp)
+            os.replace(temp, path)
+        except Exception as e:
+            logging.warning(f"写入缓存失败: {str(e)}")
+            if os.path.exists(temp):
+                os.remove(temp)
+            return
+        self._touch(key, name)
+        self.evict()
+    
+    def evict(self):
+        """总大小超过上限时，从最久未使用的缓存开始删除"""
+        entries = self._index['entries']
+        total = sum(entry['bytes'] for entry in entries.values())
+        for name in sorted(entries, key=lambda name: entries[name]['used']):
+            if total <= self.max_bytes:
+                break
+            total -= entries.pop(name)['bytes']
+            try:
+                os.remove(os.path.join(self.directory, name))
+            except OSError:
+                pass
+        live = {name.split('-', 1)[0] for name in entries}
+        self._index['paths'] = {
+            path: known for path, known in self._index['paths'].items() if known['hash'] in live
+        }
+        self._write_index()
+    
+    def load_students(self, key, students):
+        """命中时把缓存的学生数据追加到 students 并返回 True"""
+        columns = self._open(key, 'students')
+        if columns is None:
+            return False
+        with columns, span('cache_load', rows=columns.rows):
+            students.append_columnar(columns)
+        return True
+    
+    def save_students(self, key, students):
+        """缓存导入后、录取前的学生数据"""
+        def write(file_name):
+            rows = len(students)
+            writer = ColumnarWriter(file_name, rows)
+            with writer:
+                writer.add_array('序号', _chunks(students.ranks_array(), rows), '<i8')
+                writer.add_text('学号', _chunks(students.student_ids, rows))
+                writer.add_text('姓名', _chunks(students.names, rows))
+                writer.add_array('分数', _chunks(students.scores_array(), rows), '<f8')
+                writer.add_category(
+                    '志愿选择', _chunks(students.choices_array(), rows), students.choice_labels
+                )
+                writer.close({'source': key})
+        
+        self._save(key, 'students', write)
+    
+    def load_frame(self, key):
+        """缓存中的 DataFrame，未命中返回 None"""
+        import pandas as pd
+        
+        columns = self._open(key, 'frame')
+        if columns is None:
+            return None
+        with columns:
+            data = {}
+            for name in columns.names:
+                if name in columns.meta['categorical']:
+                    values = pd.Categorical.from_codes(
+                        np.array(columns.array(name)), categories=columns.categories(name)
+                    )
+                    data[name] = np.asarray(values, dtype=object)
+                else:
+                    data[name] = np.array(columns.array(name))
+        return pd.DataFrame(data)
+    
+    def save_frame(self, key, frame):
+        """缓存 pandas 读出的整张表；非数值列按取值编码，空值编码为 -1"""
+        import pandas as pd
+        
+        def write(file_name):
+            writer = ColumnarWriter(file_name, len(frame))
+            categorical = []
+            with writer:
+                for name, values in frame.items():
+                    if isinstance(values.dtype, np.dtype) and values.dtype.kind in 'biuf':
+                        writer.add_array(name, [values.to_numpy()], values.dtype)
+                    else:
+                        codes, categories = pd.factorize(values)
+                        writer.add_category(name, [codes], [str(value) for value in categories], np.int32)
+                        categorical.append(name)
+                writer.close({'source': key, 'categorical': categorical})
+        
+        self._save(key, 'frame', write)
@@ -0,0 +1,192 @@
+"""列存二进制格式：按列顺序写出定长缓冲区，可直接内存映射读取
+
+文件布局（整数均为小端）::
+    
+    b'ADMCOL01'                    8 字节魔数
+    列缓冲区 ...                    每个缓冲区从 8 字节对齐的位置开始
+    尾部 JSON（UTF-8）
+    尾部 JSON 长度                   uint64
+    b'ADMCOL01'                    8 字节魔数
+
+尾部 JSON 形如::
+    
+    {"rows": 行数, "meta": {...}, "columns": [
+        {"name": "分数", "kind": "array", "dtype": "<f8", "offset": 8, "nbytes": 800},
+        {"name": "学号", "kind": "text",
+         "offsets": {"offset": ..., "nbytes": ...}, "data": {"offset": ..., "nbytes": ...}},
+        {"name": "志愿选择", "kind": "category", "dtype": "<i2", "offset": ..., "nbytes": ...,
+         "categories": ["A", "B", ...]}
+    ]}
+
+- array：numpy 定长数组，dtype 为 numpy 类型字符串
+- text：字符串列，offsets 为 rows+1 个 int64 字节偏移，data 为拼接的 UTF-8 字节
+- category：整数编码列，categories 为编码对应的文字
+
+尾部放在最后，写出时只需按列顺序流式写入，不必预先知道每列长度。
+"""
+import json
+import mmap
+import struct
+
+import numpy as np
+
+MAGIC = b'ADMCOL01'
+FILE_SUFFIX = '.adm'
+ALIGNMENT = 8
+_LENGTH = struct.Struct('<Q')
+
+
+class ColumnarWriter:
+    """按列流式写出，每列以若干块的形式传入，内存占用只与块大小有关"""
+    
+    def __init__(self, file_name, rows):
+        self.rows = rows
+        self.columns = []
+        self._file = open(file_name, 'wb')
+        self._file.write(MAGIC)
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is not None:
+            self._file.close()
+    
+    def _align(self):
+        padding = -self._file.tell() % ALIGNMENT
+        self._file.write(b'\0' * padding)
+        return self._file.tell()
+    
+    def _write_chunks(self, chunks, dtype, rows=None):
+        rows = self.rows if rows is None else rows
+        offset = self._align()
+        count = 0
+        for chunk in chunks:
+            chunk = np.ascontiguousarray(chunk, dtype=dtype)
+            self._file.write(chunk.tobytes())
+            count += len(chunk)
+        if count != rows:
+            raise ValueError(f"列长度 {count} 与行数 {rows} 不符")
+        return {'offset': offset, 'nbytes': self._file.tell() - offset}
+    
+    def add_array(self, name, chunks, dtype):
+        """数值列，chunks 为数组块的迭代器"""
+        dtype = np.dtype(dtype)
+        column = {'name': name, 'kind': 'array', 'dtype': dtype.str}
+        column.update(self._write_chunks(chunks, dtype))
+        self.columns.append(column)
+    
+    def add_category(self, name, chunks, categories, dtype=np.int16):
+        """整数编码列，chunks 为编码块的迭代器"""
+        dtype = np.dtype(dtype)
+        column = {'name': name, 'kind': 'category', 'dtype': dtype.str, 'categories': list(categories)}
+        column.update(self._write_chunks(chunks, dtype))
+        self.columns.append(column)
+    
+    def add_text(self, name, chunks):
+        """字符串列，chunks 为字符串列表块的迭代器
+        
+        先写数据区，同时记下各块的字节长度，再写偏移量区。
+        """
+        data_offset = self._align()
+        lengths = []
+        for chunk in chunks:
+            encoded = [value.encode('utf-8') for value in chunk]
+            lengths.append(np.fromiter(map(len, encoded), dtype=np.int64, count=len(encoded)))
+            self._file.write(b''.join(encoded))
+        data = {'offset': data_offset, 'nbytes': self._file.tell() - data_offset}
+        
+        def offsets():
+            position = 0
+            yield np.zeros(1, dtype=np.int64)
+            for chunk_lengths in lengths:
+                ends = position + np.cumsum(chunk_lengths)
+                if len(ends):
+                    position = int(ends[-1])
+                yield ends
+        
+        offset_buffer = self._write_chunks(offsets(), '<i8', self.rows + 1)
+        self.columns.append({'name': name, 'kind': 'text', 'offsets': offset_buffer, 'data': data})
+    
+    def close(self, meta=None):
+        """写出尾部并关闭文件"""
+        footer = json.dumps(
+            {'rows': self.rows, 'meta': meta or {}, 'columns': self.columns},
+            ensure_ascii=False
+        ).encode('utf-8')
+        self._file.write(footer)
+        self._file.write(_LENGTH.pack(len(footer)))
+        self._file.write(MAGIC)
+        self._file.close()
+
+
+class ColumnarFile:
+    """内存映射读取列存文件，数值列和编码列直接返回映射上的 numpy 视图
+    
+    视图引用着映射，close() 前需先释放（或复制）这些数组。
+    """
+    
+    def __init__(self, file_name):
+        with open(file_name, 'rb') as f:
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        size = len(self._map)
+        tail = len(MAGIC) + _LENGTH.size
+        if size < len(MAGIC) + tail or self._map[:len(MAGIC)] != MAGIC or self._map[-len(MAGIC):] != MAGIC:
+            self._map.close()
+            raise ValueError(f"不是列存结果文件：{file_name}")
+        
+        (footer_length,) = _LENGTH.unpack_from(self._map, size - tail)
+        footer_start = size - tail - footer_length
+        footer = json.loads(self._map[footer_start:size - tail].decode('utf-8'))
+        self.rows = footer['rows']
+        self.meta = footer['meta']
+        self._columns = {column['name']: column for column in footer['columns']}
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+    
+    def close(self):
+        self._map.close()
+    
+    @property
+    def names(self):
+        return list(self._columns)
+    
+    def _buffer(self, spec, dtype):
+        return np.frombuffer(self._map, dtype=np.dtype(dtype),
+                             count=spec['nbytes'] // np.dtype(dtype).itemsize,
+                             offset=spec['offset'])
+    
+    def array(self, name):
+        """数值列或编码列的只读视图"""
+        column = self._columns[name]
+        if column['kind'] == 'text':
+            raise TypeError(f"{name} 是字符串列")
+        return self._buffer(column, column['dtype'])
+    
+    def categories(self, name):
+        """编码列的文字表"""
+        return self._columns[name]['categories']
+    
+    def text(self, name):
+        """字符串列解码为 str 列表"""
+        column = self._columns[name]
+        offsets = self._buffer(column['offsets'], '<i8').tolist()
+        data = self._map[column['data']['offset']:column['data']['offset'] + column['data']['nbytes']]
+        decoded = data.decode('utf-8')
+        if len(decoded) == len(data):
+            # 全是 ASCII（如学号）时字节偏移即字符偏移，整段解码一次后切片
+            return [decoded[start:end] for start, end in zip(offsets, offsets[1:])]
+        return [data[start:end].decode('utf-8') for start, end in zip(offsets, offsets[1:])]
+    
+    def column(self, name):
+        """按列类型返回值：数值列为数组，编码列为文字数组，字符串列为列表"""
+        column = self._columns[name]
+        if column['kind'] == 'text':
+            return self.text(name)
+        if column['kind'] == 'category':
+            return np.array(column['categories'], dtype=object)[self.array(name)]
+        return self.array(name)
@@ -0,0 +1,118 @@
+"""录取结果写出
+
+支持三种格式，均按块流式写出，内存占用只与块大小有关：
+- .xlsx：openpyxl 只写模式
+- .csv：UTF-8（带BOM，Excel可直接打开）
+- .adm：列存二进制格式，见 core/columnar.py
+"""
+import csv
+import os
+
+import numpy as np
+
+from core.columnar import ColumnarWriter, FILE_SUFFIX
+from core.instrumentation import span
+from core.store import StudentStore
+
+RESULT_HEADERS = list(StudentStore.COLUMNS)
+COLUMNAR_SUFFIX = FILE_SUFFIX
+CHUNK_SIZE = 65536
+
+
+def _chunks(students, chunk_size=CHUNK_SIZE):
+    """[start, stop) 分块"""
+    for start in range(0, len(students), chunk_size):
+        yield start, min(start + chunk_size, len(students))
+
+
+def _max_text_length(values):
+    return max(map(len, map(str, values)), default=0)
+
+
+def column_widths(students):
+    """按列计算 Excel 列宽（最长文字 + 2）
+    
+    只写模式下列宽须在写入数据前设置，因此直接从列存数据计算：
+    字符串列一次 map(len)，数值列和编码列只看不重复的值。
+    """
+    lengths = [len(header) for header in RESULT_HEADERS]
+    if len(students):
+        ranks = students.ranks_array()
+        choices = np.unique(students.choices_array())
+        results = np.unique(students.result_codes())
+        result_categories = students.result_categories()
+        column_lengths = [
+            _max_text_length([ranks.min(), ranks.max()]),
+            max(map(len, students.student_ids)),
+            max(map(len, students.names)),
+            _max_text_length(np.unique(students.scores_array()).tolist()),
+            _max_text_length([students.choice_labels[code] for code in choices]),
+            _max_text_length([result_categories[code] for code in results])
+        ]
+        lengths = [max(pair) for pair in zip(lengths, column_lengths)]
+    return [length + 2 for length in lengths]
+
+
+def _write_xlsx(file_name, students, progress):
+    # openpyxl 导入较慢，首次导出 xlsx 时才导入
+    from openpyxl import Workbook
+    from openpyxl.utils import get_column_letter
+    
+    # 只写模式，行数据直接落盘，不在内存中保留整张表
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet('录取结果')
+    for index, width in enumerate(column_widths(students), 1):
+        ws.column_dimensions[get_column_letter(index)].width = width
+    ws.append(RESULT_HEADERS)
+    for start, stop in _chunks(students):
+        for row in zip(*students.columns(start, stop)):
+            ws.append(row)
+        progress(stop)
+    wb.save(file_name)
+
+
+def _write_csv(file_name, students, progress):
+    with open(file_name, 'w', newline='', encoding='utf-8-sig') as f:
+        writer = csv.writer(f)
+        writer.writerow(RESULT_HEADERS)
+        for start, stop in _chunks(students):
+            writer.writerows(zip(*students.columns(start, stop)))
+            progress(stop)
+
+
+def _write_columnar(file_name, students, progress):
+    chunks = list(_chunks(students))
+    writer = ColumnarWriter(file_name, len(students))
+    with writer:
+        writer.add_array('序号', (students.ranks_array()[start:stop] for start, stop in chunks), '<i8')
+        writer.add_text('学号', (students.student_ids[start:stop] for start, stop in chunks))
+        writer.add_text('姓名', (students.names[start:stop] for start, stop in chunks))
+        writer.add_array('分数', (students.scores_array()[start:stop] for start, stop in chunks), '<f8')
+        writer.add_category(
+            '志愿选择',
+            (students.choices_array()[start:stop] for start, stop in chunks),
+            students.choice_labels
+        )
+        writer.add_category(
+            '录取专业',
+            (students.result_codes(start, stop) for start, stop in chunks),
+            students.result_categories()
+        )
+        writer.close({'majors': students.majors})
+    progress(len(students))
+
+
+def write_results(file_name, students, progress=None):
+    """按扩展名写出 StudentStore 中的录取结果
+    
+    progress(已写行数) 在每块写完后调用，可在其中抛出异常以中止写出。
+    """
+    progress = progress or (lambda done: None)
+    extension = os.path.splitext(file_name)[1].lstrip('.')
+    with span('export', rows=len(students), format=extension):
+        if file_name.endswith('.csv'):
+            _write_csv(file_name, students, progress)
+        elif file_name.endswith(COLUMNAR_SUFFIX):
+            _write_columnar(file_name, students, progress)
+        else:
+            _write_xlsx(file_name, students, progress)
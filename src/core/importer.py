@@ -0,0 +1,174 @@
+"""学生志愿文件读取
+
+csv/xlsx/xls 按批流式读取，按表头找列并校验后产出学生记录；列存文件（.adm，格式见 core/columnar.py）
+内存映射后整列读取，数值列和志愿编码不经过逐行的 Python 对象。
+"""
+import csv
+import os
+import time
+from itertools import islice
+
+from core.columnar import ColumnarFile, FILE_SUFFIX
+from core.instrumentation import RECORDER, span
+from core.validation import StudentBatch, StudentValidator, ValidationReport
+
+# 每批产出的学生记录条数
+BATCH_SIZE = 5000
+
+
+def iter_student_batches(file_name, batch_size=BATCH_SIZE, validator=None):
+    """按批读取并校验学生志愿文件，每批为最多 batch_size 名学生的 StudentBatch
+    
+    三种表格格式都逐行读取原始单元格，按表头找列（见 core/validation.py），
+    每批整列校验一次；有问题的行记入 validator.report，不中止读取。
+    缺少必需的列时抛出 ValueError。
+    调用方处理完一批后才会继续读取，内存占用只与批大小有关，与文件大小无关。
+    """
+    if is_columnar(file_name):
+        # 列存文件由本程序写出，各列已校验过
+        yield from _read_columnar(file_name, batch_size)
+        return
+    if validator is None:
+        validator = StudentValidator()
+    if file_name.endswith('.csv'):
+        records = _read_csv(file_name)
+    elif file_name.endswith('.xlsx'):
+        records = _read_xlsx(file_name)
+    else:
+        records = _read_xls(file_name)
+    
+    # 只统计解析、校验本身的用时，不含调用方处理每批的时间
+    parse_seconds = 0.0
+    validate_seconds = 0.0
+    rows = 0
+    try:
+        start = time.perf_counter()
+        validator.map_columns(next(records, ()))
+        # 表头为第 1 行
+        first_row = 2
+        while True:
+            batch = list(islice(records, batch_size))
+            checked = time.perf_counter()
+            parse_seconds += checked - start
+            if not batch:
+                break
+            students = validator.validate(batch, first_row)
+            first_row += len(batch)
+            start = time.perf_counter()
+            validate_seconds += start - checked
+            rows += len(students)
+            if students:
+                yield students
+                start = time.perf_counter()
+    finally:
+        # 提前停止迭代时也要关闭底层文件
+        records.close()
+        RECORDER.record('parse', parse_seconds, rows, format=os.path.splitext(file_name)[1].lstrip('.'))
+        RECORDER.record('validate', validate_seconds, rows, issues=len(validator.report))
+
+
+def is_columnar(file_name):
+    return file_name.lower().endswith(FILE_SUFFIX)
+
+
+def load_columnar(file_name, students):
+    """把列存文件中的学生整列追加到 students（StudentStore）"""
+    with ColumnarFile(file_name) as columns, span('parse', rows=columns.rows, format='adm'):
+        students.append_columnar(columns)
+
+
+def read_columnar_frame(file_name):
+    """列存文件 -> AdmissionAlgorithm 使用的 DataFrame，列与 StudentStore.to_frame() 相同
+    
+    排名、分数为文件映射上的只读视图，志愿选择为由映射中的编码构造的 Categorical，
+    这几列不创建逐行的 Python 对象；学号、姓名解码为字符串。
+    DataFrame 引用着映射，释放 DataFrame 后映射才关闭。
+    """
+    import pandas as pd
+    
+    columns = ColumnarFile(file_name)
+    with span('parse', rows=columns.rows, format='adm'):
+        choices = pd.Categorical.from_codes(
+            columns.array('志愿选择'), categories=columns.categories('志愿选择')
+        )
+        return pd.DataFrame({
+            '学号': columns.text('学号'),
+            '姓名': columns.text('姓名'),
+            '排名': columns.array('序号'),
+            '分数': columns.array('分数'),
+            '志愿选择': choices
+        }, copy=False)
+
+
+def read_students(file_name, students, cache=None):
+    """读取整个文件追加到 students（StudentStore），返回校验报告（ValidationReport）
+    
+    给定 cache（CohortCache）时，文件未改动则直接载入缓存，跳过解析；
+    否则正常解析后写入缓存（校验发现问题时不写入，下次仍会报告）。
+    列存文件本身即可直接映射读取，不经过缓存；缓存和列存文件都无需校验，报告为空。
+    """
+    if is_columnar(file_name):
+        load_columnar(file_name, students)
+        return ValidationReport()
+    
+    key = cache.key(file_name) if cache is not None else None
+    if key is not None and cache.load_students(key, students):
+        return ValidationReport()
+    validator = StudentValidator(students.majors, students.preference_mapping)
+    for batch in iter_student_batches(file_name, validator=validator):
+        students.append_batch(batch)
+    if key is not None and not validator.report:
+        cache.save_students(key, students)
+    return validator.report
+
+
+def _read_columnar(file_name, batch_size):
+    # 供逐批处理的调用方使用；整列读取请用 load_columnar()
+    with ColumnarFile(file_name) as columns:
+        ranks = columns.array('序号').tolist()
+        scores = columns.array('分数').tolist()
+        labels = columns.categories('志愿选择')
+        choices = [labels[code] for code in columns.array('志愿选择').tolist()]
+        student_ids = columns.text('学号')
+        names = columns.text('姓名')
+    for start in range(0, len(ranks), batch_size):
+        stop = start + batch_size
+        yield StudentBatch({
+            '序号': ranks[start:stop],
+            '学号': student_ids[start:stop],
+            '姓名': names[start:stop],
+            '分数': scores[start:stop],
+            '志愿选择': choices[start:stop]
+        })
+
+
+def _read_csv(file_name):
+    # 使用csv模块逐行读取，第一行为表头；utf-8-sig 去掉 Excel 写出的 BOM
+    with open(file_name, 'r', encoding='utf-8-sig', newline='') as f:
+        yield from csv.reader(f)
+
+
+def _read_xlsx(file_name):
+    # 表格库导入较慢，首次读取该格式时才导入
+    from openpyxl import load_workbook
+    
+    # 只读模式下openpyxl按需解析工作表XML，不构建完整的单元格对象
+    wb = load_workbook(file_name, read_only=True, data_only=True)
+    try:
+        # 空行也要产出，校验报告中的行号才与表格一致
+        yield from wb.active.iter_rows(values_only=True)
+    finally:
+        wb.close()
+
+
+def _read_xls(file_name):
+    import xlrd
+    
+    # on_demand模式下只加载用到的工作表
+    workbook = xlrd.open_workbook(file_name, on_demand=True)
+    try:
+        sheet = workbook.sheet_by_index(0)
+        for row_idx in range(sheet.nrows):
+            yield sheet.row_values(row_idx)
+    finally:
+        workbook.release_resources()
@@ -0,0 +1,184 @@
+"""耗时统计与日志
+
+- span(stage, rows) 记录一个阶段（解析、排序、录取、渲染、导出等）的用时、行数和内存峰值
+- 每条记录以 JSON 行写入 'admission.timing' 日志，同时通知订阅者（如界面中的统计表）
+- setup_logging() 把日志改为经队列由后台线程写出，文件 I/O 不在录取等热路径上执行
+"""
+import atexit
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import sys
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+TIMING_LOGGER = 'admission.timing'
+LOG_FORMAT = '%(asctime)s - %(levelname)s - %(message)s'
+
+timing_logger = logging.getLogger(TIMING_LOGGER)
+timing_logger.propagate = False
+
+
+def peak_rss():
+    """进程常驻内存的历史峰值（字节），无法获取时返回 None"""
+    try:
+        import resource
+    except ImportError:
+        resource = None
+    if resource is not None:
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # Linux 以 KB 为单位，macOS 以字节为单位
+        return peak if sys.platform == 'darwin' else peak * 1024
+    if sys.platform == 'win32':
+        import ctypes
+        from ctypes import wintypes
+        
+        class PROCESS_MEMORY_COUNTERS(ctypes.Structure):
+            _fields_ = [
+                ('cb', wintypes.DWORD),
+                ('PageFaultCount', wintypes.DWORD),
+                ('PeakWorkingSetSize', ctypes.c_size_t),
+                ('WorkingSetSize', ctypes.c_size_t),
+                ('QuotaPeakPagedPoolUsage', ctypes.c_size_t),
+                ('QuotaPagedPoolUsage', ctypes.c_size_t),
+                ('QuotaPeakNonPagedPoolUsage', ctypes.c_size_t),
+                ('QuotaNonPagedPoolUsage', ctypes.c_size_t),
+                ('PagefileUsage', ctypes.c_size_t),
+                ('PeakPagefileUsage', ctypes.c_size_t),
+            ]
+        
+        counters = PROCESS_MEMORY_COUNTERS()
+        counters.cb = ctypes.sizeof(counters)
+        process = ctypes.windll.kernel32.GetCurrentProcess()
+        if ctypes.windll.psapi.GetProcessMemoryInfo(process, ctypes.byref(counters), counters.cb):
+            return counters.PeakWorkingSetSize
+    return None
+
+
+class Recorder:
+    """收集各阶段的耗时记录
+    
+    最近的记录保存在 recent 中，每条记录写入 timing 日志并通知订阅者。
+    订阅者在产生记录的线程中被调用，界面需自行转到界面线程处理。
+    内存取进程常驻内存的历史峰值：peak_rss 为阶段结束时的峰值，
+    peak_rss_increase 为该阶段把峰值抬高了多少（没有超过之前的峰值时为 0）。
+    tracemalloc 能精确统计，但会让解析和导出慢上几十倍，因此不用。
+    """
+    
+    def __init__(self, history=200):
+        self.recent = deque(maxlen=history)
+        self._listeners = []
+        self._lock = threading.Lock()
+    
+    def subscribe(self, listener):
+        with self._lock:
+            self._listeners.append(listener)
+    
+    def unsubscribe(self, listener):
+        with self._lock:
+            self._listeners.remove(listener)
+    
+    @contextmanager
+    def span(self, stage, rows=None, **details):
+        """计时一个阶段；rows 可在 with 块内通过返回的字典更新"""
+        record = {'stage': stage, 'rows': rows}
+        record.update(details)
+        peak_before = peak_rss()
+        start = time.perf_counter()
+        try:
+            yield record
+        finally:
+            record['seconds'] = time.perf_counter() - start
+            record['peak_rss'] = peak_rss()
+            if peak_before is not None and record['peak_rss'] is not None:
+                record['peak_rss_increase'] = record['peak_rss'] - peak_before
+            record['thread'] = threading.current_thread().name
+            record['time'] = time.time()
+            self.emit(record)
+    
+    def record(self, stage, seconds, rows=None, **details):
+        """记录在别处测得的用时，例如生成器中只统计解析本身的时间"""
+        record = {'stage': stage, 'rows': rows, 'seconds': seconds}
+        record.update(details)
+        record['peak_rss'] = peak_rss()
+        record['thread'] = threading.current_thread().name
+        record['time'] = time.time()
+        self.emit(record)
+    
+    def emit(self, record):
+        self.recent.append(record)
+        if timing_logger.handlers:
+            timing_logger.info(json.dumps(record, ensure_ascii=False, default=str))
+        with self._lock:
+            listeners = list(self._listeners)
+        for listener in listeners:
+            listener(record)
+
+
+RECORDER = Recorder()
+
+
+def span(stage, rows=None, **details):
+    """在全局 RECORDER 上计时一个阶段"""
+    return RECORDER.span(stage, rows, **details)
+
+
+class _ExcludeLogger(logging.Filter):
+    """排除某个日志（及其子日志）的记录"""
+    
+    def filter(self, record):
+        return not super().filter(record)
+
+
+def setup_logging(log_dir, level=logging.DEBUG, console=True):
+    """把 root 日志与 timing 日志改为经队列写出
+    
+    app.log 为普通日志，timings.jsonl 每行一条耗时记录（JSON）。
+    返回后台写出的 QueueListener，程序退出时自动停止并写完队列中的剩余记录。
+    """
+    os.makedirs(log_dir, exist_ok=True)
+    formatter = logging.Formatter(LOG_FORMAT)
+    
+    handlers = [logging.FileHandler(os.path.join(log_dir, 'app.log'), encoding='utf-8')]
+    if console:
+        handlers.append(logging.StreamHandler())
+    for handler in handlers:
+        handler.setFormatter(formatter)
+        handler.addFilter(_ExcludeLogger(TIMING_LOGGER))
+    
+    timing_handler = logging.FileHandler(os.path.join(log_dir, 'timings.jsonl'), encoding='utf-8')
+    timing_handler.setFormatter(logging.Formatter('%(message)s'))
+    timing_handler.addFilter(logging.Filter(TIMING_LOGGER))
+    handlers.append(timing_handler)
+    
+    log_queue = queue.SimpleQueue()
+    listener = logging.handlers.QueueListener(log_queue, *handlers, respect_handler_level=True)
+    
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    root.addHandler(logging.handlers.QueueHandler(log_queue))
+    root.setLevel(level)
+    
+    for handler in list(timing_logger.handlers):
+        timing_logger.removeHandler(handler)
+    timing_logger.addHandler(logging.handlers.QueueHandler(log_queue))
+    timing_logger.setLevel(logging.INFO)
+    
+    listener.start()
+    atexit.register(listener.stop)
+    return listener
+
+
+def format_bytes(size):
+    """字节数转为便于阅读的文字"""
+    if size is None:
+        return '-'
+    for unit in ('B', 'KB', 'MB', 'GB'):
+        if size < 1024 or unit == 'GB':
+            return f"{size:.0f} {unit}" if unit == 'B' else f"{size:.1f} {unit}"
+        size /= 1024
@@ -0,0 +1,75 @@
+"""志愿编码：专业列表、志愿代码表及每名学生的志愿矩阵"""
+import re
+from itertools import chain
+
+import numpy as np
+
+MAJORS = ['电子信息工程', '通信工程', '电磁场与无线技术']
+
+# 志愿映射
+PREFERENCE_MAPPING = {
+    'A': ['电子信息工程', '通信工程', '电磁场与无线技术'],
+    'B': ['电子信息工程', '电磁场与无线技术', '通信工程'],
+    'C': ['电磁场与无线技术', '电子信息工程', '通信工程'],
+    'D': ['电磁场与无线技术', '通信工程', '电子信息工程'],
+    'E': ['通信工程', '电子信息工程', '电磁场与无线技术'],
+    'F': ['通信工程', '电磁场与无线技术', '电子信息工程']
+}
+
+# 志愿矩阵中的空位（志愿数不足或无效志愿）
+NO_MAJOR = -1
+
+# 直接填写专业顺序时可用的分隔符，如 "电子信息工程—通信工程"
+_LIST_SEPARATORS = re.compile(r'\s*(?:—|->|>|\||,|，|、|;|；)\s*')
+
+
+def parse_preferences(value, preference_mapping=PREFERENCE_MAPPING, majors=()):
+    """志愿代码或专业列表 -> 专业名称列表，无法识别时返回 None
+    
+    value 可以是 preference_mapping 中的代码（如 'A'）、专业名称的列表，
+    或用分隔符连接的专业名称字符串；只填一个专业时该专业须在 majors 中。
+    重复的专业只保留第一次出现。
+    """
+    if isinstance(value, str):
+        if value in preference_mapping:
+            return list(preference_mapping[value])
+        # 分隔符两侧的空白已由正则吃掉
+        parts = _LIST_SEPARATORS.split(value.strip())
+        if len(parts) < 2 and parts[0] not in majors:
+            return None
+    elif isinstance(value, (list, tuple)):
+        parts = [str(major).strip() for major in value]
+    else:
+        return None
+    
+    if not all(parts):
+        return None
+    return list(dict.fromkeys(parts)) or None
+
+
+def preference_table(labels, majors, preference_mapping=PREFERENCE_MAPPING):
+    """为每个志愿标签生成一行专业下标，返回 (len(labels), 最大志愿数) 的 int16 矩阵
+    
+    majors 中不存在的专业记为 NO_MAJOR，无法识别的标签整行为 NO_MAJOR。
+    """
+    return encode_preference_lists(
+        [parse_preferences(label, preference_mapping, majors) or [] for label in labels],
+        majors
+    )
+
+
+def encode_preference_lists(lists, majors):
+    """专业名称列表 -> 以 NO_MAJOR 补齐的 int16 专业下标矩阵"""
+    # pandas 导入较慢，用到时再导入，不拖慢界面启动
+    import pandas as pd
+    
+    lengths = np.fromiter(map(len, lists), dtype=np.int64, count=len(lists))
+    width = int(lengths.max()) if len(lengths) else 0
+    
+    table = np.full((len(lists), max(width, 1)), NO_MAJOR, dtype=np.int16)
+    # 所有列表拼接后一次性查下标，再按 (行, 列) 写回；未知专业得到 -1 即 NO_MAJOR
+    flat = pd.Index(list(majors)).get_indexer(list(chain.from_iterable(lists)))
+    rows = np.repeat(np.arange(len(lists)), lengths)
+    starts = np.cumsum(lengths) - lengths
+    table[rows, np.arange(len(flat)) - starts[rows]] = flat
+    return table
@@ -0,0 +1,331 @@
+"""两次录取结果的对比：按学号哈希连接，找出录取专业变化的学生
+
+结果集来自 StudentStore 或导出的结果文件（.adm/.csv/.xlsx/.xls），
+录取专业保存为 编码 + 文字表。旧结果的学号建一次字典（学号 -> 行号），
+新结果逐个查表得到对应的旧行号（两次学号顺序完全相同时直接按行对应）；之后的分类和各专业净流动只对
+编码数组做 numpy 运算，不同的录取专业文字只有十几种，每种只解析一次。
+"""
+import csv
+import os
+from itertools import repeat
+from operator import itemgetter
+
+import numpy as np
+
+from core.allocation import ADJUST_SUFFIX, UNASSIGNED
+from core.columnar import ColumnarFile, FILE_SUFFIX
+from core.instrumentation import span
+
+# 变化类型，按优先级排列：一名学生只归入第一个符合的类型
+CHANGE_KINDS = {
+    'unassigned': '新未分配',   # 现在未分配，之前已录取或不在旧结果中
+    'adjusted': '新调剂',       # 现在调剂录取，之前不是调剂录取
+    'admitted': '新录取',       # 现在正常录取，之前未录取或不在旧结果中
+    'moved': '改录专业',        # 前后都已录取，专业不同
+    'unadjusted': '不再调剂',   # 专业相同，由调剂录取改为正常录取
+    'removed': '已移除'         # 只在旧结果中
+}
+DIFF_HEADERS = ['学号', '姓名', '原录取专业', '新录取专业', '变化']
+FLOW_HEADERS = ['专业', '原人数', '新人数', '转入', '转出', '净变化']
+
+
+def parse_result(label):
+    """录取专业文字 -> (专业, 是否调剂)；未分配、未处理的专业为 None"""
+    label = label.strip()
+    if not label or label == UNASSIGNED:
+        return None, False
+    if label.endswith(ADJUST_SUFFIX):
+        return label[:-len(ADJUST_SUFFIX)], True
+    return label, False
+
+
+class ResultSet:
+    """一次录取的结果：学号、姓名列表，录取专业编码数组与编码对应的文字"""
+    
+    def __init__(self, student_ids, names, codes, labels):
+        self.student_ids = student_ids
+        self.names = names
+        self.codes = np.asarray(codes, dtype=np.int64)
+        self.labels = [str(label) for label in labels]
+    
+    def __len__(self):
+        return len(self.student_ids)
+    
+    @classmethod
+    def from_store(cls, students):
+        """StudentStore 当前的录取结果"""
+        return cls(students.student_ids, students.names, students.result_codes(), students.result_categories())
+    
+    @classmethod
+    def read(cls, file_name):
+        """读取导出的结果文件，须含 学号、录取专业 列（姓名 列可选）"""
+        with span('parse', format=os.path.splitext(file_name)[1].lstrip('.'), purpose='diff') as record:
+            if file_name.lower().endswith(FILE_SUFFIX):
+                with ColumnarFile(file_name) as columns:
+                    if '录取专业' not in columns.names:
+                        raise ValueError(f"{file_name} 中没有录取结果")
+                    results = cls(
+                        columns.text('学号'), columns.text('姓名'),
+                        columns.array('录取专业'), columns.categories('录取专业')
+                    )
+            else:
+                headers, rows = _read_table(file_name)
+                results = cls.from_rows(headers, rows, file_name)
+            record['rows'] = len(results)
+        return results
+    
+    @classmethod
+    def from_rows(cls, headers, rows, file_name=''):
+        """表头 + 行 -> ResultSet，录取专业按文字分解为编码"""
+        headers = [str(header).strip() if header is not None else '' for header in headers]
+        missing = [column for column in ('学号', '录取专业') if column not in headers]
+        if missing:
+            raise ValueError(f"{file_name} 缺少列：{'、'.join(missing)}")
+        id_column = headers.index('学号')
+        name_column = headers.index('姓名') if '姓名' in headers else None
+        result_column = headers.index('录取专业')
+        
+        student_ids, names, results = [], [], []
+        for row in rows:
+            student_ids.append(_text(row[id_column]))
+            names.append(_text(row[name_column]) if name_column is not None else '')
+            results.append(_text(row[result_column]) if result_column < len(row) else '')
+        lookup = {}
+        codes = [lookup.setdefault(label, len(lookup)) for label in results]
+        return cls(student_ids, names, codes, list(lookup))
+
+
+def _text(value):
+    """单元格值转为字符串，整数值的浮点数（xls 中的学号）去掉 .0"""
+    if value is None:
+        return ''
+    if isinstance(value, float) and value.is_integer():
+        value = int(value)
+    return str(value)
+
+
+def _read_table(file_name):
+    """读取第一张工作表（或 csv），返回 (表头, 其余各行)"""
+    lower = file_name.lower()
+    if lower.endswith('.csv'):
+        with open(file_name, 'r', encoding='utf-8-sig', newline='') as f:
+            reader = csv.reader(f)
+            headers = next(reader, [])
+            return headers, [row for row in reader if row]
+    if lower.endswith('.xls'):
+        import xlrd
+        
+        workbook = xlrd.open_workbook(file_name, on_demand=True)
+        try:
+            sheet = workbook.sheet_by_index(0)
+            if sheet.nrows == 0:
+                return [], []
+            columns = [sheet.col_values(i) for i in range(sheet.ncols)]
+            return [column[0] for column in columns], list(zip(*(column[1:] for column in columns)))
+        finally:
+            workbook.release_resources()
+    
+    from openpyxl import load_workbook
+    
+    wb = load_workbook(file_name, read_only=True, data_only=True)
+    try:
+        rows = wb.active.iter_rows(values_only=True)
+        headers = next(rows, ())
+        return headers, [row for row in rows if any(value is not None for value in row)]
+    finally:
+        wb.close()
+
+
+def _id_index(student_ids, description):
+    """学号 -> 行号 的字典，学号重复时无法一一对应，报错"""
+    index = dict(zip(student_ids, range(len(student_ids))))
+    if len(index) != len(student_ids):
+        seen = set()
+        for student_id in student_ids:
+            if student_id in seen:
+                raise ValueError(f"{description}中学号重复：{student_id}")
+            seen.add(student_id)
+    return index
+
+
+class RunDiff:
+    """diff_runs() 的结果
+    
+    - kinds：CHANGE_KINDS 中的变化类型 -> 人数
+    - majors：两次结果中出现的专业
+    - flows：专业 -> {'before', 'after', 'in', 'out', 'net'}
+    - changes：有变化的学生，每项为 (学号, 姓名, 原录取专业, 新录取专业, 变化类型)，
+      按新结果中的顺序，只在旧结果中的学生排在最后
+    """
+    
+    def __init__(self, old_rows, new_rows, kinds, majors, flows, changes):
+        self.old_rows = old_rows
+        self.new_rows = new_rows
+        self.kinds = kinds
+        self.majors = majors
+        self.flows = flows
+        self.changes = changes
+    
+    def __len__(self):
+        return len(self.changes)
+
+
+def _label_table(labels, majors):
+    """每种录取专业文字 -> (专业下标或 -1, 是否调剂, 是否未分配)，专业不在 majors 中时追加
+    
+    末尾多一项表示“不在该结果中”，编码 -1 即取到这一项。
+    """
+    major_codes, adjusted, unassigned = [], [], []
+    for label in labels:
+        major, adjust = parse_result(label)
+        if major is not None and major not in majors:
+            majors.append(major)
+        major_codes.append(majors.index(major) if major is not None else -1)
+        adjusted.append(adjust)
+        unassigned.append(label.strip() == UNASSIGNED)
+    return (
+        np.array(major_codes + [-1], dtype=np.int64),
+        np.array(adjusted + [False], dtype=bool),
+        np.array(unassigned + [False], dtype=bool)
+    )
+
+
+def _pick(values, rows):
+    """values 中 rows 各行，rows 为空时也返回列表"""
+    if not rows:
+        return []
+    picked = itemgetter(*rows)(values)
+    return list(picked) if len(rows) > 1 else [picked]
+
+
+def diff_runs(old, new, majors=()):
+    """对比两个 ResultSet，返回 RunDiff；majors 为报告中优先排列的专业"""
+    with span('diff', rows=len(new), old_rows=len(old)) as record:
+        if old.student_ids == new.student_ids:
+            # 同一批学生重新录取（最常见），行号一一对应，不必查表
+            old_position = np.arange(len(new), dtype=np.int64)
+        else:
+            old_index = _id_index(old.student_ids, "旧结果")
+            if len(set(new.student_ids)) != len(new):
+                _id_index(new.student_ids, "新结果")
+            # 新结果每名学生在旧结果中的行号，不在旧结果中为 -1
+            old_position = np.fromiter(
+                map(old_index.get, new.student_ids, repeat(-1, len(new))), dtype=np.int64, count=len(new)
+            )
+        record['joined'] = int(np.count_nonzero(old_position >= 0))
+        removed = np.ones(len(old), dtype=bool)
+        removed[old_position[old_position >= 0]] = False
+        removed = np.flatnonzero(removed)
+        
+        majors = list(majors)
+        old_major, old_adjusted, old_unassigned = _label_table(old.labels, majors)
+        new_major, new_adjusted, new_unassigned = _label_table(new.labels, majors)
+        
+        # 新结果中每名学生原来的录取专业编码，不在旧结果中的取到末尾的“不在”一项
+        before_codes = np.append(old.codes, len(old.labels))[old_position]
+        before_major = old_major[before_codes]
+        before_adjusted = old_adjusted[before_codes]
+        after_major = new_major[new.codes]
+        after_adjusted = new_adjusted[new.codes]
+        
+        conditions = [
+            new_unassigned[new.codes] & ~old_unassigned[before_codes],
+            after_adjusted & ~before_adjusted,
+            (after_major >= 0) & (before_major < 0),
+            (after_major >= 0) & (before_major >= 0) & (after_major != before_major),
+            (after_major >= 0) & (after_major == before_major) & before_adjusted & ~after_adjusted
+        ]
+        kind = np.full(len(new), -1, dtype=np.int64)
+        # 倒序赋值，优先级高的类型覆盖低的
+        for code in reversed(range(len(conditions))):
+            kind[conditions[code]] = code
+        changed = kind >= 0
+        
+        size = len(majors)
+        all_before = old_major[old.codes]
+        removed_major = all_before[removed]
+        # 只有专业真正变了才算转入转出；同一专业内调剂与正常录取之间的变化不算
+        moved = after_major != before_major
+        flows = {}
+        counts = [
+            np.bincount(all_before[all_before >= 0], minlength=size),
+            np.bincount(after_major[after_major >= 0], minlength=size),
+            np.bincount(after_major[moved & (after_major >= 0)], minlength=size),
+            # 转出包括已移除的学生原来的专业
+            np.bincount(before_major[moved & (before_major >= 0)], minlength=size)
+            + np.bincount(removed_major[removed_major >= 0], minlength=size)
+        ]
+        for i, major in enumerate(majors):
+            before, after, inflow, outflow = (int(count[i]) for count in counts)
+            flows[major] = {'before': before, 'after': after, 'in': inflow, 'out': outflow, 'net': inflow - outflow}
+        
+        kind_names = list(CHANGE_KINDS)
+        kinds = dict(zip(kind_names, np.bincount(kind[changed], minlength=len(conditions)).tolist()))
+        kinds['removed'] = len(removed)
+        
+        # 文字按编码整列查表，不逐行判断
+        rows = np.flatnonzero(changed).tolist()
+        changes = list(zip(
+            _pick(new.student_ids, rows), _pick(new.names, rows),
+            np.array(old.labels + [''], dtype=object)[before_codes[changed]].tolist(),
+            np.array(new.labels, dtype=object)[new.codes[changed]].tolist(),
+            np.array(kind_names, dtype=object)[kind[changed]].tolist()
+        ))
+        rows = removed.tolist()
+        changes.extend(zip(
+            _pick(old.student_ids, rows), _pick(old.names, rows),
+            np.array(old.labels, dtype=object)[old.codes[removed]].tolist(),
+            [''] * len(rows), ['removed'] * len(rows)
+        ))
+        record['changes'] = len(changes)
+    return RunDiff(len(old), len(new), kinds, majors, flows, changes)
+
+
+def format_diff(diff):
+    """生成对比结果文本"""
+    result_msg = f"原结果 {diff.old_rows} 人，新结果 {diff.new_rows} 人，录取专业变化 {len(diff)} 人\n\n"
+    for kind, description in CHANGE_KINDS.items():
+        result_msg += f"{description}：{diff.kinds[kind]}人\n"
+    
+    result_msg += "\n各专业人数变化：\n"
+    for major, flow in diff.flows.items():
+        result_msg += (
+            f"  {major}：{flow['before']} -> {flow['after']}人"
+            f"（转入 {flow['in']}，转出 {flow['out']}，净变化 {flow['net']:+d}）\n"
+        )
+    return result_msg.rstrip('\n')
+
+
+def _flow_rows(diff):
+    return [
+        [major, flow['before'], flow['after'], flow['in'], flow['out'], flow['net']]
+        for major, flow in diff.flows.items()
+    ]
+
+
+def _change_rows(diff):
+    return [change[:4] + (CHANGE_KINDS[change[4]],) for change in diff.changes]
+
+
+def write_diff(file_name, diff):
+    """写出对比结果：xlsx 为 变化名单、专业变化 两张工作表；csv 只写变化名单"""
+    with span('export', rows=len(diff), format=os.path.splitext(file_name)[1].lstrip('.'), purpose='diff'):
+        if file_name.lower().endswith('.csv'):
+            with open(file_name, 'w', encoding='utf-8-sig', newline='') as f:
+                writer = csv.writer(f)
+                writer.writerow(DIFF_HEADERS)
+                writer.writerows(_change_rows(diff))
+            return
+        
+        from openpyxl import Workbook
+        
+        wb = Workbook(write_only=True)
+        changes = wb.create_sheet('变化名单')
+        changes.append(DIFF_HEADERS)
+        for row in _change_rows(diff):
+            changes.append(row)
+        flows = wb.create_sheet('专业变化')
+        flows.append(FLOW_HEADERS)
+        for row in _flow_rows(diff):
+            flows.append(row)
+        wb.save(file_name)
@@ -0,0 +1,153 @@
+"""学生查找索引
+
+- 学号：哈希索引，学号 -> 下标，导入过程中按新增的行增量更新
+- 姓名：不重复姓名的有序列表和按姓名分组的倒排表，前缀查找用二分，
+  匹配的姓名是有序列表中连续的一段，对应倒排表中连续的一段下标
+- 志愿选择、录取专业：按编码分组的倒排表（稳定排序后的下标 + 每个编码的起止位置），
+  某个编码的学生即其中一段连续的下标，已按导入顺序排好
+
+索引在第一次查找时建立，之后只在人数或录取结果变化时重建对应部分，
+查找本身不遍历全部学生。
+"""
+from bisect import bisect_left
+
+import numpy as np
+
+from core.instrumentation import span
+
+# 大于任何实际字符，用作前缀查找的上界
+_MAX_CHAR = '\U0010ffff'
+
+
+def _postings(codes, size):
+    """编码数组 -> (按编码分组的下标, 各编码的起始位置)，第 c 组为 rows[starts[c]:starts[c + 1]]"""
+    rows = np.argsort(codes, kind='stable')
+    counts = np.bincount(codes, minlength=size)
+    starts = np.concatenate(([0], np.cumsum(counts)))
+    return rows, starts
+
+
+def _intersect(rows, group):
+    """两个升序下标数组的交集，耗时只与 rows 的长度（乘 log）有关"""
+    if not len(rows) or not len(group):
+        return rows[:0]
+    positions = np.minimum(np.searchsorted(group, rows), len(group) - 1)
+    return rows[group[positions] == rows]
+
+
+class StudentIndex:
+    """StudentStore 上的查找索引，search() 返回升序的学生下标数组"""
+    
+    def __init__(self, store):
+        self.store = store
+        self._ids = {}
+        self._duplicate_ids = {}    # 重复出现的学号 -> 全部下标
+        self._indexed_ids = 0
+        self._names = None      # (人数, 有序的不重复姓名, 倒排表)
+        self._choices = None    # (人数, 倒排表)
+        self._results = None    # ((人数, 录取结果版本), 倒排表)
+    
+    def _update_ids(self):
+        student_ids = self.store.student_ids
+        start, stop = self._indexed_ids, len(student_ids)
+        if start == stop:
+            return
+        with span('search_index', rows=stop - start, index='学号'):
+            ids = self._ids
+            added = dict(zip(student_ids[start:stop], range(start, stop)))
+            if len(added) == stop - start and ids.keys().isdisjoint(added):
+                ids.update(added)
+            else:
+                # 有重复学号（少见），逐个记录
+                for index in range(start, stop):
+                    student_id = student_ids[index]
+                    if student_id in ids:
+                        self._duplicate_ids.setdefault(student_id, [ids[student_id]]).append(index)
+                    else:
+                        ids[student_id] = index
+        self._indexed_ids = stop
+    
+    def _name_index(self):
+        store = self.store
+        if self._names is None or self._names[0] != len(store):
+            # pandas 导入较慢，第一次查找时再导入
+            import pandas as pd
+            
+            with span('search_index', rows=len(store), index='姓名'):
+                codes, uniques = pd.factorize(np.array(store.names, dtype=object))
+                order = np.argsort(np.asarray(uniques, dtype=str), kind='stable')
+                # 姓名编码改为按字典序的编码，同一姓名的学生在倒排表中相邻
+                sorted_code = np.empty(len(uniques), dtype=np.int64)
+                sorted_code[order] = np.arange(len(uniques))
+                postings = _postings(sorted_code[codes], len(uniques))
+                self._names = (len(store), np.asarray(uniques, dtype=object)[order].tolist(), postings)
+        return self._names
+    
+    def _choice_postings(self):
+        store = self.store
+        if self._choices is None or self._choices[0] != len(store):
+            with span('search_index', rows=len(store), index='志愿选择'):
+                postings = _postings(store.choices_array().astype(np.int64), len(store.choice_labels))
+            self._choices = (len(store), postings)
+        return self._choices[1]
+    
+    def _result_postings(self):
+        store = self.store
+        key = (len(store), store.results_version)
+        if self._results is None or self._results[0] != key:
+            with span('search_index', rows=len(store), index='录取专业'):
+                postings = _postings(store.result_codes(), len(store.result_categories()))
+            self._results = (key, postings)
+        return self._results[1]
+    
+    def by_id(self, student_id):
+        """学号完全相同的学生"""
+        self._update_ids()
+        if student_id in self._duplicate_ids:
+            return np.array(self._duplicate_ids[student_id], dtype=np.int64)
+        index = self._ids.get(student_id)
+        return np.array([] if index is None else [index], dtype=np.int64)
+    
+    def by_name_prefix(self, prefix):
+        """姓名以 prefix 开头的学生"""
+        _, names, (rows, starts) = self._name_index()
+        first = bisect_left(names, prefix)
+        last = bisect_left(names, prefix + _MAX_CHAR, first)
+        return np.sort(rows[starts[first]:starts[last]])
+    
+    def by_choice(self, code):
+        """志愿选择编码为 code（store.choice_labels 的下标）的学生"""
+        rows, starts = self._choice_postings()
+        return rows[starts[code]:starts[code + 1]]
+    
+    def by_result(self, code):
+        """录取专业编码为 code（store.result_categories() 的下标）的学生"""
+        rows, starts = self._result_postings()
+        return rows[starts[code]:starts[code + 1]]
+    
+    def search(self, text='', choice=None, result=None):
+        """按 学号或姓名前缀、志愿选择、录取专业 查找，各条件同时满足
+        
+        text 与某个学号完全相同时返回该学生，否则按姓名前缀查找；
+        choice、result 为编码，None 表示不限。没有任何条件时返回 None（不筛选）。
+        """
+        with span('search', rows=len(self.store)) as record:
+            groups = []
+            text = text.strip()
+            if text:
+                matches = self.by_id(text)
+                groups.append(matches if len(matches) else self.by_name_prefix(text))
+            if choice is not None:
+                groups.append(self.by_choice(choice))
+            if result is not None:
+                groups.append(self.by_result(result))
+            if not groups:
+                return None
+            
+            # 从最短的一组开始，逐组二分查找保留共有的下标
+            groups.sort(key=len)
+            rows = groups[0]
+            for group in groups[1:]:
+                rows = _intersect(rows, group)
+            record['matches'] = len(rows)
+        return rows
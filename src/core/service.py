@@ -0,0 +1,430 @@
+"""本机录取服务：asyncio 实现的 HTTP/JSON 服务，只监听 localhost
+
+同一台机器上的多个界面（或脚本）共用一份已载入的数据：每届学生只解析一次，
+StudentStore、排名索引、志愿矩阵和查找索引常驻内存，录取、查询、导出都直接使用。
+只用标准库，不依赖其它 Web 框架。
+
+接口（请求和响应均为 JSON，出错时返回 {"error": 说明}）：
+    
+    GET    /health                          服务状态
+    GET    /cohorts                         已载入的各届学生
+    POST   /cohorts           {"file"}      载入学生志愿文件，同一文件（按内容哈希）只载入一次
+    DELETE /cohorts/<id>                    释放
+    POST   /cohorts/<id>/allocate {"quotas", "tiebreaks"}   录取并保存结果，返回统计信息、
+                                                            结果版本 results_version 和录取专业编码 codes（base64）
+    POST   /cohorts/<id>/whatif   {"quotas", "tiebreaks"}   名额推演，只返回统计信息，不改变结果
+    GET    /cohorts/<id>/students?q=&choice=&result=&offset=&limit=   查找学生
+    GET    /cohorts/<id>/results?version=       录取专业编码（int16 小端二进制，同 StudentStore.result_codes()）
+    POST   /cohorts/<id>/export   {"file", "results_version"}   按扩展名导出录取结果到本机文件
+    POST   /cohorts/<id>/snapshot               导出为列存文件（.adm），返回路径，供客户端内存映射读取；
+                                                            每次写入新文件后替换，不改写已映射的旧快照
+
+同一届学生的并发推演请求合并为一批：第一个请求到达后等待 BATCH_WINDOW 秒收集其它请求，
+相同的名额方案只计算一次，整批在一个后台线程中复用同一份志愿矩阵和排名索引依次计算。
+
+多个客户端共用同一届学生的录取结果：results、export 可带上客户端看到的结果版本，
+结果已被其他客户端重新录取时返回 409，不会取回或导出别人的结果。
+服务没有身份验证，可读写本机任意路径，因此只允许监听回环地址。
+"""
+import asyncio
+import base64
+import inspect
+import ipaddress
+import json
+import logging
+import os
+import socket
+import tempfile
+from urllib.parse import parse_qs, urlsplit
+
+from core.allocation import AdmissionCounters, allocate
+from core.cache import file_hash
+from core.columnar import FILE_SUFFIX
+from core.exporter import write_results
+from core.importer import read_students
+from core.instrumentation import span
+from core.ranking import SCORE_TIEBREAKS
+from core.search import StudentIndex
+from core.store import StudentStore
+
+DEFAULT_HOST = '127.0.0.1'
+DEFAULT_PORT = 8765
+BATCH_WINDOW = 0.01
+MAX_BODY = 1024 * 1024
+QUERY_LIMIT = 100
+
+_REASONS = {200: 'OK', 400: 'Bad Request', 404: 'Not Found', 405: 'Method Not Allowed',
+            409: 'Conflict', 413: 'Payload Too Large', 500: 'Internal Server Error'}
+
+
+def is_loopback(host):
+    """host 是否只解析到回环地址（127.0.0.0/8、::1）"""
+    try:
+        addresses = {info[4][0] for info in socket.getaddrinfo(host, None)}
+    except (socket.gaierror, UnicodeError):
+        return False
+    return bool(addresses) and all(ipaddress.ip_address(address.split('%')[0]).is_loopback for address in addresses)
+
+
+class ServiceError(Exception):
+    """请求无法完成，status 为 HTTP 状态码"""
+    
+    def __init__(self, message, status=400):
+        super().__init__(message)
+        self.status = status
+
+
+class Cohort:
+    """常驻内存的一届学生及其索引"""
+    
+    def __init__(self, cohort_id, file_name, students):
+        self.id = cohort_id
+        self.file_name = file_name
+        self.students = students
+        # 录取、导出改变或读取录取结果，同一届学生依次执行
+        self.lock = asyncio.Lock()
+        self._index = None
+        self._preferences = None
+        self._pending = []
+        self._batch = None
+    
+    def info(self):
+        return {
+            'id': self.id,
+            'file': self.file_name,
+            'rows': len(self.students),
+            'majors': self.students.majors,
+            'results_version': self.students.results_version
+        }
+    
+    def preferences(self):
+        """志愿矩阵，只在人数变化时重新计算"""
+        if self._preferences is None or len(self._preferences) != len(self.students):
+            self._preferences = self.students.preference_matrix()
+        return self._preferences
+    
+    def index(self):
+        if self._index is None:
+            self._index = StudentIndex(self.students)
+        return self._index
+    
+    def quotas(self, quotas):
+        """请求中的名额 -> 按 students.majors 排列的名额，未给出的专业为 0"""
+        if not isinstance(quotas, dict):
+            raise ServiceError("quotas 应为 {专业: 名额}")
+        unknown = [major for major in quotas if major not in self.students.majors]
+        if unknown:
+            raise ServiceError(f"未知专业：{'、'.join(unknown)}")
+        if any(not isinstance(quota, int) or quota < 0 for quota in quotas.values()):
+            raise ServiceError("名额必须是非负整数")
+        return {major: quotas.get(major, 0) for major in self.students.majors}
+    
+    def run_allocation(self, quotas, tiebreaks):
+        """返回 (录取专业下标, 是否调剂, 统计信息)"""
+        students = self.students
+        counters = AdmissionCounters(quotas)
+        admitted, adjusted, _ = allocate(
+            students.scores_array(), self.preferences(), quotas,
+            order=students.ranking_index(tiebreaks).order, counters=counters
+        )
+        return admitted, adjusted, counters.summary()
+    
+    async def what_if(self, quotas, tiebreaks):
+        """加入当前批次，等待整批算完"""
+        future = asyncio.get_running_loop().create_future()
+        self._pending.append(((tuple(quotas.items()), tuple(tiebreaks)), future))
+        if self._batch is None:
+            self._batch = asyncio.ensure_future(self._run_batches())
+        return await future
+    
+    async def _run_batches(self):
+        loop = asyncio.get_running_loop()
+        try:
+            while self._pending:
+                # 稍等片刻，让同时到达的请求进入同一批
+                await asyncio.sleep(BATCH_WINDOW)
+                pending, self._pending = self._pending, []
+                try:
+                    results = await loop.run_in_executor(None, self._evaluate, [key for key, _ in pending])
+                except Exception as e:
+                    for _, future in pending:
+                        if not future.done():
+                            future.set_exception(e)
+                    continue
+                for key, future in pending:
+                    if not future.done():
+                        future.set_result(results[key])
+        finally:
+            self._batch = None
+    
+    def _evaluate(self, keys):
+        """一批名额方案 -> {方案: 统计信息}，相同方案只算一次"""
+        # 按同分规则排列，每种排名索引只建立一次
+        unique = sorted(set(keys), key=lambda key: key[1])
+        students = self.students
+        current = None
+        if students.results_version:
+            current = (students.admitted_array().copy(), students.adjusted_array())
+        results = {}
+        with span('whatif', rows=len(students), requests=len(keys), scenarios=len(unique)):
+            for key in unique:
+                quotas, tiebreaks = dict(key[0]), key[1]
+                admitted, adjusted, stats = self.run_allocation(quotas, tiebreaks)
+                if current is not None:
+                    # 与已保存的录取结果相比，录取专业不同的人数
+                    stats['changed'] = int(((admitted != current[0]) | (adjusted != current[1])).sum())
+                results[key] = stats
+        return results
+
+
+class AdmissionService:
+    """录取服务：管理常驻的各届学生，处理 HTTP 请求"""
+    
+    def __init__(self, cache=None, snapshot_dir=None):
+        self.cache = cache
+        self.snapshot_dir = snapshot_dir or os.path.join(tempfile.gettempdir(), 'admission_service')
+        self.cohorts = {}
+        self._load_lock = asyncio.Lock()
+    
+    async def start(self, host=DEFAULT_HOST, port=DEFAULT_PORT):
+        """开始监听，返回 asyncio.Server；port 为 0 时由系统分配端口；host 必须是回环地址"""
+        if not is_loopback(host):
+            raise ValueError(f"录取服务只能监听本机回环地址：{host}")
+        return await asyncio.start_server(self._handle, host, port)
+    
+    async def serve(self, host=DEFAULT_HOST, port=DEFAULT_PORT):
+        server = await self.start(host, port)
+        address = server.sockets[0].getsockname()
+        logging.info(f"录取服务已启动: http://{address[0]}:{address[1]}")
+        async with server:
+            await server.serve_forever()
+    
+    async def _handle(self, reader, writer):
+        try:
+            request_line = await reader.readline()
+            if not request_line:
+                return
+            try:
+                method, target, _ = request_line.decode('latin-1').split(' ', 2)
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b'\r\n', b'\n', b''):
+                        break
+                    name, _, value = line.decode('latin-1').partition(':')
+                    headers[name.strip().lower()] = value.strip()
+                length = int(headers.get('content-length') or 0)
+                if length > MAX_BODY:
+                    raise ServiceError("请求内容过大", 413)
+                body = await reader.readexactly(length) if length else b''
+                status, payload = 200, await self.dispatch(method.upper(), target, body)
+            except ServiceError as e:
+                status, payload = e.status, {'error': str(e)}
+            except ValueError as e:
+                status, payload = 400, {'error': str(e)}
+            except FileNotFoundError as e:
+                status, payload = 404, {'error': f"找不到文件：{e.filename}"}
+            except Exception as e:
+                logging.exception(f"处理请求时发生错误: {request_line!r}")
+                status, payload = 500, {'error': str(e)}
+            
+            if isinstance(payload, bytes):
+                content_type, content = 'application/octet-stream', payload
+            else:
+                content_type = 'application/json; charset=utf-8'
+                content = json.dumps(payload, ensure_ascii=False).encode('utf-8')
+            writer.write(
+                f"HTTP/1.1 {status} {_REASONS.get(status, '')}\r\n"
+                f"Content-Type: {content_type}\r\n"
+                f"Content-Length: {len(content)}\r\n"
+                "Connection: close\r\n\r\n".encode('latin-1') + content
+            )
+            await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+    
+    async def dispatch(self, method, target, body):
+        """按路径分派请求，返回可转为 JSON 的对象或 bytes"""
+        url = urlsplit(target)
+        parts = [part for part in url.path.split('/') if part]
+        query = {name: values[-1] for name, values in parse_qs(url.query).items()}
+        request = json.loads(body.decode('utf-8')) if body else {}
+        if not isinstance(request, dict):
+            raise ServiceError("请求内容应为 JSON 对象")
+        
+        if parts == ['health'] and method == 'GET':
+            return {'status': 'ok', 'cohorts': len(self.cohorts)}
+        if parts == ['cohorts']:
+            if method == 'GET':
+                return [cohort.info() for cohort in self.cohorts.values()]
+            if method == 'POST':
+                return await self.load(request.get('file') or '')
+            raise ServiceError("不支持的请求方法", 405)
+        if len(parts) < 2 or parts[0] != 'cohorts':
+            raise ServiceError(f"未知路径：{url.path}", 404)
+        
+        cohort = self.cohorts.get(parts[1])
+        if cohort is None:
+            raise ServiceError(f"没有载入该届学生：{parts[1]}", 404)
+        action = parts[2] if len(parts) > 2 else None
+        handlers = {
+            (None, 'GET'): lambda: cohort.info(),
+            (None, 'DELETE'): lambda: self.unload(cohort),
+            ('allocate', 'POST'): lambda: self.allocate(cohort, request),
+            ('whatif', 'POST'): lambda: cohort.what_if(
+                cohort.quotas(request.get('quotas')), self._tiebreaks(request)
+            ),
+            ('students', 'GET'): lambda: self.query(cohort, query),
+            ('results', 'GET'): lambda: self.results(cohort, query.get('version')),
+            ('export', 'POST'): lambda: self.export(
+                cohort, request.get('file') or '', request.get('results_version')
+            ),
+            ('snapshot', 'POST'): lambda: self.snapshot(cohort)
+        }
+        handler = handlers.get((action, method))
+        if handler is None:
+            raise ServiceError(f"未知请求：{method} {url.path}", 404)
+        result = handler()
+        return await result if inspect.isawaitable(result) else result
+    
+    @staticmethod
+    def _tiebreaks(request):
+        tiebreaks = request.get('tiebreaks')
+        if tiebreaks is None:
+            return SCORE_TIEBREAKS
+        if not isinstance(tiebreaks, list) or not all(isinstance(name, str) for name in tiebreaks):
+            raise ServiceError("tiebreaks 应为列名列表")
+        return tuple(tiebreaks)
+    
+    async def load(self, file_name):
+        if not file_name:
+            raise ServiceError("缺少 file")
+        file_name = os.path.abspath(file_name)
+        if not os.path.isfile(file_name):
+            raise ServiceError(f"找不到文件：{file_name}", 404)
+        loop = asyncio.get_running_loop()
+        
+        # 同时载入同一文件时只解析一次
+        async with self._load_lock:
+            key = await loop.run_in_executor(None, self._content_key, file_name)
+            cohort_id = key[:16]
+            if cohort_id not in self.cohorts:
+                students = await loop.run_in_executor(None, self._read, file_name)
+                self.cohorts[cohort_id] = Cohort(cohort_id, file_name, students)
+                logging.info(f"已载入 {len(students)} 名学生: {file_name}")
+        return self.cohorts[cohort_id].info()
+    
+    def _content_key(self, file_name):
+        if self.cache is not None:
+            return self.cache.key(file_name)['hash']
+        return file_hash(file_name)
+    
+    def _read(self, file_name):
+        students = StudentStore()
+        report = read_students(file_name, students, self.cache)
+        if report:
+            logging.warning(f"{file_name} 校验发现问题：\n{report.format()}")
+        if len(students) == 0:
+            raise ServiceError("没有读取到学生数据，请检查文件格式")
+        # 排名索引在载入时建立，之后的录取、推演直接使用
+        students.ranking_index()
+        return students
+    
+    def unload(self, cohort):
+        del self.cohorts[cohort.id]
+        return {'id': cohort.id, 'unloaded': True}
+    
+    async def allocate(self, cohort, request):
+        quotas = cohort.quotas(request.get('quotas'))
+        tiebreaks = self._tiebreaks(request)
+        loop = asyncio.get_running_loop()
+        async with cohort.lock:
+            admitted, adjusted, stats = await loop.run_in_executor(
+                None, cohort.run_allocation, quotas, tiebreaks
+            )
+            cohort.students.set_results(admitted, adjusted)
+            # 结果随统计信息一并返回，客户端不必再单独取回（期间可能被别人改掉）
+            stats['results_version'] = cohort.students.results_version
+            codes = cohort.students.result_codes().astype('<i2').tobytes()
+        stats['codes'] = base64.b64encode(codes).decode('ascii')
+        return stats
+    
+    async def query(self, cohort, query):
+        students = cohort.students
+        try:
+            offset = max(int(query.get('offset', 0)), 0)
+            limit = min(max(int(query.get('limit', QUERY_LIMIT)), 0), 10 * QUERY_LIMIT)
+        except ValueError:
+            raise ServiceError("offset、limit 必须是整数")
+        choice_labels = [str(label) for label in students.choice_labels]
+        result_labels = students.result_categories()
+        choice = query.get('choice')
+        result = query.get('result')
+        if choice is not None and choice not in choice_labels:
+            raise ServiceError(f"未知志愿选择：{choice}")
+        if result is not None and result not in result_labels:
+            raise ServiceError(f"未知录取专业：{result}")
+        
+        def search():
+            matches = cohort.index().search(
+                query.get('q', ''),
+                None if choice is None else choice_labels.index(choice),
+                None if result is None else result_labels.index(result)
+            )
+            rows = range(len(students)) if matches is None else matches.tolist()
+            return len(rows), [
+                dict(zip(StudentStore.COLUMNS, students.row(index)))
+                for index in rows[offset:offset + limit]
+            ]
+        
+        async with cohort.lock:
+            total, rows = await asyncio.get_running_loop().run_in_executor(None, search)
+        return {'total': total, 'offset': offset, 'rows': rows}
+    
+    @staticmethod
+    def _check_version(cohort, version):
+        """version 为客户端看到的结果版本，省略时不检查"""
+        if version is None:
+            return
+        try:
+            version = int(version)
+        except (TypeError, ValueError):
+            raise ServiceError("结果版本必须是整数")
+        if version != cohort.students.results_version:
+            raise ServiceError("录取结果已被其他客户端更新，请重新处理录取", 409)
+    
+    async def results(self, cohort, version=None):
+        async with cohort.lock:
+            self._check_version(cohort, version)
+            return cohort.students.result_codes().astype('<i2').tobytes()
+    
+    async def export(self, cohort, file_name, version=None):
+        if not file_name:
+            raise ServiceError("缺少 file")
+        file_name = os.path.abspath(file_name)
+        os.makedirs(os.path.dirname(file_name), exist_ok=True)
+        async with cohort.lock:
+            self._check_version(cohort, version)
+            await asyncio.get_running_loop().run_in_executor(None, write_results, file_name, cohort.students)
+        return {'file': file_name, 'rows': len(cohort.students)}
+    
+    async def snapshot(self, cohort):
+        """导出为列存文件（.adm）
+        
+        客户端可能正内存映射着上一份快照，原地改写会截断它正在读的文件；
+        因此先写入同目录下的临时文件，写完再用 os.replace 替换，已打开的映射仍指向旧文件。
+        """
+        os.makedirs(self.snapshot_dir, exist_ok=True)
+        file_name = os.path.abspath(os.path.join(self.snapshot_dir, f"{cohort.id}{FILE_SUFFIX}"))
+        handle, temp_name = tempfile.mkstemp(suffix=FILE_SUFFIX, dir=self.snapshot_dir)
+        os.close(handle)
+        try:
+            async with cohort.lock:
+                await asyncio.get_running_loop().run_in_executor(None, write_results, temp_name, cohort.students)
+            os.replace(temp_name, file_name)
+        except BaseException:
+            os.remove(temp_name)
+            raise
+        return {'file': file_name, 'rows': len(cohort.students)}
@@ -0,0 +1,92 @@
+"""录取服务（core/service.py）的客户端，只用标准库 urllib"""
+import base64
+import json
+import urllib.error
+import urllib.request
+from urllib.parse import quote, urlencode
+
+import numpy as np
+
+from core.service import DEFAULT_HOST, DEFAULT_PORT, ServiceError
+
+DEFAULT_URL = f'http://{DEFAULT_HOST}:{DEFAULT_PORT}'
+
+
+class ServiceClient:
+    """每个方法对应服务的一个接口，出错时抛出 ServiceError"""
+    
+    def __init__(self, url=DEFAULT_URL, timeout=600):
+        self.url = url.rstrip('/')
+        self.timeout = timeout
+    
+    def _request(self, method, path, payload=None):
+        data = None if payload is None else json.dumps(payload, ensure_ascii=False).encode('utf-8')
+        request = urllib.request.Request(self.url + path, data=data, method=method)
+        if data is not None:
+            request.add_header('Content-Type', 'application/json; charset=utf-8')
+        try:
+            with urllib.request.urlopen(request, timeout=self.timeout) as response:
+                body = response.read()
+                if response.headers.get_content_type() == 'application/octet-stream':
+                    return body
+                return json.loads(body.decode('utf-8'))
+        except urllib.error.HTTPError as e:
+            try:
+                message = json.loads(e.read().decode('utf-8'))['error']
+            except (ValueError, KeyError):
+                message = str(e)
+            raise ServiceError(message, e.code)
+        except urllib.error.URLError as e:
+            raise ServiceError(f"无法连接录取服务 {self.url}：{e.reason}", 503)
+    
+    def _cohort_path(self, cohort_id, action=''):
+        return f"/cohorts/{quote(cohort_id)}" + (f"/{action}" if action else '')
+    
+    def health(self):
+        return self._request('GET', '/health')
+    
+    def cohorts(self):
+        return self._request('GET', '/cohorts')
+    
+    def load(self, file_name):
+        """载入学生志愿文件（服务所在机器上的路径），返回该届学生的信息"""
+        return self._request('POST', '/cohorts', {'file': file_name})
+    
+    def unload(self, cohort_id):
+        return self._request('DELETE', self._cohort_path(cohort_id))
+    
+    def allocate(self, cohort_id, quotas, tiebreaks=None):
+        """录取并保存结果，返回 AdmissionCounters.summary() 形式的统计信息
+        
+        另含本次的结果版本 results_version，codes 为本次的录取专业编码数组（同 result_codes()）。
+        """
+        stats = self._request('POST', self._cohort_path(cohort_id, 'allocate'), {'quotas': quotas, 'tiebreaks': tiebreaks})
+        stats['codes'] = np.frombuffer(base64.b64decode(stats['codes']), dtype='<i2')
+        return stats
+    
+    def what_if(self, cohort_id, quotas, tiebreaks=None):
+        """名额推演，不改变已保存的结果"""
+        return self._request('POST', self._cohort_path(cohort_id, 'whatif'), {'quotas': quotas, 'tiebreaks': tiebreaks})
+    
+    def query(self, cohort_id, text='', choice=None, result=None, offset=0, limit=100):
+        params = {'q': text, 'offset': offset, 'limit': limit}
+        if choice is not None:
+            params['choice'] = choice
+        if result is not None:
+            params['result'] = result
+        return self._request('GET', self._cohort_path(cohort_id, 'students') + '?' + urlencode(params))
+    
+    def result_codes(self, cohort_id, version=None):
+        """录取专业编码数组，同 StudentStore.result_codes()；给定 version 时结果已更新则出错（409）"""
+        path = self._cohort_path(cohort_id, 'results')
+        if version is not None:
+            path += '?' + urlencode({'version': version})
+        return np.frombuffer(self._request('GET', path), dtype='<i2')
+    
+    def export(self, cohort_id, file_name, version=None):
+        """导出录取结果；给定 version 时结果已被别人更新则出错（409），不导出"""
+        return self._request('POST', self._cohort_path(cohort_id, 'export'), {'file': file_name, 'results_version': version})
+    
+    def snapshot(self, cohort_id):
+        """服务把该届学生写为列存文件，返回文件路径"""
+        return self._request('POST', self._cohort_path(cohort_id, 'snapshot'))['file']
@@ -0,0 +1,216 @@
+"""按列存储的学生数据"""
+import sys
+from array import array
+
+import numpy as np
+
+from core.allocation import NOT_PROCESSED, UNASSIGNED_CODE, UNASSIGNED, ADJUST_SUFFIX
+from core.preferences import MAJORS, PREFERENCE_MAPPING, preference_table
+from core.ranking import SCORE_TIEBREAKS, RankingIndex
+
+
+class StudentStore:
+    """学生数据列存储
+    
+    分数、序号、志愿代码、录取结果各存为一个定长数组，
+    学号、姓名存为驻留字符串列表，每名学生只占几十字节。
+    志愿选择和录取专业以整数编码，显示和导出时再还原为文字。
+    """
+    COLUMNS = ('序号', '学号', '姓名', '分数', '志愿选择', '录取专业')
+    
+    def __init__(self, majors=MAJORS, preference_mapping=PREFERENCE_MAPPING):
+        self.majors = list(majors)
+        self.preference_mapping = preference_mapping
+        # 志愿代码在前，导入时遇到的其它值（专业列表或无效值）依次追加在后
+        self.choice_labels = list(preference_mapping)
+        self._choice_codes = {label: code for code, label in enumerate(self.choice_labels)}
+        
+        self.ranks = array('q')
+        self.scores = array('d')
+        self.choices = array('h')
+        self.admitted = array('h')
+        self.adjusted = array('B')
+        self.student_ids = []
+        self.names = []
+        self._ranking = None
+        # set_results() 时递增，供依赖录取结果的缓存（如查找索引）判断是否过期
+        self.results_version = 0
+    
+    def __len__(self):
+        return len(self.scores)
+    
+    def append_batch(self, batch):
+        """追加一批导入的学生（core.validation.StudentBatch，已校验、按列保存）"""
+        columns = batch.columns
+        self.ranks.extend(columns['序号'])
+        self.student_ids.extend(map(sys.intern, columns['学号']))
+        self.names.extend(map(sys.intern, columns['姓名']))
+        self.scores.extend(columns['分数'])
+        self.choices.extend(map(self._encode_choice, columns['志愿选择']))
+        self.admitted.extend([NOT_PROCESSED] * len(batch))
+        self.adjusted.extend(bytes(len(batch)))
+    
+    def append_columns(self, ranks, student_ids, names, scores, choice_codes, choice_labels):
+        """按列追加（如从缓存读取），choice_codes 为 choice_labels 中的下标"""
+        remap = np.array([self._encode_choice(label) for label in choice_labels], dtype=np.int16)
+        self.ranks.frombytes(np.asarray(ranks, dtype=np.int64).tobytes())
+        self.student_ids.extend(map(sys.intern, student_ids))
+        self.names.extend(map(sys.intern, names))
+        self.scores.frombytes(np.asarray(scores, dtype=np.float64).tobytes())
+        self.choices.frombytes(remap[np.asarray(choice_codes, dtype=np.int64)].tobytes())
+        self.admitted.extend([NOT_PROCESSED] * len(student_ids))
+        self.adjusted.extend(bytes(len(student_ids)))
+    
+    def append_columnar(self, columns):
+        """追加列存文件（core.columnar.ColumnarFile）中的学生
+        
+        序号、分数、志愿编码从文件映射整块复制，不逐行创建 Python 对象。
+        """
+        self.append_columns(
+            columns.array('序号'),
+            columns.text('学号'),
+            columns.text('姓名'),
+            columns.array('分数'),
+            columns.array('志愿选择'),
+            columns.categories('志愿选择')
+        )
+    
+    def _encode_choice(self, label):
+        code = self._choice_codes.get(label)
+        if code is None:
+            # 原样保留，供显示和导出
+            code = len(self.choice_labels)
+            self.choice_labels.append(label)
+            self._choice_codes[label] = code
+        return code
+    
+    def scores_array(self):
+        """分数列的numpy视图（不复制）"""
+        return np.frombuffer(self.scores, dtype=np.float64)
+    
+    def choices_array(self):
+        """志愿代码列的numpy视图（不复制）"""
+        return np.frombuffer(self.choices, dtype=np.int16)
+    
+    def preference_matrix(self):
+        """每名学生的志愿矩阵，专业下标对应 self.majors"""
+        table = preference_table(self.choice_labels, self.majors, self.preference_mapping)
+        return table[self.choices_array()]
+    
+    def ranks_array(self):
+        """序号列的numpy视图（不复制）"""
+        return np.frombuffer(self.ranks, dtype=np.int64)
+    
+    def ranking_index(self, tiebreaks=SCORE_TIEBREAKS):
+        """按分数从高到低的排名索引，同分依次比较 tiebreaks 中的列和学号
+        
+        结果按 (人数, tiebreaks) 缓存：只追加学生，人数不变即数据未变，
+        重复录取和按分数排序表格时不再排序。
+        """
+        key = (len(self), tuple(tiebreaks))
+        if self._ranking is None or self._ranking[0] != key:
+            columns = {
+                '序号': self.ranks_array(),
+                '姓名': self.names,
+                '志愿选择': self.choices_array()
+            }
+            index = RankingIndex.build(
+                (self.scores_array(), True), columns, self.student_ids, tiebreaks
+            )
+            self._ranking = (key, index)
+        return self._ranking[1]
+    
+    def admitted_array(self):
+        """录取专业编码列的numpy视图（不复制）"""
+        return np.frombuffer(self.admitted, dtype=np.int16)
+    
+    def adjusted_array(self):
+        """调剂标记列复制为布尔数组
+        
+        与其它列不同，这里返回副本：调用方会保留上一次的调剂标记用于比较，
+        若是视图，底层 array 被引用期间无法再追加学生。
+        """
+        return np.frombuffer(self.adjusted, dtype=np.uint8).astype(bool)
+    
+    def set_results(self, admitted, adjusted):
+        """写入录取结果：admitted 为专业下标数组，adjusted 为是否调剂"""
+        self.admitted = array('h', np.asarray(admitted, dtype=np.int16).tobytes())
+        self.adjusted = array('B', np.asarray(adjusted, dtype=np.uint8).tobytes())
+        self.results_version += 1
+    
+    def set_result_codes(self, codes):
+        """按 result_codes() 的编码写入录取结果（如从录取服务取回的结果）"""
+        codes = np.asarray(codes, dtype=np.int64)
+        adjusted = codes >= 2 + len(self.majors)
+        admitted = codes - 2 - adjusted * len(self.majors)
+        admitted[codes == 0] = NOT_PROCESSED
+        admitted[codes == 1] = UNASSIGNED_CODE
+        self.set_results(admitted, adjusted)
+    
+    def result_label(self, index):
+        """第 index 名学生的录取专业文字"""
+        major = self.admitted[index]
+        if major == NOT_PROCESSED:
+            return ''
+        if major == UNASSIGNED_CODE:
+            return UNASSIGNED
+        if self.adjusted[index]:
+            return f"{self.majors[major]}{ADJUST_SUFFIX}"
+        return self.majors[major]
+    
+    def result_categories(self):
+        """录取专业的全部文字，下标即 result_codes() 的编码"""
+        return (
+            ['', UNASSIGNED] + self.majors
+            + [f"{major}{ADJUST_SUFFIX}" for major in self.majors]
+        )
+    
+    def result_codes(self, start=0, stop=None):
+        """[start, stop) 行录取专业的文字编码，与 result_label() 一致"""
+        admitted = self.admitted_array()[start:stop].astype(np.int64)
+        adjusted = np.frombuffer(self.adjusted, dtype=np.uint8)[start:stop]
+        codes = 2 + admitted + adjusted * len(self.majors)
+        codes[admitted == NOT_PROCESSED] = 0
+        codes[admitted == UNASSIGNED_CODE] = 1
+        return codes
+    
+    def columns(self, start=0, stop=None):
+        """按 COLUMNS 顺序返回 [start, stop) 行的各列列表，与 row() 的值相同"""
+        choice_labels = np.array(self.choice_labels, dtype=object)
+        result_labels = np.array(self.result_categories(), dtype=object)
+        return (
+            self.ranks[start:stop].tolist(),
+            self.student_ids[start:stop],
+            self.names[start:stop],
+            self.scores[start:stop].tolist(),
+            choice_labels[self.choices_array()[start:stop]].tolist(),
+            result_labels[self.result_codes(start, stop)].tolist()
+        )
+    
+    def to_frame(self):
+        """转换为 AdmissionAlgorithm 使用的 DataFrame，序号即排名"""
+        import pandas as pd
+        
+        return pd.DataFrame({
+            '学号': self.student_ids,
+            '姓名': self.names,
+            '排名': self.ranks_array().copy(),
+            '分数': self.scores_array().copy(),
+            '志愿选择': np.array(self.choice_labels, dtype=object)[self.choices_array()]
+        })
+    
+    def row(self, index):
+        """按 COLUMNS 顺序返回一行"""
+        return (
+            self.ranks[index],
+            self.student_ids[index],
+            self.names[index],
+            self.scores[index],
+            self.choice_labels[self.choices[index]],
+            self.result_label(index)
+        )
+    
+    def iter_rows(self, start=0, stop=None):
+        """按导入顺序逐行产出"""
+        for index in range(start, len(self) if stop is None else stop):
+            yield self.row(index)
@@ -0,0 +1,282 @@
+"""表头映射与数据校验
+
+三种表格格式（csv/xlsx/xls）都按表头找列，不依赖列的位置；每列可有多个别名
+（如 2023 年数据中的 排名/成绩/选课选项）。
+
+校验按批、按列进行：每一批先整列转换（分数、序号整列转为浮点数，
+志愿选择只对不重复的值解析一次），再用掩码一次找出所有问题行，
+有问题的行记入报告而不是中止导入：
+
+- 缺少学号、分数缺失或不是数字的行无法参与录取，不导入
+- 学号重复、缺少姓名、序号无效、志愿缺失或无法识别的行照常导入，只在报告中提示
+  （志愿无效的学生按原规则参加调剂）
+"""
+import csv
+from itertools import repeat
+from operator import itemgetter
+
+import numpy as np
+
+from core.preferences import MAJORS, PREFERENCE_MAPPING, parse_preferences
+
+# 字段 -> 可用的表头，按优先顺序
+COLUMN_ALIASES = {
+    '序号': ('序号', '排名', '编号'),
+    '学号': ('学号', '考生号'),
+    '姓名': ('姓名',),
+    '分数': ('分数', '成绩', '总分', 'GPA'),
+    '志愿选择': ('志愿选择', '选课选项', '志愿代码', '志愿')
+}
+# 序号可省略，省略时按行号排列
+REQUIRED_COLUMNS = ('学号', '姓名', '分数', '志愿选择')
+REPORT_HEADERS = ['行号', '列', '值', '问题', '处理']
+# 出错后的处理方式
+SKIPPED = '未导入'
+IMPORTED = '已导入'
+
+
+def _text(value):
+    """单元格值转为字符串，xls中的整数会被读成浮点数，需去掉多余的.0"""
+    if value is None:
+        return ''
+    if isinstance(value, float) and value.is_integer():
+        value = int(value)
+    return str(value)
+
+
+def _texts(values):
+    """整列转为字符串；csv 读出的列本来就全是字符串，不再逐个转换"""
+    if set(map(type, values)) <= {str}:
+        return values
+    return [_text(value) for value in values]
+
+
+def _column(rows, index):
+    """取出各行的第 index 列，较短的行（行尾为空）取 None"""
+    try:
+        return list(map(itemgetter(index), rows))
+    except IndexError:
+        return [row[index] if index < len(row) else None for row in rows]
+
+
+def _header(value):
+    # csv 以 utf-8 打开时第一个表头可能带 BOM
+    return _text(value).strip().lstrip('\ufeff').upper()
+
+
+def map_columns(headers):
+    """表头 -> {字段: 列下标}；同一字段有多列符合时取别名优先、位置靠前的一列
+    
+    缺少必需的列时抛出 ValueError，列出全部缺少的列及其可用的表头。
+    """
+    positions = {}
+    for index, header in enumerate(headers):
+        positions.setdefault(_header(header), index)
+    
+    columns = {}
+    for field, aliases in COLUMN_ALIASES.items():
+        found = [positions[alias.upper()] for alias in aliases if alias.upper() in positions]
+        if found:
+            columns[field] = found[0]
+    
+    missing = [field for field in REQUIRED_COLUMNS if field not in columns]
+    if missing:
+        raise ValueError("缺少列：" + "；".join(
+            f"{field}（可用表头：{'、'.join(COLUMN_ALIASES[field])}）" for field in missing
+        ))
+    return columns
+
+
+def _missing(values):
+    """空单元格（None 或空字符串）的掩码"""
+    array = np.array(values, dtype=object)
+    return np.equal(array, None) | (array == '')
+
+
+def _to_float(values):
+    """整列转为浮点数，无法转换的为 NaN；整列都合法时不逐个处理"""
+    try:
+        return np.array(values, dtype=np.float64)
+    except (TypeError, ValueError):
+        return np.array([_float_or_nan(value) for value in values], dtype=np.float64)
+
+
+def _float_or_nan(value):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return np.nan
+
+
+class ValidationReport:
+    """校验发现的全部问题，每项为 (行号, 列, 值, 问题, 处理)
+    
+    行号与表格软件中显示的一致（表头为第 1 行）。
+    """
+    
+    def __init__(self):
+        self.issues = []
+        self.rows = 0       # 校验过的行数（不含空行）
+        self.skipped = 0    # 因错误未导入的行数
+    
+    def __len__(self):
+        return len(self.issues)
+    
+    def add(self, column, rows, values, problem, action=IMPORTED):
+        self.issues.extend(zip(rows, repeat(column), values, repeat(problem), repeat(action)))
+    
+    def sorted_issues(self):
+        return sorted(self.issues, key=lambda issue: issue[0])
+    
+    def counts(self):
+        """(列, 问题, 处理) -> 行数，按第一次出现的顺序"""
+        counts = {}
+        for _, column, _, problem, action in self.issues:
+            key = (column, problem, action)
+            counts[key] = counts.get(key, 0) + 1
+        return counts
+    
+    def format(self, limit=20):
+        """生成报告文本：各类问题的行数，以及最前面 limit 个问题"""
+        text = f"共检查 {self.rows} 行，{self.skipped} 行因错误未导入，发现 {len(self)} 个问题\n"
+        for (column, problem, action), count in self.counts().items():
+            text += f"  {column}：{problem} {count} 行（{action}）\n"
+        if self.issues:
+            text += "\n"
+            for row, column, value, problem, action in self.sorted_issues()[:limit]:
+                text += f"第 {row} 行 {column}：{problem}（{_text(value) or '空'}）\n"
+            if len(self) > limit:
+                text += f"……另有 {len(self) - limit} 个问题\n"
+        return text.rstrip('\n')
+    
+    def write(self, file_name):
+        """写出完整报告（csv）"""
+        with open(file_name, 'w', encoding='utf-8-sig', newline='') as f:
+            writer = csv.writer(f)
+            writer.writerow(REPORT_HEADERS)
+            writer.writerows(self.sorted_issues())
+
+
+class StudentBatch:
+    """一批已校验的学生，按列保存
+    
+    columns 为 字段 -> 列表：序号（整数）、学号、姓名（字符串）、分数（浮点数）、志愿选择（字符串）。
+    """
+    
+    def __init__(self, columns):
+        self.columns = columns
+    
+    def __len__(self):
+        return len(self.columns['学号'])
+
+
+class StudentValidator:
+    """逐批校验同一个文件的各行，问题累积在 report 中
+    
+    学号是否重复跨批次检查，因此同一文件的各批须用同一个 StudentValidator。
+    """
+    
+    def __init__(self, majors=MAJORS, preference_mapping=PREFERENCE_MAPPING):
+        self.majors = list(majors)
+        self.preference_mapping = preference_mapping
+        self.report = ValidationReport()
+        self.columns = None
+        self._seen_ids = {}
+        self._choices = {}  # 志愿文字 -> 是否可识别
+    
+    def map_columns(self, headers):
+        self.columns = map_columns(headers)
+    
+    def _choice_valid(self, label):
+        valid = self._choices.get(label)
+        if valid is None:
+            valid = parse_preferences(label, self.preference_mapping, self.majors) is not None
+            self._choices[label] = valid
+        return valid
+    
+    def _duplicates(self, student_ids, rows):
+        """与之前各行（含本批）学号重复的位置及其第一次出现的行号"""
+        seen = self._seen_ids
+        added = dict(zip(student_ids, rows))
+        if len(added) == len(student_ids) and seen.keys().isdisjoint(added):
+            seen.update(added)
+            return [], []
+        positions, first_rows = [], []
+        for position, (student_id, row) in enumerate(zip(student_ids, rows)):
+            first = seen.setdefault(student_id, row)
+            if first != row:
+                positions.append(position)
+                first_rows.append(first)
+        return positions, first_rows
+    
+    def validate(self, rows, first_row):
+        """rows 为原始行（单元格值的序列），first_row 为第一行的行号；返回 StudentBatch"""
+        report = self.report
+        numbers = np.arange(first_row, first_row + len(rows))
+        raw = {field: _column(rows, index) for field, index in self.columns.items()}
+        missing = {field: _missing(values) for field, values in raw.items()}
+        # 所有字段都为空的行视为空行，直接跳过，不报告
+        keep = ~np.logical_and.reduce(list(missing.values()))
+        report.rows += int(keep.sum())
+        
+        def flag(field, mask, problem, action=IMPORTED, values=None):
+            positions = np.flatnonzero(mask & keep)
+            if len(positions):
+                source = raw[field] if values is None else values
+                report.add(field, numbers[positions].tolist(), [source[i] for i in positions], problem, action)
+            return positions
+        
+        # 不能导入的行
+        scores = _to_float(raw['分数'])
+        unusable = missing['学号'] | ~np.isfinite(scores)
+        flag('学号', missing['学号'], '缺少学号', SKIPPED)
+        flag('分数', missing['分数'], '缺少分数', SKIPPED)
+        flag('分数', ~missing['分数'] & ~np.isfinite(scores), '分数不是数字', SKIPPED)
+        report.skipped += int((unusable & keep).sum())
+        keep &= ~unusable
+        
+        student_ids = _texts(raw['学号'])
+        names = _texts(raw['姓名'])
+        flag('姓名', missing['姓名'], '缺少姓名')
+        
+        if '序号' in raw:
+            ranks = _to_float(raw['序号'])
+            invalid = ~np.isfinite(ranks) | (ranks != np.round(ranks))
+            flag('序号', invalid, '序号不是整数，按行号处理')
+            # 与原来一致：无法解析的序号用数据行的顺序代替
+            ranks = np.where(invalid, numbers - 1, ranks).astype(np.int64)
+        else:
+            ranks = numbers - 1
+        
+        # 志愿代码不区分大小写；不同的值只有几种，每种只解析一次
+        labels = {value: _text(value).strip().upper() for value in set(raw['志愿选择'])}
+        choices = list(map(labels.__getitem__, raw['志愿选择']))
+        invalid_labels = {label for label in labels.values() if label and not self._choice_valid(label)}
+        flag('志愿选择', missing['志愿选择'], '缺少志愿，参加调剂')
+        if invalid_labels:
+            invalid = np.fromiter((choice in invalid_labels for choice in choices), dtype=bool, count=len(choices))
+            flag('志愿选择', invalid, '无法识别的志愿，参加调剂')
+        
+        positions = np.flatnonzero(keep)
+        if len(positions) < len(rows):
+            pick = positions.tolist()
+            student_ids = [student_ids[i] for i in pick]
+            names = [names[i] for i in pick]
+            choices = [choices[i] for i in pick]
+        kept_numbers = numbers[positions].tolist()
+        
+        duplicates, first_rows = self._duplicates(student_ids, kept_numbers)
+        if duplicates:
+            report.add(
+                '学号', [kept_numbers[i] for i in duplicates],
+                [f"{student_ids[i]}（同第 {first} 行）" for i, first in zip(duplicates, first_rows)],
+                '学号重复'
+            )
+        
+        return StudentBatch({
+            '序号': ranks[positions].tolist(),
+            '学号': student_ids,
+            '姓名': names,
+            '分数': scores[positions].tolist(),
+            '志愿选择': choices
+        })
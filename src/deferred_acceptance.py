@@ -0,0 +1,192 @@
+"""
+Student-proposing deferred acceptance with per-major priorities.
+
+AdmissionAlgorithm admits in one global ranking shared by every major. Here
+each major may rank applicants on its own key (for example a subject score),
+and the result is the student-optimal stable matching.
+
+Every major keeps its tentatively accepted applicants in a bounded heap whose
+top is the worst-ranked holder, so a proposal costs O(log quota) and the run
+O(n x k log q). The first round is vectorized: each major keeps the best
+``quota`` of its first-choice applicants in one partition, and only rejected
+students go through the heap loop. When every major uses the shared ranking
+the stable matching is exactly serial dictatorship, so the results equal
+``AdmissionAlgorithm.process_admissions``.
+"""
+import heapq
+
+import numpy as np
+
+from admission_algorithm import AdmissionAlgorithm
+from core.instrumentation import span
+from core.preferences import NO_MAJOR
+from core.ranking import parse_tiebreak, rank_order
+
+
+class DeferredAcceptance:
+    """Stable matching between students and majors with major-side priorities."""
+    
+    def __init__(self, quotas, priorities=None, preference_mapping=None, tiebreaks=None):
+        """
+        Args:
+            quotas (dict): Seats per major.
+            priorities (dict): major -> column ranking its applicants, with a
+                leading '-' for descending (e.g. ``'-数学'``: higher is better).
+                Ties fall back to the shared ranking. Majors left out use the
+                shared ranking (排名, then ``tiebreaks``, then 学号).
+            preference_mapping (dict): Preference codes, as in AdmissionAlgorithm.
+            tiebreaks (tuple): Tiebreak columns of the shared ranking, as in
+                AdmissionAlgorithm.
+        """
+        self.algorithm = AdmissionAlgorithm(quotas, preference_mapping, tiebreaks)
+        self.priorities = dict(priorities or {})
+    
+    def process_admissions(self, student_data, ranking=None):
+        """
+        Match students to majors.
+        
+        Args:
+            student_data (pd.DataFrame): Columns ['学号', '排名', '志愿选择'] (or
+                '志愿列表') plus every column named in ``priorities``.
+            ranking (RankingIndex): Shared ranking from
+                ``AdmissionAlgorithm.ranking_index``, to skip sorting on reruns.
+        
+        Returns:
+            pd.DataFrame: Students in shared rank order with '录取专业', like
+            ``AdmissionAlgorithm.process_admissions``.
+        """
+        algorithm = self.algorithm
+        with span('sort', rows=len(student_data), reused=ranking is not None):
+            sorted_students = algorithm.sort_students(student_data, ranking)
+        with span('encode', rows=len(sorted_students)):
+            majors, prefs = algorithm.encode_sorted(sorted_students)
+            priority = self.priority_positions(sorted_students, majors)
+        remaining = np.array([algorithm.remaining_quotas.get(major, 0) for major in majors], dtype=np.int64)
+        
+        with span('allocate', rows=len(prefs), majors=len(majors)):
+            admitted = deferred_acceptance(prefs, priority, remaining)
+        
+        for i, major in enumerate(majors):
+            algorithm.remaining_quotas[major] = int(remaining[i])
+        
+        labels = np.array(majors + [AdmissionAlgorithm.UNASSIGNED], dtype=object)
+        results = sorted_students.copy()
+        results['录取专业'] = labels[admitted].tolist() if len(admitted) else ''
+        return results
+    
+    def priority_positions(self, sorted_students, majors):
+        """
+        Rank position of every student at every major (0 is best).
+        
+        Students are in shared rank order, so the shared ranking is simply
+        ``arange(n)``; a custom key is tie-broken by that position.
+        
+        Returns:
+            np.ndarray: ``(len(majors), n_students)`` int64 positions.
+        """
+        unknown = set(self.priorities) - set(majors)
+        if unknown:
+            raise KeyError(f"Priorities given for unknown majors: {sorted(unknown)}")
+        
+        n = len(sorted_students)
+        shared = np.arange(n, dtype=np.int64)
+        priority = np.empty((len(majors), n), dtype=np.int64)
+        # Majors that share a key share one sort
+        by_key = {}
+        for m, major in enumerate(majors):
+            key = self.priorities.get(major)
+            if key is None:
+                priority[m] = shared
+                continue
+            if key not in by_key:
+                column, descending = parse_tiebreak(key)
+                order = rank_order([(sorted_students[column].to_numpy(), descending), (shared, False)])
+                by_key[key] = np.empty(n, dtype=np.int64)
+                by_key[key][order] = shared
+            priority[m] = by_key[key]
+        return priority
+    
+    def get_remaining_quotas(self):
+        """Return the remaining quotas for each major."""
+        return self.algorithm.get_remaining_quotas()
+    
+    def reset_quotas(self):
+        """Reset the remaining quotas to their original values."""
+        self.algorithm.reset_quotas()
+
+
+def deferred_acceptance(prefs, priority, remaining):
+    """
+    Student-proposing deferred acceptance over an integer preference matrix.
+    
+    Args:
+        prefs (np.ndarray): ``(n_students, n_prefs)`` major indices, padded
+            with NO_MAJOR.
+        priority (np.ndarray): ``(n_majors, n_students)`` rank position of each
+            student at each major, unique per major, lower is better.
+        remaining (np.ndarray): Seats per major, updated in place.
+    
+    Returns:
+        np.ndarray: Admitted major index per student, -1 when unassigned.
+    """
+    n, width = prefs.shape
+    n_majors = len(remaining)
+    capacity = remaining.copy()
+    # Student holding each position, to map a heap entry back to a student
+    holder = np.empty_like(priority)
+    for m in range(n_majors):
+        holder[m][priority[m]] = np.arange(n)
+    
+    # Round one: every major keeps the best ``capacity`` first-choice applicants
+    first = prefs[:, 0].astype(np.int64) if width else np.full(n, NO_MAJOR, dtype=np.int64)
+    heaps = []
+    rejected = []
+    for m in range(n_majors):
+        applicants = np.flatnonzero(first == m)
+        positions = priority[m][applicants]
+        keep = int(min(capacity[m], len(applicants)))
+        if keep < len(applicants):
+            split = np.argpartition(positions, keep)
+            rejected.append(applicants[split[keep:]])
+            positions = positions[split[:keep]]
+        # Max-heap of positions via negation: heap[0] is the worst holder
+        heap = (-positions).tolist()
+        heapq.heapify(heap)
+        heaps.append(heap)
+    
+    # Later rounds: a rejected student proposes down their list until held.
+    # Memoryviews index scalars about twice as fast as numpy arrays here.
+    next_choice = np.ones(n, dtype=np.int64)
+    prefs_view = memoryview(np.ascontiguousarray(prefs, dtype=np.int64))
+    priority_view = memoryview(np.ascontiguousarray(priority))
+    holder_view = memoryview(holder)
+    next_view = memoryview(next_choice)
+    capacity_list = capacity.tolist()
+    
+    free = np.concatenate(rejected).tolist() if rejected else []
+    while free:
+        student = free.pop()
+        choice = next_view[student]
+        while choice < width:
+            major = prefs_view[student, choice]
+            choice += 1
+            if major == NO_MAJOR:
+                choice = width
+                break
+            heap = heaps[major]
+            key = -priority_view[major, student]
+            if len(heap) < capacity_list[major]:
+                heapq.heappush(heap, key)
+                break
+            if heap and key > heap[0]:
+                # Displace the worst holder, who proposes again
+                next_view[student] = choice
+                student = holder_view[major, -heapq.heapreplace(heap, key)]
+                choice = next_view[student]
+        next_view[student] = choice
+    
+    admitted = np.full(n, -1, dtype=np.int64)
+    for m, heap in enumerate(heaps):
+        admitted[holder[m][-np.array(heap, dtype=np.int64)]] = m
+        remaining[m] = capacity[m] - len(heap)
+    return admitted
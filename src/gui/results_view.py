@@ -0,0 +1,199 @@
+"""虚拟化的录取结果表格"""
+import tkinter as tk
+from tkinter import ttk
+
+import numpy as np
+
+from core.instrumentation import span
+
+
+class VirtualResultsTable:
+    """只为可见行创建Treeview条目的结果表格
+    
+    表格始终只保留一屏的条目，滚动、排序时改写这些条目的内容，
+    因此无论加载多少学生，界面中的条目数量都不变。
+    """
+    COLUMN_WIDTHS = {'序号': 50, '学号': 100, '姓名': 100, '分数': 80, '志愿选择': 80, '录取专业': 150}
+    # 第一次点击时按降序排列的列
+    DESCENDING_FIRST = ('分数',)
+    
+    def __init__(self, parent, store):
+        self.store = store
+        self.order = None  # 当前显示顺序（学生下标数组），None 表示导入顺序
+        self.sort_order = None  # 排序后的全部学生下标，None 表示未排序
+        self.filter_rows = None  # 筛选出的学生下标（升序），None 表示不筛选
+        self.offset = 0
+        self.page_size = 20
+        self.sort_column = None
+        self.sort_reverse = False
+        
+        self._slots = []        # 当前创建的条目id
+        self._slot_rows = []    # 每个条目显示的学生下标
+        self._slot_values = []  # 每个条目当前的内容，用于跳过未变化的条目
+        
+        columns = store.COLUMNS
+        self.tree = ttk.Treeview(parent, columns=columns, show="headings")
+        for column in columns:
+            self.tree.heading(column, text=column, command=lambda c=column: self.sort_by(c))
+            self.tree.column(column, width=self.COLUMN_WIDTHS[column])
+        
+        # 滚动条驱动显示窗口的起始行，而不是Treeview本身
+        self.scrollbar = ttk.Scrollbar(parent, orient=tk.VERTICAL, command=self._on_scrollbar)
+        
+        self.tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        self.scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        
+        self.tree.bind('<Configure>', self._on_resize)
+        self.tree.bind('<MouseWheel>', self._on_mousewheel)
+        self.tree.bind('<Button-4>', lambda event: self.scroll(-3))
+        self.tree.bind('<Button-5>', lambda event: self.scroll(3))
+    
+    def set_store(self, store):
+        """切换到新的数据（例如重新导入后），清除排序"""
+        self.store = store
+        self.order = None
+        self.sort_order = None
+        self.filter_rows = None
+        self.offset = 0
+        self.sort_column = None
+        self._update_headings()
+        self.render()
+    
+    def set_filter(self, rows):
+        """只显示 rows 中的学生（升序下标数组），None 显示全部；保持当前排序"""
+        self.filter_rows = rows
+        self._update_order()
+        self.offset = 0
+        self.render()
+    
+    def _update_order(self):
+        if self.filter_rows is None:
+            self.order = self.sort_order
+        elif self.sort_order is None:
+            self.order = self.filter_rows
+        else:
+            # 按排序后的顺序取出筛选出的学生
+            selected = np.zeros(len(self.store), dtype=bool)
+            selected[self.filter_rows] = True
+            self.order = self.sort_order[selected[self.sort_order]]
+    
+    def row_count(self):
+        return len(self.store) if self.order is None else len(self.order)
+    
+    def render(self):
+        """刷新可见窗口，内容未变化的条目不做任何操作"""
+        with span('render') as record:
+            total = self.row_count()
+            self.offset = max(0, min(self.offset, total - self.page_size))
+            positions = range(self.offset, min(self.offset + self.page_size, total))
+            rows = list(positions) if self.order is None else self.order[positions.start:positions.stop].tolist()
+            
+            # 条目数量随窗口高度增减
+            while len(self._slots) < len(rows):
+                self._slots.append(self.tree.insert("", tk.END))
+                self._slot_values.append(None)
+            while len(self._slots) > len(rows):
+                self.tree.delete(self._slots.pop())
+                self._slot_values.pop()
+            
+            for slot, index in enumerate(rows):
+                values = self.store.row(index)
+                if values != self._slot_values[slot]:
+                    self.tree.item(self._slots[slot], values=values)
+                    self._slot_values[slot] = values
+            self._slot_rows = rows
+            record['rows'] = len(rows)
+            
+            if total:
+                self.scrollbar.set(self.offset / total, min(1.0, (self.offset + self.page_size) / total))
+            else:
+                self.scrollbar.set(0.0, 1.0)
+    
+    def results_changed(self, previous_admitted, previous_adjusted):
+        """录取结果更新后调用，只改写录取专业发生变化的可见行，返回变化的人数"""
+        admitted = self.store.admitted_array()
+        adjusted = self.store.adjusted_array()
+        if len(previous_admitted) != len(admitted):
+            changed = np.ones(len(admitted), dtype=bool)
+        else:
+            changed = (admitted != previous_admitted) | (adjusted != previous_adjusted)
+        
+        if self.sort_column == '录取专业':
+            # 排序依据变化，需要重新排序
+            self._apply_sort()
+            self.render()
+        else:
+            for slot, index in enumerate(self._slot_rows):
+                if changed[index]:
+                    values = self.store.row(index)
+                    self.tree.set(self._slots[slot], '录取专业', values[-1])
+                    self._slot_values[slot] = values
+        return int(np.count_nonzero(changed))
+    
+    def sort_by(self, column):
+        """按列排序，再次点击同一列时反向"""
+        if column == self.sort_column:
+            self.sort_reverse = not self.sort_reverse
+        else:
+            self.sort_column = column
+            self.sort_reverse = column in self.DESCENDING_FIRST
+        self._apply_sort()
+        self.offset = 0
+        self.render()
+    
+    def _apply_sort(self):
+        with span('sort_view', rows=self.row_count(), column=self.sort_column):
+            if self.sort_column == '分数':
+                # 直接取排名索引（同分按序号、学号），首次之后不再排序
+                order = self.store.ranking_index().order[::-1]
+            else:
+                order = np.argsort(self._sort_key(self.sort_column), kind='stable')
+        self.sort_order = order[::-1] if self.sort_reverse else order
+        self._update_order()
+        self._update_headings()
+    
+    def _sort_key(self, column):
+        store = self.store
+        if column == '序号':
+            return store.ranks_array()
+        if column == '志愿选择':
+            return store.choices_array()
+        if column == '录取专业':
+            # 同一专业正常录取在前、调剂在后，未分配和未处理的排在最后
+            admitted = store.admitted_array().astype(np.int64)
+            return np.where(
+                admitted >= 0,
+                admitted * 2 + store.adjusted_array(),
+                len(store.majors) * 2 - admitted
+            )
+        return np.array(store.student_ids if column == '学号' else store.names)
+    
+    def _update_headings(self):
+        for column in self.store.COLUMNS:
+            text = column
+            if column == self.sort_column:
+                text += ' ▼' if self.sort_reverse else ' ▲'
+            self.tree.heading(column, text=text)
+    
+    def scroll(self, rows):
+        self.offset += rows
+        self.render()
+        return 'break'
+    
+    def _on_scrollbar(self, action, value, unit=None):
+        if action == tk.MOVETO:
+            self.offset = int(float(value) * self.row_count())
+        elif action == tk.SCROLL:
+            self.offset += int(value) * (self.page_size if unit == tk.PAGES else 1)
+        self.render()
+    
+    def _on_mousewheel(self, event):
+        return self.scroll(-3 if event.delta > 0 else 3)
+    
+    def _on_resize(self, event):
+        row_height = int(ttk.Style().lookup('Treeview', 'rowheight') or 20)
+        # 减去表头占用的一行
+        page_size = max(1, event.height // row_height - 1)
+        if page_size != self.page_size:
+            self.page_size = page_size
+            self.render()
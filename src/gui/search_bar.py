@@ -0,0 +1,106 @@
+"""学号/姓名查找，按志愿选择、录取专业筛选"""
+import tkinter as tk
+from tkinter import ttk
+
+from core.search import StudentIndex
+
+
+class SearchBar:
+    """查找条件改变后筛选结果表格
+    
+    输入学号时精确查找，否则按姓名前缀查找；索引见 core/search.py，
+    第一次查找时建立，表格只改变显示的学生，不重建条目。
+    """
+    ALL = '全部'
+    # 输入停顿后再查找，连续输入时不逐字查找
+    DEBOUNCE_MS = 200
+    
+    def __init__(self, parent, results_view):
+        self.results_view = results_view
+        self.index = None
+        self._pending = None
+        
+        self.text_var = tk.StringVar()
+        self.choice_var = tk.StringVar(value=self.ALL)
+        self.result_var = tk.StringVar(value=self.ALL)
+        
+        ttk.Label(parent, text="学号/姓名").pack(side=tk.LEFT, padx=(0, 5))
+        entry = ttk.Entry(parent, textvariable=self.text_var, width=20)
+        entry.pack(side=tk.LEFT, padx=5)
+        entry.bind('<Return>', lambda event: self.apply())
+        self.text_var.trace_add('write', lambda *args: self._schedule())
+        
+        ttk.Label(parent, text="志愿选择").pack(side=tk.LEFT, padx=(10, 5))
+        # 下拉时再读取可选值，导入新数据后无需手动更新
+        self.choice_box = ttk.Combobox(
+            parent, textvariable=self.choice_var, state='readonly', width=12,
+            postcommand=lambda: self.choice_box.configure(values=[self.ALL] + self._choice_labels())
+        )
+        self.choice_box.pack(side=tk.LEFT, padx=5)
+        self.choice_box.bind('<<ComboboxSelected>>', lambda event: self.apply())
+        
+        ttk.Label(parent, text="录取专业").pack(side=tk.LEFT, padx=(10, 5))
+        self.result_box = ttk.Combobox(
+            parent, textvariable=self.result_var, state='readonly', width=18,
+            postcommand=lambda: self.result_box.configure(values=[self.ALL] + self._result_labels())
+        )
+        self.result_box.pack(side=tk.LEFT, padx=5)
+        self.result_box.bind('<<ComboboxSelected>>', lambda event: self.apply())
+        
+        ttk.Button(parent, text="清除", command=self.clear).pack(side=tk.LEFT, padx=10)
+        self.count_label = ttk.Label(parent, text="")
+        self.count_label.pack(side=tk.LEFT, padx=5)
+    
+    @property
+    def store(self):
+        return self.results_view.store
+    
+    def _choice_labels(self):
+        return [str(label) for label in self.store.choice_labels]
+    
+    def _result_labels(self):
+        # 第一个为未处理（空白），不作为筛选项
+        return self.store.result_categories()[1:]
+    
+    def _schedule(self):
+        widget = self.count_label
+        if self._pending is not None:
+            widget.after_cancel(self._pending)
+        self._pending = widget.after(self.DEBOUNCE_MS, self.apply)
+    
+    def apply(self):
+        """按当前条件筛选表格"""
+        self._pending = None
+        store = self.store
+        if self.index is None or self.index.store is not store:
+            self.index = StudentIndex(store)
+        
+        choice = self.choice_var.get()
+        choice_labels = self._choice_labels()
+        result = self.result_var.get()
+        result_labels = self._result_labels()
+        rows = self.index.search(
+            self.text_var.get(),
+            choice_labels.index(choice) if choice in choice_labels else None,
+            # result_categories() 的下标，_result_labels() 跳过了第一个
+            result_labels.index(result) + 1 if result in result_labels else None
+        )
+        self.results_view.set_filter(rows)
+        self.count_label.configure(text="" if rows is None else f"找到 {len(rows)} 人")
+    
+    def clear(self):
+        """清除条件，显示全部学生"""
+        self.text_var.set('')
+        self.choice_var.set(self.ALL)
+        self.result_var.set(self.ALL)
+        self.apply()
+    
+    def reset(self):
+        """数据更换后调用：丢弃旧索引并清除条件"""
+        self.index = None
+        self.clear()
+    
+    def refresh(self):
+        """录取结果变化后调用：有筛选条件时重新筛选"""
+        if self.results_view.filter_rows is not None:
+            self.apply()
@@ -1,30 +1,50 @@
+import time
+
+# 启动计时起点，放在其它导入之前，统计模块导入与窗口创建的总用时
+STARTUP_BEGIN = time.perf_counter()
+
 import os
-import csv
 import sys
 import traceback
 import logging
 import tkinter as tk
 from tkinter import ttk, filedialog, messagebox
-from PIL import Image, ImageTk
-import xlrd  # 用于读取Excel文件
-from openpyxl import Workbook  # 替换xlwt，使用openpyxl
-from openpyxl import load_workbook  # 用于读取xlsx格式
-from collections import defaultdict
+
+# 将src目录加入模块搜索路径，以便导入共享的core模块
+SRC_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if SRC_DIR not in sys.path:
+    sys.path.insert(0, SRC_DIR)
+
+from core import instrumentation
+from core.allocation import AdmissionCounters, allocate, format_summary
+from core.cache import CohortCache
+from core.exporter import write_results, COLUMNAR_SUFFIX
+from core.importer import is_columnar, iter_student_batches, load_columnar
+from core.validation import StudentValidator, ValidationReport
+from core.preferences import MAJORS
+from core.run_diff import ResultSet, diff_runs, format_diff, write_diff
+from core.store import StudentStore
+from gui.results_view import VirtualResultsTable
+from gui.search_bar import SearchBar
+from gui.stats_panel import AdmissionStatsPanel
+from gui.timing_view import TimingView
+from gui.worker import BackgroundTask
+
+# 预先缩放好的LOGO（由 convert_logo.py 生成）
+LOGO_WIDTH = 250
+LOGO_FILE = f'logo_{LOGO_WIDTH}.png'
 
 # 设置日志
 def setup_logging():
+    # 日志经队列由后台线程写入 logs/app.log，各阶段耗时写入 logs/timings.jsonl
     log_dir = os.path.join(os.path.dirname(os.path.abspath(sys.argv[0])), 'logs')
-    os.makedirs(log_dir, exist_ok=True)
-    log_file = os.path.join(log_dir, 'app.log')
-    
-    logging.basicConfig(
-        level=logging.DEBUG,
-        format='%(asctime)s - %(levelname)s - %(message)s',
-        handlers=[
-            logging.FileHandler(log_file, encoding='utf-8'),
-            logging.StreamHandler()
-        ]
-    )
+    instrumentation.setup_logging(log_dir)
+
+def report_startup():
+    """窗口显示完毕、可以响应操作时记录启动用时"""
+    seconds = time.perf_counter() - STARTUP_BEGIN
+    instrumentation.RECORDER.record('startup', seconds)
+    logging.info(f"启动用时: {seconds:.3f} 秒")
 
 def get_resource_path(relative_path):
     """获取资源文件的绝对路径"""
@@ -37,46 +57,98 @@ def get_resource_path(relative_path):
     
     return os.path.join(base_path, relative_path)
 
+def parse_args(argv=None):
+    import argparse
+    
+    parser = argparse.ArgumentParser(description="本科生专业方向录取软件")
+    parser.add_argument(
+        '--service', metavar='URL',
+        help="作为本机录取服务（src/admission_service.py）的客户端运行，如 http://127.0.0.1:8765"
+    )
+    return parser.parse_args(argv)
+
+def connect_service(url):
+    """连接录取服务，连接失败时返回 None（改为在本程序中处理）"""
+    # 只在客户端模式下导入，不影响普通启动的速度
+    from core.service_client import ServiceClient
+    
+    client = ServiceClient(url)
+    try:
+        client.health()
+    except Exception as e:
+        logging.warning(f"无法连接录取服务: {str(e)}")
+        messagebox.showwarning("警告", f"无法连接录取服务 {url}，将在本程序中处理数据。\n{str(e)}")
+        return None
+    logging.info(f"已连接录取服务: {url}")
+    return client
+
 class SimpleMajorAdmissionApp:
-    def __init__(self, root):
+    def __init__(self, root, service=None):
         try:
             self.root = root
-            self.root.title("本科生专业方向录取软件 V1.0")
-            self.root.geometry("800x700")  # 增加窗口高度以适应LOGO
+            # service 为 ServiceClient 时，解析、录取、导出交给录取服务，本程序只负责显示
+            self.service = service
+            self.cohort_id = None
+            # 本程序显示的录取结果在服务中的版本，导出时据此确认没有被其他客户端改掉
+            self.results_version = None
+            self.root.title("本科生专业方向录取软件 V1.0" + ("（录取服务客户端）" if service is not None else ""))
+            self.root.geometry("800x860")  # 增加窗口高度以适应LOGO和录取统计
             
             # 添加异常处理
             self.root.report_callback_exception = self.handle_exception
             
             # Initialize data
-            self.student_data = []
-            self.major_quotas = {
-                "电子信息工程": tk.IntVar(value=0),
-                "通信工程": tk.IntVar(value=0),
-                "电磁场与无线技术": tk.IntVar(value=0)
-            }
-            
-            # 志愿映射
-            self.preference_mapping = {
-                'A': ['电子信息工程', '通信工程', '电磁场与无线技术'],
-                'B': ['电子信息工程', '电磁场与无线技术', '通信工程'],
-                'C': ['电磁场与无线技术', '电子信息工程', '通信工程'],
-                'D': ['电磁场与无线技术', '通信工程', '电子信息工程'],
-                'E': ['通信工程', '电子信息工程', '电磁场与无线技术'],
-                'F': ['通信工程', '电磁场与无线技术', '电子信息工程']
-            }
+            self.student_data = StudentStore()
+            self.major_quotas = {major: tk.IntVar(value=0) for major in MAJORS}
+            self.task = None  # 正在后台执行的任务
+            self.cache = self.create_cache()
             
             self.init_ui()
         except Exception as e:
             logging.error(f"初始化失败: {str(e)}")
             logging.error(traceback.format_exc())
             messagebox.showerror("错误", f"程序初始化失败：{str(e)}\n请查看日志文件了解详情。")
-            
+    
+    def create_cache(self):
+        """已解析输入文件的缓存，缓存目录不可用时不使用缓存"""
+        try:
+            return CohortCache()
+        except OSError as e:
+            logging.warning(f"无法使用输入缓存: {str(e)}")
+            return None
+    
+    def load_logo(self):
+        """加载LOGO，找不到图片时返回 None
+        
+        优先使用预先缩放好的 resources/logo_250.png（由 convert_logo.py 生成），
+        Tk 可直接读取 PNG，启动时不必导入 PIL；缺少该文件时才用 PIL 缩放原图。
+        """
+        presized_path = get_resource_path(os.path.join('resources', LOGO_FILE))
+        if os.path.exists(presized_path):
+            return tk.PhotoImage(file=presized_path)
+        
+        logo_path = get_resource_path(os.path.join('resources', 'logo.png'))
+        if not os.path.exists(logo_path):
+            # 如果找不到PNG，尝试加载ICO格式
+            logo_path = get_resource_path(os.path.join('resources', 'logo.ico'))
+        if not os.path.exists(logo_path):
+            return None
+        
+        # 只在缺少预缩放图片时才导入 PIL
+        from PIL import Image, ImageTk
+        
+        logo_img = Image.open(logo_path)
+        # 计算调整后的大小，保持宽高比
+        target_height = int(logo_img.size[1] * LOGO_WIDTH / logo_img.size[0])
+        logo_img = logo_img.resize((LOGO_WIDTH, target_height), Image.Resampling.LANCZOS)
+        return ImageTk.PhotoImage(logo_img)
+    
     def handle_exception(self, exc_type, exc_value, exc_traceback):
         """处理未捕获的异常"""
         error_msg = ''.join(traceback.format_exception(exc_type, exc_value, exc_traceback))
         logging.error(f"未捕获的异常:\n{error_msg}")
         messagebox.showerror("错误", f"发生错误：{str(exc_value)}\n请查看日志文件了解详情。")
-
+    
     def init_ui(self):
         try:
             # Create main frame
@@ -85,27 +157,13 @@ class SimpleMajorAdmissionApp:
             
             # Add logo
             try:
-                # 使用新的资源路径获取函数
-                logo_path = get_resource_path(os.path.join('resources', 'logo.png'))
-                if not os.path.exists(logo_path):
-                    # 如果找不到PNG，尝试加载ICO格式
-                    logo_path = get_resource_path(os.path.join('resources', 'logo.ico'))
-                
-                if os.path.exists(logo_path):
-                    logo_img = Image.open(logo_path)
-                    # 计算调整后的大小，保持宽高比
-                    target_width = 250  # 目标宽度改为250像素
-                    width_percent = (target_width / float(logo_img.size[0]))
-                    target_height = int((float(logo_img.size[1]) * float(width_percent)))
-                    
-                    # 调整LOGO大小
-                    logo_img = logo_img.resize((target_width, target_height), Image.Resampling.LANCZOS)
-                    logo_photo = ImageTk.PhotoImage(logo_img)
+                logo_photo = self.load_logo()
+                if logo_photo is not None:
                     logo_label = ttk.Label(main_frame, image=logo_photo)
                     logo_label.image = logo_photo  # 保持引用
                     logo_label.pack(pady=5)  # 减小上下边距
                 else:
-                    logging.warning(f"Logo文件不存在: {logo_path}")
+                    logging.warning("Logo文件不存在")
                     # 如果无法加载图片，显示完整的学院名称
                     logo_label = ttk.Label(main_frame, text="电子信息与通信学院", font=("Arial", 16, "bold"))
                     logo_label.pack(pady=5)
@@ -149,106 +207,219 @@ class SimpleMajorAdmissionApp:
             export_btn = ttk.Button(file_operations_frame, text="导出录取结果", command=self.export_results)
             export_btn.pack(side=tk.LEFT, padx=5)
             
-            # Results table
-            table_frame = ttk.LabelFrame(main_frame, text="录取结果", padding="10")
-            table_frame.pack(fill=tk.BOTH, expand=True, pady=10)
+            diff_btn = ttk.Button(file_operations_frame, text="对比历史结果", command=self.compare_results)
+            diff_btn.pack(side=tk.LEFT, padx=5)
+            
+            self.operation_buttons = [import_btn, process_btn, export_btn, diff_btn]
+            
+            # Progress section
+            progress_frame = ttk.Frame(main_frame)
+            progress_frame.pack(fill=tk.X)
             
-            # Create treeview for results
-            self.results_tree = ttk.Treeview(table_frame, columns=("序号", "学号", "姓名", "分数", "志愿选择", "录取专业"), show="headings")
+            self.progress_bar = ttk.Progressbar(progress_frame, mode='determinate', length=300)
+            self.progress_bar.pack(side=tk.LEFT, padx=5)
             
-            # Define columns
-            self.results_tree.heading("序号", text="序号")
-            self.results_tree.heading("学号", text="学号")
-            self.results_tree.heading("姓名", text="姓名")
-            self.results_tree.heading("分数", text="分数")
-            self.results_tree.heading("志愿选择", text="志愿选择")
-            self.results_tree.heading("录取专业", text="录取专业")
+            self.progress_label = ttk.Label(progress_frame, text="就绪")
+            self.progress_label.pack(side=tk.LEFT, padx=5)
             
-            # Set column widths
-            self.results_tree.column("序号", width=50)
-            self.results_tree.column("学号", width=100)
-            self.results_tree.column("姓名", width=100)
-            self.results_tree.column("分数", width=80)
-            self.results_tree.column("志愿选择", width=80)
-            self.results_tree.column("录取专业", width=150)
+            self.cancel_btn = ttk.Button(progress_frame, text="取消", command=self.cancel_task, state=tk.DISABLED)
+            self.cancel_btn.pack(side=tk.RIGHT, padx=5)
+            
+            # 各阶段耗时
+            timing_frame = ttk.LabelFrame(main_frame, text="性能统计", padding="5")
+            timing_frame.pack(fill=tk.X, pady=(10, 0))
+            self.timing_view = TimingView(timing_frame)
+            
+            # 录取统计，处理录取时逐轮更新
+            stats_frame = ttk.LabelFrame(main_frame, text="录取统计", padding="5")
+            stats_frame.pack(fill=tk.X, pady=(10, 0))
+            self.stats_panel = AdmissionStatsPanel(stats_frame)
+            
+            # Results table
+            table_frame = ttk.LabelFrame(main_frame, text="录取结果", padding="10")
+            table_frame.pack(fill=tk.BOTH, expand=True, pady=10)
             
-            # Add scrollbar
-            scrollbar = ttk.Scrollbar(table_frame, orient=tk.VERTICAL, command=self.results_tree.yview)
-            self.results_tree.configure(yscroll=scrollbar.set)
+            search_frame = ttk.Frame(table_frame)
+            search_frame.pack(fill=tk.X, pady=(0, 5))
             
-            # Pack treeview and scrollbar
-            self.results_tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
-            scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+            # 只渲染可见行的结果表格
+            self.results_view = VirtualResultsTable(table_frame, self.student_data)
+            self.search_bar = SearchBar(search_frame, self.results_view)
         except Exception as e:
             logging.error(f"初始化UI失败: {str(e)}")
             logging.error(traceback.format_exc())
             messagebox.showerror("错误", f"初始化UI失败：{str(e)}\n请查看日志文件了解详情。")
     
+    def run_task(self, title, work, on_done, on_progress=None, on_cancel=None):
+        """在后台线程执行耗时操作，期间禁用操作按钮并显示进度"""
+        def finish(status):
+            self.task = None
+            for button in self.operation_buttons:
+                button.configure(state=tk.NORMAL)
+            self.cancel_btn.configure(state=tk.DISABLED)
+            self.progress_bar.stop()
+            self.progress_bar.configure(mode='determinate', value=0)
+            self.progress_label.configure(text=status)
+        
+        def progress(done, total, rate, payload):
+            if on_progress is not None:
+                on_progress(payload)
+            if total:
+                self.progress_bar.configure(mode='determinate', maximum=total, value=done)
+                text = f"{title}：{done}/{total} 行"
+            else:
+                text = f"{title}：{done} 行"
+            self.progress_label.configure(text=f"{text}，{rate:,.0f} 行/秒")
+        
+        def done(result):
+            finish(f"{title}完成")
+            on_done(result)
+        
+        def cancelled():
+            finish(f"{title}已取消")
+            if on_cancel is not None:
+                on_cancel()
+        
+        def error(exc, traceback_text):
+            finish(f"{title}失败")
+            messagebox.showerror("错误", f"{title}时发生错误：{str(exc)}")
+            logging.error(f"{title}时发生错误: {str(exc)}")
+            logging.error(traceback_text)
+        
+        for button in self.operation_buttons:
+            button.configure(state=tk.DISABLED)
+        self.cancel_btn.configure(state=tk.NORMAL)
+        # 总行数未知前先显示为滚动进度条
+        self.progress_bar.configure(mode='indeterminate')
+        self.progress_bar.start()
+        self.progress_label.configure(text=f"正在{title}...")
+        
+        self.task = BackgroundTask(
+            self.root, work,
+            on_done=done, on_error=error, on_progress=progress, on_cancel=cancelled
+        )
+        self.task.start()
+    
+    def cancel_task(self):
+        if self.task is not None:
+            self.task.cancel()
+            self.progress_label.configure(text="正在取消...")
+    
+    def show_students(self, students):
+        """更换表格显示的数据，清除排序和查找条件"""
+        self.student_data = students
+        self.results_view.set_store(students)
+        self.search_bar.reset()
+        self.stats_panel.clear()
+    
     def import_student_data(self):
         try:
             file_name = filedialog.askopenfilename(
                 title="选择学生志愿文件",
-                filetypes=[("Excel Files", "*.xlsx *.xls"), ("CSV Files", "*.csv"), ("All Files", "*.*")]
+                filetypes=[
+                    ("Excel Files", "*.xlsx *.xls"), ("CSV Files", "*.csv"),
+                    ("列存文件", "*.adm"), ("All Files", "*.*")
+                ]
             )
             
-            if file_name:
-                self.student_data = []
+            if file_name and self.service is not None:
+                self.import_from_service(file_name)
+            elif file_name:
+                self.show_students(StudentStore())
                 
-                if file_name.endswith('.csv'):
-                    # 使用csv模块读取csv文件
-                    with open(file_name, 'r', encoding='utf-8') as f:
-                        reader = csv.DictReader(f)
-                        for row in reader:
-                            student = {
-                                '序号': row['序号'],
-                                '学号': row['学号'],
-                                '姓名': row['姓名'],
-                                '分数': float(row['分数']),
-                                '志愿选择': str(row['志愿选择']).upper(),  # 转换为大写
-                                '专业': row['专业']
-                            }
-                            self.student_data.append(student)
+                cache = self.cache
                 
-                elif file_name.endswith('.xlsx'):
-                    # 使用openpyxl读取xlsx文件
-                    wb = load_workbook(file_name)
-                    sheet = wb.active
+                def work(task):
+                    # 列存文件整列映射读取，不逐批显示也不写缓存
+                    if is_columnar(file_name):
+                        loaded = StudentStore()
+                        load_columnar(file_name, loaded)
+                        return None, loaded, ValidationReport()
                     
-                    # 读取数据
-                    for row in sheet.iter_rows(min_row=2):
-                        student = {
-                            '序号': row[0].value,
-                            '学号': row[1].value,
-                            '姓名': row[2].value,
-                            '分数': float(row[4].value),
-                            '志愿选择': str(row[6].value).upper(),  # 转换为大写
-                            '专业': row[7].value
-                        }
-                        self.student_data.append(student)
-                else:
-                    # 使用xlrd读取xls文件
-                    workbook = xlrd.open_workbook(file_name)
-                    sheet = workbook.sheet_by_index(0)
+                    # 文件未改动时直接载入缓存，跳过解析
+                    key = cache.key(file_name) if cache is not None else None
+                    cached = StudentStore()
+                    if key is not None and cache.load_students(key, cached):
+                        return key, cached, ValidationReport()
+                    
+                    rows = 0
+                    validator = StudentValidator()
+                    for batch in iter_student_batches(file_name, validator=validator):
+                        rows += len(batch)
+                        task.report(rows, payload=batch)
+                    return key, None, validator.report
+                
+                def add_batch(batch):
+                    # 在界面线程中追加，边读取边显示
+                    self.student_data.append_batch(batch)
+                    self.results_view.render()
+                
+                def cancelled():
+                    self.show_students(StudentStore())
+                
+                def done(result):
+                    key, cached, report = result
+                    if cached is not None:
+                        self.show_students(cached)
+                    if report:
+                        self.show_validation_report(report)
+                    else:
+                        messagebox.showinfo("成功", f"成功导入 {len(self.student_data)} 条学生数据")
                     
-                    # 读取数据
-                    for row_idx in range(1, sheet.nrows):
-                        student = {
-                            '序号': sheet.cell_value(row_idx, 0),
-                            '学号': sheet.cell_value(row_idx, 1),
-                            '姓名': sheet.cell_value(row_idx, 2),
-                            '分数': float(sheet.cell_value(row_idx, 4)),
-                            '志愿选择': str(sheet.cell_value(row_idx, 6)).upper(),  # 转换为大写
-                            '专业': sheet.cell_value(row_idx, 7)
-                        }
-                        self.student_data.append(student)
+                    # 有问题的文件不写缓存，下次导入时仍会报告
+                    if cached is None and key is not None and not report:
+                        students = self.student_data
+                        self.run_task("写入缓存", lambda task: cache.save_students(key, students), lambda result: None)
                 
-                self.update_results_table()
-                messagebox.showinfo("成功", f"成功导入 {len(self.student_data)} 条学生数据")
+                self.run_task("导入", work, done, on_progress=add_batch, on_cancel=cancelled)
         except Exception as e:
             messagebox.showerror("错误", f"导入文件时发生错误：{str(e)}")
             logging.error(f"导入文件时发生错误: {str(e)}")
             logging.error(traceback.format_exc())
     
+    def show_validation_report(self, report):
+        """导入的数据有问题时显示校验报告，可保存完整报告"""
+        logging.warning(f"导入数据校验发现问题：\n{report.format()}")
+        save = messagebox.askyesno(
+            "数据校验",
+            f"成功导入 {len(self.student_data)} 条学生数据，但校验发现问题：\n\n"
+            f"{report.format(limit=10)}\n\n是否保存完整的校验报告？"
+        )
+        if not save:
+            return
+        file_name = filedialog.asksaveasfilename(
+            title="保存校验报告",
+            defaultextension=".csv",
+            filetypes=[("CSV Files", "*.csv")]
+        )
+        if file_name:
+            try:
+                report.write(file_name)
+            except Exception as e:
+                messagebox.showerror("错误", f"保存校验报告时发生错误：{str(e)}")
+                logging.error(f"保存校验报告时发生错误: {str(e)}")
+    
+    def import_from_service(self, file_name):
+        """由录取服务解析，本程序内存映射读取服务写出的列存快照用于显示"""
+        service = self.service
+        
+        def work(task):
+            info = service.load(os.path.abspath(file_name))
+            students = StudentStore(majors=info['majors'])
+            load_columnar(service.snapshot(info['id']), students)
+            if info['results_version']:
+                students.set_result_codes(service.result_codes(info['id'], info['results_version']))
+            return info, students
+        
+        def done(result):
+            info, students = result
+            self.cohort_id = info['id']
+            self.results_version = info['results_version']
+            self.show_students(students)
+            messagebox.showinfo("成功", f"成功导入 {len(students)} 条学生数据")
+        
+        self.run_task("导入", work, done)
+    
     def process_admissions(self):
         if not self.student_data:
             messagebox.showwarning("警告", "请先导入学生数据")
@@ -262,198 +433,136 @@ class SimpleMajorAdmissionApp:
             if all(quota == 0 for quota in quotas.values()):
                 messagebox.showwarning("警告", "请先设置专业录取名额")
                 return
-                
-            remaining_quotas = quotas.copy()
             
-            # 将所有学生按分数排序
-            sorted_students = sorted(self.student_data, key=lambda x: float(x['分数']), reverse=True)
+            students = self.student_data
+            service, cohort_id = self.service, self.cohort_id
             
-            # 第一轮：处理所有学生的第一志愿
-            for student in sorted_students:
-                choice = student['志愿选择']
-                if choice not in self.preference_mapping:
-                    student['录取专业'] = '无效志愿'
-                    continue
-                
-                # 获取学生的志愿顺序
-                preferences = self.preference_mapping[choice]
-                first_choice = preferences[0]
+            def work(task):
+                # 返回 (写入结果的函数, 统计信息)，结果在界面线程中写入
+                if service is not None:
+                    # 结果随本次录取的响应一并返回，不会取到其他客户端之后的结果
+                    stats = service.allocate(cohort_id, quotas)
+                    codes = stats.pop('codes')
+                    
+                    def apply_results():
+                        students.set_result_codes(codes)
+                        self.results_version = stats['results_version']
+                    return apply_results, stats
                 
-                # 如果第一志愿还有名额，直接录取
-                if remaining_quotas[first_choice] > 0:
-                    student['录取专业'] = first_choice
-                    remaining_quotas[first_choice] -= 1
+                # 统计随录取逐轮累加，每轮结束时把当时的统计交给界面显示
+                counters = AdmissionCounters(quotas, students.choices_array(), students.choice_labels)
+                admitted, adjusted, remaining_quotas = allocate(
+                    students.scores_array(),
+                    students.preference_matrix(),
+                    quotas,
+                    progress=lambda decided: task.report(decided, len(students), payload=counters.snapshot()),
+                    order=students.ranking_index().order,
+                    counters=counters
+                )
+                return (lambda: students.set_results(admitted, adjusted)), counters.snapshot()
             
-            # 第二轮：处理未被录取学生的第二志愿
-            for student in sorted_students:
-                if '录取专业' not in student or student['录取专业'] == '无效志愿':
-                    continue
+            def done(result):
+                apply_results, stats = result
+                previous_admitted = students.admitted_array()
+                previous_adjusted = students.adjusted_array()
+                apply_results()
                 
-                if '录取专业' not in student:
-                    choice = student['志愿选择']
-                    preferences = self.preference_mapping[choice]
-                    second_choice = preferences[1]
-                    
-                    if remaining_quotas[second_choice] > 0:
-                        student['录取专业'] = second_choice
-                        remaining_quotas[second_choice] -= 1
-            
-            # 第三轮：处理未被录取学生的第三志愿
-            for student in sorted_students:
-                if '录取专业' not in student or student['录取专业'] == '无效志愿':
-                    continue
+                # 只刷新录取专业有变化的行
+                self.results_view.results_changed(previous_admitted, previous_adjusted)
+                self.search_bar.refresh()
                 
-                if '录取专业' not in student:
-                    choice = student['志愿选择']
-                    preferences = self.preference_mapping[choice]
-                    third_choice = preferences[2]
-                    
-                    if remaining_quotas[third_choice] > 0:
-                        student['录取专业'] = third_choice
-                        remaining_quotas[third_choice] -= 1
-            
-            # 处理未被录取的学生（调剂）
-            for student in sorted_students:
-                if '录取专业' not in student or student['录取专业'] == '无效志愿':
-                    # 查找还有剩余名额的专业
-                    for major, quota in remaining_quotas.items():
-                        if quota > 0:
-                            student['录取专业'] = f"{major}(调剂)"
-                            remaining_quotas[major] -= 1
-                            break
-                    else:
-                        student['录取专业'] = '未分配'
-            
-            self.update_results_table()
-            
-            # 统计录取信息
-            total_students = len(self.student_data)
-            admitted_count = sum(1 for s in self.student_data if '未分配' not in s['录取专业'])
-            not_admitted_count = total_students - admitted_count
-            
-            stats = {
-                '电子信息工程': {'total': 0, 'adjust': 0},
-                '通信工程': {'total': 0, 'adjust': 0},
-                '电磁场与无线技术': {'total': 0, 'adjust': 0},
-                '未分配': 0
-            }
-            
-            for student in self.student_data:
-                major = student['录取专业']
-                if '未分配' in major:
-                    stats['未分配'] += 1
-                else:
-                    base_major = major.replace('(调剂)', '')
-                    if base_major in stats:
-                        stats[base_major]['total'] += 1
-                        if '调剂' in major:
-                            stats[base_major]['adjust'] += 1
-            
-            # 生成详细的统计信息
-            result_msg = "录取完成！\n\n"
-            result_msg += f"总人数：{total_students}人\n"
-            result_msg += f"已录取：{admitted_count}人\n"
-            result_msg += f"未录取：{not_admitted_count}人\n\n"
-            result_msg += "各专业录取情况：\n"
-            
-            for major, data in stats.items():
-                if major != '未分配':
-                    total = data['total']
-                    adjust = data['adjust']
-                    normal = total - adjust
-                    result_msg += f"\n{major}：\n"
-                    result_msg += f"  - 总计：{total}人\n"
-                    result_msg += f"  - 正常录取：{normal}人\n"
-                    result_msg += f"  - 调剂录取：{adjust}人\n"
-                    result_msg += f"  - 剩余名额：{remaining_quotas[major]}人\n"
-            
-            result_msg += f"\n未分配人数：{stats['未分配']}人"
-            
-            messagebox.showinfo("录取完成", result_msg)
+                self.stats_panel.show(stats)
+                logging.info(format_summary(stats.get('summary', stats)))
             
+            self.run_task("处理录取", work, done, on_progress=self.stats_panel.show, on_cancel=self.stats_panel.clear)
         except Exception as e:
             messagebox.showerror("错误", f"处理录取时发生错误：{str(e)}")
-            import traceback
-            print(traceback.format_exc())
+            logging.error(f"处理录取时发生错误: {str(e)}")
+            logging.error(traceback.format_exc())
     
     def export_results(self):
         if not self.student_data:
             messagebox.showwarning("警告", "请先导入学生数据")
             return
-            
+        
         try:
             file_name = filedialog.asksaveasfilename(
                 title="保存录取结果",
                 defaultextension=".xlsx",
-                filetypes=[("Excel Files", "*.xlsx"), ("All Files", "*.*")]
+                filetypes=[
+                    ("Excel Files", "*.xlsx"),
+                    ("CSV Files", "*.csv"),
+                    ("列存结果文件", "*.adm"),
+                    ("All Files", "*.*")
+                ]
             )
             
             if file_name:
-                # 创建新的工作簿
-                wb = Workbook()
-                ws = wb.active
-                ws.title = '录取结果'
-                
-                # 写入表头
-                headers = ['序号', '学号', '姓名', '分数', '志愿选择', '录取专业']
-                ws.append(headers)
+                students = self.student_data
+                service, cohort_id, version = self.service, self.cohort_id, self.results_version
                 
-                # 写入数据
-                for student in self.student_data:
-                    ws.append([
-                        student['序号'],
-                        student['学号'],
-                        student['姓名'],
-                        student['分数'],
-                        student['志愿选择'],
-                        student.get('录取专业', '')
-                    ])
+                def work(task):
+                    if service is not None:
+                        service.export(cohort_id, os.path.abspath(file_name), version)
+                        return
+                    # 流式写出，每写完一块报告一次进度（同时检查是否取消）
+                    write_results(file_name, students, progress=lambda done: task.report(done, len(students)))
                 
-                # 调整列宽
-                for column in ws.columns:
-                    max_length = 0
-                    column = list(column)
-                    for cell in column:
-                        try:
-                            if len(str(cell.value)) > max_length:
-                                max_length = len(str(cell.value))
-                        except:
-                            pass
-                    adjusted_width = (max_length + 2)
-                    ws.column_dimensions[column[0].column_letter].width = adjusted_width
-                
-                # 保存文件
-                wb.save(file_name)
-                
-                messagebox.showinfo("成功", "录取结果已成功导出")
-                
-                # 询问是否打开文件
-                if messagebox.askyesno("确认", "是否立即打开导出的文件？"):
-                    os.startfile(file_name)
+                def done(result):
+                    messagebox.showinfo("成功", "录取结果已成功导出")
+                    
+                    # 询问是否打开文件（列存文件供程序读取，不必打开）
+                    if not file_name.endswith(COLUMNAR_SUFFIX) and messagebox.askyesno("确认", "是否立即打开导出的文件？"):
+                        os.startfile(file_name)
                 
+                self.run_task("导出", work, done)
         except Exception as e:
             messagebox.showerror("错误", f"导出文件时发生错误：{str(e)}")
             logging.error(f"导出文件时发生错误: {str(e)}")
             logging.error(traceback.format_exc())
     
-    def update_results_table(self):
-        # 清除现有项目
-        for item in self.results_tree.get_children():
-            self.results_tree.delete(item)
+    def compare_results(self):
+        """与之前导出的录取结果按学号对比，列出录取专业有变化的学生"""
+        if not self.student_data or self.student_data.results_version == 0:
+            messagebox.showwarning("警告", "请先处理录取")
+            return
         
-        # 添加数据到树形视图
-        for student in self.student_data:
-            self.results_tree.insert(
-                "", 
-                tk.END, 
-                values=(
-                    student['序号'],
-                    student['学号'],
-                    student['姓名'],
-                    student['分数'],
-                    student['志愿选择'],
-                    student.get('录取专业', '')
-                )
+        try:
+            file_name = filedialog.askopenfilename(
+                title="选择之前导出的录取结果",
+                filetypes=[
+                    ("录取结果", "*.xlsx *.csv *.adm"),
+                    ("All Files", "*.*")
+                ]
+            )
+            
+            if file_name:
+                students = self.student_data
+                
+                def work(task):
+                    return diff_runs(ResultSet.read(file_name), ResultSet.from_store(students), students.majors)
+                
+                def done(diff):
+                    messagebox.showinfo("对比结果", format_diff(diff))
+                    if len(diff) and messagebox.askyesno("确认", "是否保存变化名单？"):
+                        self.save_diff(diff)
+                
+                self.run_task("对比", work, done)
+        except Exception as e:
+            messagebox.showerror("错误", f"对比结果时发生错误：{str(e)}")
+            logging.error(f"对比结果时发生错误: {str(e)}")
+            logging.error(traceback.format_exc())
+    
+    def save_diff(self, diff):
+        file_name = filedialog.asksaveasfilename(
+            title="保存变化名单",
+            defaultextension=".xlsx",
+            filetypes=[("Excel Files", "*.xlsx"), ("CSV Files", "*.csv"), ("All Files", "*.*")]
+        )
+        if file_name:
+            self.run_task(
+                "保存变化名单", lambda task: write_diff(file_name, diff),
+                lambda result: messagebox.showinfo("成功", "变化名单已保存")
             )
 
 def main():
@@ -478,9 +587,12 @@ def main():
         except Exception as e:
             logging.warning(f"设置窗口图标失败: {str(e)}")
         
-        app = SimpleMajorAdmissionApp(root)
+        args = parse_args()
+        service = connect_service(args.service) if args.service else None
+        app = SimpleMajorAdmissionApp(root, service)
+        root.after_idle(report_startup)
         root.mainloop()
-        
+    
     except Exception as e:
         logging.error(f"程序运行失败: {str(e)}")
         logging.error(traceback.format_exc())
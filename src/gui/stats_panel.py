@@ -0,0 +1,149 @@
+"""录取统计面板：各专业录取情况、各志愿代码的录取去向、各专业录取分数分布
+
+数据来自 core.allocation.AdmissionCounters.snapshot()，只与专业数、志愿代码数、分数段数有关，
+录取过程中每轮更新一次，不遍历学生。
+"""
+import tkinter as tk
+from tkinter import ttk
+
+# 各专业在分布图中的颜色，按专业顺序循环使用
+COLORS = ('#4e79a7', '#f28e2b', '#59a14f', '#e15759', '#76b7b2', '#edc948', '#b07aa1', '#9c755f')
+
+
+def _percent(count, total):
+    return f"{count / total:.1%}" if total else '-'
+
+
+class AdmissionStatsPanel:
+    """分三页显示：各专业、志愿代码、分数分布"""
+    MAJOR_COLUMNS = ('专业', '名额', '正常录取', '调剂录取', '剩余名额', '最低分数', '最低名次')
+    GROUP_COLUMNS = ('志愿代码', '人数', '第一志愿录取率', '志愿内录取率', '调剂率', '未分配率')
+    HEIGHT = 4
+    CHART_HEIGHT = 120
+    
+    def __init__(self, parent):
+        self.notebook = ttk.Notebook(parent)
+        self.notebook.pack(fill=tk.X)
+        
+        self.majors_tree = self._table(self.MAJOR_COLUMNS, "各专业")
+        self.groups_tree = self._table(self.GROUP_COLUMNS, "志愿代码")
+        
+        chart_frame = ttk.Frame(self.notebook)
+        self.notebook.add(chart_frame, text="分数分布")
+        self.chart = tk.Canvas(chart_frame, height=self.CHART_HEIGHT, background='white', highlightthickness=0)
+        self.chart.pack(fill=tk.X)
+        # 窗口大小变化时按新的宽度重画
+        self.chart.bind('<Configure>', lambda event: self._draw_histograms())
+        
+        self._edges = []
+        self._histograms = {}
+        self.summary_label = ttk.Label(parent, text="尚未录取")
+        self.summary_label.pack(anchor=tk.W)
+    
+    def _table(self, columns, title):
+        frame = ttk.Frame(self.notebook)
+        self.notebook.add(frame, text=title)
+        tree = ttk.Treeview(frame, columns=columns, show='headings', height=self.HEIGHT)
+        for column in columns:
+            tree.heading(column, text=column)
+            tree.column(column, width=100, anchor=tk.CENTER)
+        scrollbar = ttk.Scrollbar(frame, orient=tk.VERTICAL, command=tree.yview)
+        tree.configure(yscrollcommand=scrollbar.set)
+        tree.pack(side=tk.LEFT, fill=tk.X, expand=True)
+        scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        return tree
+    
+    def clear(self):
+        """数据更换后清空，等待下一次录取"""
+        self.show({'summary': None, 'groups': {}, 'edges': [], 'histograms': {}})
+    
+    def show(self, snapshot):
+        """显示 AdmissionCounters.snapshot()；只有 summary 的统计（如录取服务返回的）也可直接传入"""
+        if 'summary' not in snapshot:
+            snapshot = {'summary': snapshot}
+        self._show_summary(snapshot['summary'])
+        self._show_groups(snapshot.get('groups', {}))
+        self._edges = snapshot.get('edges', [])
+        self._histograms = snapshot.get('histograms', {})
+        self._draw_histograms()
+    
+    def _show_summary(self, summary):
+        self.majors_tree.delete(*self.majors_tree.get_children())
+        if summary is None:
+            self.summary_label.configure(text="尚未录取")
+            return
+        
+        for major, data in summary['majors'].items():
+            score = data.get('lowest_score')
+            self.majors_tree.insert('', tk.END, values=(
+                major,
+                data.get('quota', data['total'] + data['remaining']),
+                data['normal'],
+                data['adjust'],
+                data['remaining'],
+                '-' if score is None else f"{score:g}",
+                '-' if score is None else data['lowest_rank']
+            ))
+        
+        decided = summary.get('decided', summary['total'])
+        text = f"已确定 {decided}/{summary['total']} 人，录取 {summary['admitted']} 人，未分配 {summary['unassigned']} 人"
+        self.summary_label.configure(text=text)
+    
+    def _show_groups(self, groups):
+        self.groups_tree.delete(*self.groups_tree.get_children())
+        for label, data in groups.items():
+            total = data['total']
+            first = data['rounds'][0] if data['rounds'] else 0
+            self.groups_tree.insert('', tk.END, values=(
+                label or '（空）',
+                total,
+                _percent(first, total),
+                _percent(sum(data['rounds']), total),
+                _percent(data['adjust'], total),
+                _percent(data['unassigned'], total)
+            ))
+    
+    def _draw_histograms(self):
+        """各分数段中各专业的录取人数并排显示，横轴为分数段下限"""
+        chart = self.chart
+        chart.delete('all')
+        if not self._histograms or not any(map(any, self._histograms.values())):
+            return
+        
+        width = max(chart.winfo_width(), 200)
+        height = self.CHART_HEIGHT
+        left, bottom, top, legend = 30, height - 18, 8, 110
+        plot_width = width - left - legend
+        segments = len(self._edges) - 1
+        majors = list(self._histograms)
+        peak = max(max(counts) for counts in self._histograms.values())
+        segment_width = plot_width / segments
+        bar_width = max(segment_width * 0.8 / len(majors), 1)
+        
+        chart.create_line(left, bottom, left + plot_width, bottom)
+        chart.create_text(left - 4, top, text=str(peak), anchor=tk.NE, font=('Arial', 8))
+        # 分数段太窄时隔几段标一次
+        label_every = max(int(30 // segment_width) + 1, 1)
+        for segment in range(segments):
+            x = left + segment * segment_width + segment_width * 0.1
+            if segment % label_every == 0:
+                chart.create_text(
+                    left + segment * segment_width, bottom + 2,
+                    text=f"{self._edges[segment]:g}", anchor=tk.N, font=('Arial', 8)
+                )
+            for index, major in enumerate(majors):
+                count = self._histograms[major][segment]
+                if count:
+                    bar_top = bottom - (bottom - top) * count / peak
+                    chart.create_rectangle(
+                        x + index * bar_width, bar_top, x + (index + 1) * bar_width, bottom,
+                        fill=COLORS[index % len(COLORS)], width=0
+                    )
+        
+        for index, major in enumerate(majors):
+            y = top + index * 14
+            chart.create_rectangle(
+                width - legend + 6, y, width - legend + 16, y + 10,
+                fill=COLORS[index % len(COLORS)], width=0
+            )
+            chart.create_text(width - legend + 20, y + 5, text=major, anchor=tk.W, font=('Arial', 8))
@@ -0,0 +1,76 @@
+"""各阶段耗时统计表"""
+import queue
+import tkinter as tk
+from tkinter import ttk
+
+from core.instrumentation import RECORDER, format_bytes
+
+# 阶段的中文名称，未列出的阶段原样显示
+STAGE_NAMES = {
+    'startup': '启动',
+    'parse': '解析',
+    'validate': '数据校验',
+    'cache_load': '读取缓存',
+    'cache_save': '写入缓存',
+    'sort': '排序',
+    'rank_index': '排名索引',
+    'encode': '志愿编码',
+    'allocate': '录取分配',
+    'render': '表格渲染',
+    'sort_view': '表格排序',
+    'search_index': '建立查找索引',
+    'search': '查找',
+    'diff': '结果对比',
+    'whatif': '名额推演',
+    'export': '导出'
+}
+
+
+class TimingView:
+    """每个阶段一行，显示最近一次的用时、行数、速度和内存峰值
+    
+    记录可能来自后台线程，先放入队列，由界面线程定时取出显示。
+    """
+    COLUMNS = ('阶段', '行数', '用时', '行/秒', '内存峰值')
+    POLL_INTERVAL_MS = 200
+    
+    def __init__(self, parent, recorder=RECORDER):
+        self.recorder = recorder
+        self._queue = queue.SimpleQueue()
+        self._items = {}
+        
+        self.tree = ttk.Treeview(parent, columns=self.COLUMNS, show='headings', height=4)
+        for column in self.COLUMNS:
+            self.tree.heading(column, text=column)
+            self.tree.column(column, width=120, anchor=tk.CENTER)
+        self.tree.pack(fill=tk.X)
+        
+        self.recorder.subscribe(self._queue.put)
+        self._poll()
+    
+    def _poll(self):
+        try:
+            while True:
+                self.show(self._queue.get_nowait())
+        except queue.Empty:
+            pass
+        self.tree.after(self.POLL_INTERVAL_MS, self._poll)
+    
+    def show(self, record):
+        """更新记录所属阶段的一行"""
+        stage = record['stage']
+        rows = record.get('rows')
+        seconds = record['seconds']
+        values = (
+            STAGE_NAMES.get(stage, stage),
+            '-' if rows is None else f"{rows:,}",
+            f"{seconds * 1000:.1f} ms" if seconds < 1 else f"{seconds:.2f} s",
+            f"{rows / seconds:,.0f}" if rows and seconds > 0 else '-',
+            format_bytes(record.get('peak_rss'))
+        )
+        item = self._items.get(stage)
+        if item is None:
+            self._items[stage] = self.tree.insert('', 0, values=values)
+        else:
+            self.tree.item(item, values=values)
+            self.tree.move(item, '', 0)
@@ -0,0 +1,86 @@
+"""后台任务：在工作线程中执行耗时操作，通过队列把进度和结果交回界面线程"""
+import queue
+import threading
+import time
+import traceback
+
+
+class TaskCancelled(Exception):
+    """任务被用户取消"""
+
+
+class BackgroundTask:
+    """在工作线程中运行 work(task)，界面线程用 root.after 轮询结果
+    
+    工作线程只能通过 task.report() 与界面交互，所有回调都在界面线程中执行：
+      on_progress(done, total, rate, payload)  每次 report 后调用
+      on_done(result)                          正常结束
+      on_cancel()                              被取消
+      on_error(exc, traceback_text)            发生异常
+    """
+    POLL_INTERVAL_MS = 50
+    
+    def __init__(self, root, work, on_done, on_error, on_progress=None, on_cancel=None):
+        self.root = root
+        self.work = work
+        self.on_done = on_done
+        self.on_error = on_error
+        self.on_progress = on_progress
+        self.on_cancel = on_cancel
+        
+        self._queue = queue.Queue()
+        self._cancel_event = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self.started_at = None
+    
+    def start(self):
+        self.started_at = time.perf_counter()
+        self._thread.start()
+        self.root.after(self.POLL_INTERVAL_MS, self._poll)
+    
+    def cancel(self):
+        """请求取消，工作线程在下一次 report/check_cancelled 时停止"""
+        self._cancel_event.set()
+    
+    def check_cancelled(self):
+        if self._cancel_event.is_set():
+            raise TaskCancelled()
+    
+    def report(self, done, total=None, payload=None):
+        """工作线程调用：报告已处理行数，可附带交给界面线程处理的数据"""
+        self.check_cancelled()
+        elapsed = time.perf_counter() - self.started_at
+        rate = done / elapsed if elapsed > 0 else 0.0
+        self._queue.put(('progress', (done, total, rate, payload)))
+    
+    def _run(self):
+        try:
+            result = self.work(self)
+            self.check_cancelled()
+        except TaskCancelled:
+            self._queue.put(('cancelled', None))
+        except Exception as e:
+            self._queue.put(('error', (e, traceback.format_exc())))
+        else:
+            self._queue.put(('done', result))
+    
+    def _poll(self):
+        try:
+            while True:
+                kind, value = self._queue.get_nowait()
+                if kind == 'progress':
+                    if self.on_progress is not None and not self._cancel_event.is_set():
+                        self.on_progress(*value)
+                    continue
+                
+                if kind == 'done':
+                    self.on_done(value)
+                elif kind == 'cancelled':
+                    if self.on_cancel is not None:
+                        self.on_cancel()
+                else:
+                    self.on_error(*value)
+                return
+        except queue.Empty:
+            pass
+        self.root.after(self.POLL_INTERVAL_MS, self._poll)
@@ -0,0 +1,260 @@
+"""
+Incremental re-admission on top of AdmissionAlgorithm.
+
+Serial allocation in rank order never lets a student change the outcome of a
+better-ranked student, so after a quota or roster edit only the suffix that
+starts at the first affected student has to be re-allocated. Remaining quotas
+are checkpointed every ``checkpoint_interval`` ranks, which makes resuming at
+any position cost O(checkpoint_interval) plus the suffix itself.
+"""
+import numpy as np
+import pandas as pd
+
+from admission_algorithm import AdmissionAlgorithm, allocate_serial
+from core.preferences import NO_MAJOR, parse_preferences
+from core.ranking import parse_tiebreak
+
+
+class _Descending:
+    """Wrap a value so that comparisons are reversed (descending tie-breaks)."""
+    
+    __slots__ = ('value',)
+    
+    def __init__(self, value):
+        self.value = value
+    
+    def __lt__(self, other):
+        return other.value < self.value
+    
+    def __eq__(self, other):
+        return self.value == other.value
+
+
+def _is_missing(value):
+    return value is None or (isinstance(value, float) and value != value)
+
+
+class IncrementalAdmission:
+    """Keep an AdmissionAlgorithm run up to date under quota and roster edits."""
+    
+    def __init__(self, student_data, quotas, checkpoint_interval=1024):
+        """
+        Args:
+            student_data (pd.DataFrame): Columns ['学号', '排名', '志愿选择'] (or
+                '志愿列表'); any other columns are carried through to ``results()``.
+            quotas (dict): Seats per major.
+            checkpoint_interval (int): Ranks between remaining-quota checkpoints.
+        """
+        self.algorithm = AdmissionAlgorithm(quotas)
+        self.interval = checkpoint_interval
+        
+        sorted_students = self.algorithm.sort_students(student_data)
+        self.tiebreaks = [parse_tiebreak(name) for name in self.algorithm.tiebreak_columns(student_data.columns)]
+        self.majors, self.prefs = self.algorithm.encode_sorted(sorted_students)
+        self.columns = {name: sorted_students[name].to_numpy() for name in sorted_students.columns}
+        # 学号 -> 排名, so a student is located by binary search instead of a scan
+        self._rank_of = dict(zip(self.columns['学号'], self.columns['排名']))
+        self.quotas = np.array([quotas.get(major, 0) for major in self.majors], dtype=np.int64)
+        
+        self.admitted = np.empty(0, dtype=np.int64)
+        self.checkpoints = self.quotas[np.newaxis, :].copy()
+        self.remaining = self.quotas.copy()
+        self._run_from(0)
+        self._sync_remaining()
+    
+    def __len__(self):
+        return len(self.prefs)
+    
+    def set_quota(self, major, quota):
+        """
+        Change one major's quota and re-allocate the affected suffix.
+        
+        Returns:
+            int | None: First re-allocated rank position, None if no outcome changed.
+        """
+        m = self.majors.index(major)
+        old = int(self.quotas[m])
+        members = np.flatnonzero(self.admitted == m)
+        
+        start = None
+        if quota < old and quota < len(members):
+            # The (quota + 1)-th admitted student loses the seat
+            start = int(members[quota])
+        elif quota > old and len(members) == old:
+            start = self._first_refused(m, int(members[-1]) + 1 if old else 0)
+        
+        # Checkpoints before ``start`` hold quota - seats used, so shift them
+        self.quotas[m] = quota
+        self.checkpoints[:, m] += quota - old
+        self.remaining[m] += quota - old
+        self.algorithm.quotas[major] = quota
+        
+        if start is not None:
+            self._run_from(start)
+        self._sync_remaining()
+        return start
+    
+    def add_student(self, student):
+        """
+        Add a student (dict with at least 学号, 排名, 志愿选择) and re-allocate.
+        
+        Returns:
+            int: Rank position the student was inserted at.
+        """
+        row = self._encode_row(student)
+        # Cast to the column dtypes first, so the stored 排名 is the one searched for later
+        student = {
+            name: np.array([student.get(name)], dtype=values.dtype)[0]
+            for name, values in self.columns.items()
+        }
+        position = self._insert_position(student)
+        for name, values in self.columns.items():
+            self.columns[name] = np.insert(values, position, student[name])
+        self.prefs = np.insert(self.prefs, position, row, axis=0)
+        self.admitted = np.insert(self.admitted, position, -1)
+        self._rank_of[student['学号']] = student['排名']
+        self._run_from(position)
+        self._sync_remaining()
+        return position
+    
+    def remove_student(self, student_id):
+        """
+        Remove a student by 学号 and re-allocate.
+        
+        Returns:
+            int: Rank position the student was removed from.
+        """
+        position = self._position(student_id)
+        for name, values in self.columns.items():
+            self.columns[name] = np.delete(values, position)
+        self.prefs = np.delete(self.prefs, position, axis=0)
+        self.admitted = np.delete(self.admitted, position)
+        del self._rank_of[student_id]
+        self._run_from(position)
+        self._sync_remaining()
+        return position
+    
+    def update_rank(self, student_id, rank):
+        """
+        Move a re-scored student to a new 排名 and re-allocate.
+        
+        Returns:
+            int: First re-allocated rank position.
+        """
+        position = self._position(student_id)
+        student = {name: values[position] for name, values in self.columns.items()}
+        student['排名'] = rank
+        self.remove_student(student_id)
+        return min(position, self.add_student(student))
+    
+    def results(self):
+        """Return the current results in rank order, like process_admissions."""
+        labels = np.array(self.majors + [AdmissionAlgorithm.UNASSIGNED], dtype=object)
+        results = pd.DataFrame(self.columns)
+        results['录取专业'] = labels[self.admitted].tolist() if len(self.admitted) else ''
+        return results
+    
+    def get_remaining_quotas(self):
+        """Return the remaining quotas for each major."""
+        return self.algorithm.get_remaining_quotas()
+    
+    def _position(self, student_id):
+        ranks = self.columns['排名']
+        rank = self._rank_of[student_id]
+        start = int(np.searchsorted(ranks, rank, side='left'))
+        stop = int(np.searchsorted(ranks, rank, side='right'))
+        ids = self.columns['学号'][start:stop]
+        return start + int(np.flatnonzero(ids == student_id)[0])
+    
+    def _tie_key(self, student):
+        """Sort key among equal 排名, matching AdmissionAlgorithm.ranking_index."""
+        key = []
+        for column, descending in self.tiebreaks + [('学号', False)]:
+            value = student[column]
+            # Missing values sort last in either direction
+            if _is_missing(value):
+                key.append((True, 0))
+                continue
+            # Like dense_codes: numeric columns compare as numbers, others as strings
+            if self.columns[column].dtype.kind not in 'biuf':
+                value = str(value)
+            key.append((False, _Descending(value) if descending else value))
+        return key
+    
+    def _insert_position(self, student):
+        """Rank position of a new student, ordered by 排名, the tie-breaks, then 学号."""
+        ranks = self.columns['排名']
+        low = int(np.searchsorted(ranks, student['排名'], side='left'))
+        high = int(np.searchsorted(ranks, student['排名'], side='right'))
+        key = self._tie_key(student)
+        while low < high:
+            middle = (low + high) // 2
+            other = self._tie_key({name: values[middle] for name, values in self.columns.items()})
+            if key < other:
+                high = middle
+            else:
+                low = middle + 1
+        return low
+    
+    def _encode_row(self, student):
+        """Encode one student's preferences as a row of the preference matrix."""
+        column = AdmissionAlgorithm.PREFERENCE_LIST_COLUMN
+        value = student[column] if column in student else student['志愿选择']
+        preferences = parse_preferences(value, self.algorithm.preference_mapping, self.majors)
+        if preferences is None or any(major not in self.majors for major in preferences):
+            raise KeyError(value)
+        if len(preferences) > self.prefs.shape[1]:
+            padding = len(preferences) - self.prefs.shape[1]
+            self.prefs = np.pad(self.prefs, ((0, 0), (0, padding)), constant_values=NO_MAJOR)
+        
+        row = np.full(self.prefs.shape[1], NO_MAJOR, dtype=self.prefs.dtype)
+        row[:len(preferences)] = [self.majors.index(major) for major in preferences]
+        return row
+    
+    def _first_refused(self, major, start):
+        """First position >= start whose outcome would improve if ``major`` reopened."""
+        prefs = self.prefs[start:]
+        width = prefs.shape[1]
+        admitted = self.admitted[start:]
+        
+        # Preference slot of the major and of the current result (width = absent)
+        slot_major = np.where((prefs == major).any(axis=1), (prefs == major).argmax(axis=1), width)
+        is_admitted = (prefs == admitted[:, np.newaxis]) & (admitted[:, np.newaxis] >= 0)
+        slot_admitted = np.where(is_admitted.any(axis=1), is_admitted.argmax(axis=1), width)
+        
+        refused = np.flatnonzero(slot_major < slot_admitted)
+        return start + int(refused[0]) if len(refused) else None
+    
+    def _run_from(self, start):
+        """Re-allocate every student from rank position ``start`` onwards."""
+        n = len(self.prefs)
+        interval = self.interval
+        block = start // interval
+        
+        # Remaining quotas at ``start``: nearest checkpoint minus seats taken since
+        prefix = self.admitted[block * interval:start]
+        remaining = self.checkpoints[block] - np.bincount(
+            prefix[prefix >= 0], minlength=len(self.majors)
+        )
+        at_start = remaining.copy()
+        
+        suffix = allocate_serial(self.prefs[start:], remaining)
+        self.admitted = np.concatenate([self.admitted[:start], suffix])
+        self.remaining = remaining
+        
+        # Rebuild the checkpoints after ``start`` from per-block seat counts
+        n_checkpoints = n // interval + 1
+        checkpoints = np.empty((n_checkpoints, len(self.majors)), dtype=np.int64)
+        checkpoints[:block + 1] = self.checkpoints[:block + 1]
+        if n_checkpoints > block + 1:
+            positions = np.arange(start, n)
+            placed = suffix >= 0
+            slots = (positions[placed] // interval + 1) * len(self.majors) + suffix[placed]
+            counts = np.bincount(slots, minlength=(n_checkpoints + 1) * len(self.majors))
+            counts = counts.reshape(-1, len(self.majors))[block + 1:n_checkpoints]
+            checkpoints[block + 1:] = at_start - np.cumsum(counts, axis=0)
+        self.checkpoints = checkpoints
+    
+    def _sync_remaining(self):
+        for i, major in enumerate(self.majors):
+            self.algorithm.remaining_quotas[major] = int(self.remaining[i])
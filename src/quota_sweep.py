@@ -0,0 +1,188 @@
+"""
+Quota what-if sweeps on top of AdmissionAlgorithm.
+
+The cohort is sorted and integer-encoded once; every quota vector in the grid
+is then evaluated with the vectorized allocation kernel in a process pool.
+
+Usage:
+    python src/quota_sweep.py data/input/test_sample.csv -o sweep.csv \
+        -r 电子信息工程=3:6 -r 通信工程=3:6 -r 电磁场与无线技术=2:5
+"""
+import argparse
+import itertools
+import logging
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from admission_algorithm import AdmissionAlgorithm, allocate_serial
+from core.preferences import NO_MAJOR
+
+# Encoded cohort shared by the worker processes (set by _init_worker)
+_COHORT = None
+
+
+class QuotaSweep:
+    """Evaluate many quota vectors against one cohort."""
+    
+    def __init__(self, student_data):
+        """
+        Args:
+            student_data (pd.DataFrame): Columns ['学号', '排名', '志愿选择'] (or
+                '志愿列表') and optionally '分数' for score cutoffs. Blank or
+                unknown preferences are kept and never admitted; their count
+                is in ``invalid``.
+        """
+        algorithm = AdmissionAlgorithm({})
+        sorted_students = algorithm.sort_students(student_data)
+        self.majors, prefs = algorithm.encode_sorted(sorted_students, skip_invalid=True)
+        self.invalid = int(np.count_nonzero((prefs == NO_MAJOR).all(axis=1))) if prefs.size else 0
+        
+        ranks = sorted_students['排名'].to_numpy()
+        scores = sorted_students['分数'].to_numpy(dtype=np.float64) if '分数' in sorted_students else None
+        self.cohort = (prefs, ranks, scores)
+    
+    def quota_grid(self, ranges):
+        """
+        Build the cartesian product of per-major quota ranges.
+        
+        Args:
+            ranges (dict): major -> iterable of quotas; majors left out get 0.
+        
+        Returns:
+            list: One quotas dict per combination.
+        """
+        axes = [list(ranges.get(major, [0])) for major in self.majors]
+        return [dict(zip(self.majors, values)) for values in itertools.product(*axes)]
+    
+    def evaluate(self, quotas):
+        """Evaluate a single quotas dict in the current process."""
+        vector = [quotas.get(major, 0) for major in self.majors]
+        return _evaluate(self.cohort, self.majors, vector)
+    
+    def run(self, quota_vectors, processes=None, chunksize=None):
+        """
+        Evaluate every quotas dict, in parallel when ``processes`` != 1.
+        
+        Returns:
+            pd.DataFrame: One row per quota vector with the quotas, the cutoff
+            rank/score of each major, the count admitted below their first
+            choice and the unassigned count.
+        """
+        vectors = [[quotas.get(major, 0) for major in self.majors] for quotas in quota_vectors]
+        if processes is None:
+            processes = os.cpu_count() or 1
+        
+        if processes == 1 or len(vectors) < 2:
+            rows = [_evaluate(self.cohort, self.majors, vector) for vector in vectors]
+        else:
+            if chunksize is None:
+                chunksize = max(1, len(vectors) // (processes * 4))
+            # The cohort is shipped once per worker, not once per vector
+            with ProcessPoolExecutor(
+                max_workers=processes,
+                initializer=_init_worker,
+                initargs=(self.cohort, self.majors)
+            ) as pool:
+                rows = list(pool.map(_evaluate_shared, vectors, chunksize=chunksize))
+        
+        return pd.DataFrame(rows)
+
+
+def _init_worker(cohort, majors):
+    global _COHORT
+    _COHORT = (cohort, majors)
+
+
+def _evaluate_shared(vector):
+    cohort, majors = _COHORT
+    return _evaluate(cohort, majors, vector)
+
+
+def _evaluate(cohort, majors, vector):
+    prefs, ranks, scores = cohort
+    admitted = allocate_serial(prefs, np.array(vector, dtype=np.int64))
+    
+    row = {f'{major}名额': quota for major, quota in zip(majors, vector)}
+    for i, major in enumerate(majors):
+        members = np.flatnonzero(admitted == i)
+        # Students are in rank order, so the last member holds the cutoff rank
+        row[f'{major}最低排名'] = ranks[members[-1]] if len(members) else None
+        if scores is not None:
+            row[f'{major}最低分'] = scores[members].min() if len(members) else None
+    
+    # AdmissionAlgorithm has no 调剂 step: everyone admitted got one of their own choices
+    first_choice = prefs[:, 0]
+    row['非第一志愿人数'] = int(np.count_nonzero((admitted >= 0) & (admitted != first_choice)))
+    row['未分配人数'] = int(np.count_nonzero(admitted < 0))
+    return row
+
+
+def parse_range(text):
+    """Parse 专业=起:止[:步长] (inclusive) or 专业=a,b,c."""
+    major, sep, spec = text.partition('=')
+    if not sep or not major:
+        raise argparse.ArgumentTypeError(f"名额范围格式应为 专业=起:止[:步长]：{text}")
+    try:
+        if ':' in spec:
+            parts = [int(part) for part in spec.split(':')]
+            start, stop = parts[0], parts[1]
+            step = parts[2] if len(parts) > 2 else 1
+            values = list(range(start, stop + 1, step))
+        else:
+            values = [int(part) for part in spec.split(',')]
+    except (ValueError, IndexError):
+        raise argparse.ArgumentTypeError(f"名额范围格式应为 专业=起:止[:步长]：{text}")
+    return major.strip(), values
+
+
+def main(argv=None):
+    from core.importer import is_columnar, read_columnar_frame, read_students
+    from core.store import StudentStore
+    
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    parser = argparse.ArgumentParser(description="专业名额方案批量推演")
+    parser.add_argument('input', help="学生志愿文件（.csv/.xlsx/.xls/.adm）")
+    parser.add_argument('-o', '--output', required=True, help="推演结果输出文件（.csv/.xlsx）")
+    parser.add_argument(
+        '-r', '--range', action='append', type=parse_range, default=[], metavar='专业=起:止[:步长]',
+        help="专业名额取值范围，可重复指定"
+    )
+    parser.add_argument('-j', '--processes', type=int, default=None, help="进程数（默认CPU核数）")
+    args = parser.parse_args(argv)
+    
+    if is_columnar(args.input):
+        # 列存文件直接映射成 DataFrame，不经过 StudentStore 复制
+        students = read_columnar_frame(args.input)
+    else:
+        store = StudentStore()
+        report = read_students(args.input, store)
+        if report:
+            logging.warning(f"数据校验发现问题：\n{report.format()}")
+        students = store.to_frame()
+    
+    sweep = QuotaSweep(students)
+    if sweep.invalid:
+        logging.warning(f"{sweep.invalid} 名学生志愿为空或无法识别，各方案中均计为未分配")
+    unknown = [major for major, _ in args.range if major not in sweep.majors]
+    if unknown:
+        logging.error(f"未知专业: {', '.join(unknown)}")
+        return 2
+    
+    vectors = sweep.quota_grid(dict(args.range))
+    logging.info(f"共 {len(vectors)} 种名额方案，{len(students)} 名学生")
+    results = sweep.run(vectors, processes=args.processes)
+    
+    if args.output.endswith('.csv'):
+        results.to_csv(args.output, index=False, encoding='utf-8-sig')
+    else:
+        results.to_excel(args.output, index=False)
+    logging.info(f"推演结果已写入: {args.output}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,40 +1,154 @@
+"""志愿统计：各专业第一/二/三志愿人数、志愿代码×录取专业交叉表、分数段需求分布
+
+整张表按列读入后用分组计数（bincount）一次算出，不逐行遍历学生。
+输入既可以是带 第一志愿/第二志愿/第三志愿 列的表，也可以是录取结果表
+（志愿选择 列为志愿代码或专业顺序，录取专业、分数 列可选）。
+"""
+import os
+import sys
+
+import numpy as np
+import pandas as pd
 import xlrd
 import xlwt
-from collections import defaultdict
+
+# 将src目录加入模块搜索路径，以便导入共享的core模块
+SRC_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if SRC_DIR not in sys.path:
+    sys.path.insert(0, SRC_DIR)
+
+from core.preferences import MAJORS, NO_MAJOR, preference_table
+
+RANK_COLUMNS = ['第一志愿', '第二志愿', '第三志愿']
+RANK_KEYS = ['first', 'second', 'third']
+CHOICE_COLUMN = '志愿选择'
+ADMITTED_COLUMN = '录取专业'
+SCORE_COLUMN = '分数'
+SCORE_BAND_WIDTH = 5
 
 def read_excel(file_path):
-    """读取Excel文件并返回数据"""
+    """读取第一张工作表，返回 DataFrame
+    
+    xls 用 xlrd 按列整列读取（col_values），其余格式交给 pandas。
+    """
+    if not file_path.lower().endswith('.xls'):
+        if file_path.lower().endswith('.csv'):
+            return pd.read_csv(file_path, encoding='utf-8-sig')
+        return pd.read_excel(file_path)
+    
     workbook = xlrd.open_workbook(file_path)
     sheet = workbook.sheet_by_index(0)
+    if sheet.nrows == 0:
+        return pd.DataFrame()
+    headers = sheet.row_values(0)
+    return pd.DataFrame({
+        header: sheet.col_values(i, start_rowx=1) for i, header in enumerate(headers)
+    })
+
+def _rank_codes(data, majors, choices):
+    """每名学生前三个志愿的专业下标，(学生数, 3)，空位为 NO_MAJOR；同时返回专业列表
+    
+    choices 为 志愿选择 列分解后的 (代码, 取值)，没有该列时为 None。
+    """
+    if all(column in data for column in RANK_COLUMNS):
+        values = data[RANK_COLUMNS].fillna('').astype(str).to_numpy().ravel()
+        codes, uniques = pd.factorize(values)
+        majors = list(dict.fromkeys(list(majors) + [major for major in uniques if major]))
+        lookup = pd.Index(majors).get_indexer(uniques)
+        lookup[[not major for major in uniques]] = NO_MAJOR
+        return lookup[codes].reshape(-1, len(RANK_COLUMNS)), majors
+    
+    if choices is None:
+        raise KeyError(f"缺少 {'/'.join(RANK_COLUMNS)} 列或 {CHOICE_COLUMN} 列")
+    # 志愿代码种类很少，只为每种代码解析一次
+    codes, labels = choices
+    table = preference_table([label.upper() for label in labels], majors)
+    ranks = np.full((len(data), len(RANK_COLUMNS)), NO_MAJOR, dtype=np.int64)
+    width = min(table.shape[1], len(RANK_COLUMNS))
+    ranks[:, :width] = table[codes, :width]
+    return ranks, list(majors)
+
+def _count(codes, size):
+    """codes 中每个取值出现的次数，忽略负数（空位）"""
+    return np.bincount(codes[codes >= 0], minlength=size)
+
+def analyze(data, majors=MAJORS, band_width=SCORE_BAND_WIDTH):
+    """一次计算全部统计
+    
+    返回字典：
+    - preferences：行为专业，列为 第一志愿人数/第二志愿人数/第三志愿人数/总人数
+    - crosstab：行为志愿代码，列为录取专业（没有 录取专业 列时为 None）
+    - score_bands：行为分数段，列为各专业的第一志愿人数（没有 分数 列时为 None）
+    """
+    choices = None
+    if CHOICE_COLUMN in data:
+        choices = pd.factorize(data[CHOICE_COLUMN].fillna('').astype(str).str.strip())
+    ranks, majors = _rank_codes(data, majors, choices)
+    preferences = pd.DataFrame(
+        {f'{column}人数': _count(ranks[:, i], len(majors)) for i, column in enumerate(RANK_COLUMNS)},
+        index=pd.Index(majors, name='专业')
+    )
+    preferences['总人数'] = preferences.sum(axis=1)
     
-    # 获取表头
-    headers = [sheet.cell_value(0, i) for i in range(sheet.ncols)]
+    crosstab = None
+    if ADMITTED_COLUMN in data and choices is not None:
+        choice_codes, labels = choices
+        admitted_codes, admitted = pd.factorize(data[ADMITTED_COLUMN].fillna('').astype(str))
+        counts = np.bincount(
+            choice_codes * len(admitted) + admitted_codes, minlength=len(labels) * len(admitted)
+        ).reshape(len(labels), len(admitted))
+        crosstab = pd.DataFrame(
+            counts,
+            index=pd.Index(labels, name=CHOICE_COLUMN),
+            columns=[major or '未录取' for major in admitted]
+        ).sort_index()
+        crosstab = crosstab[sorted(crosstab.columns, key=lambda major: (major not in majors, major))]
     
-    # 获取数据
-    data = []
-    for row in range(1, sheet.nrows):
-        row_data = [sheet.cell_value(row, i) for i in range(sheet.ncols)]
-        data.append(dict(zip(headers, row_data)))
+    score_bands = None
+    if SCORE_COLUMN in data and len(data):
+        scores = pd.to_numeric(data[SCORE_COLUMN], errors='coerce').to_numpy(dtype=np.float64)
+        valid = ~np.isnan(scores) & (ranks[:, 0] >= 0)
+        if valid.any():
+            bands = (scores[valid] // band_width).astype(np.int64)
+            low = bands.min()
+            band_count = bands.max() - low + 1
+            counts = np.bincount(
+                (bands - low) * len(majors) + ranks[valid, 0], minlength=band_count * len(majors)
+            ).reshape(band_count, len(majors))
+            starts = (np.arange(band_count) + low) * band_width
+            score_bands = pd.DataFrame(
+                counts,
+                index=pd.Index([f'{start:g}-{start + band_width:g}' for start in starts], name='分数段'),
+                columns=majors
+            ).iloc[::-1]
     
-    return data
+    return {'preferences': preferences, 'crosstab': crosstab, 'score_bands': score_bands}
+
+def preference_stats(preferences):
+    """analyze() 的 preferences 表 -> {专业: {'first', 'second', 'third'}}，不含无人选择的专业"""
+    return {
+        major: dict(zip(RANK_KEYS, map(int, counts)))
+        for major, counts in zip(preferences.index, preferences.to_numpy()[:, :len(RANK_KEYS)])
+        if counts.any()
+    }
 
 def process_data(data):
     """处理数据，统计每个专业的选择情况"""
-    major_stats = defaultdict(lambda: {'first': 0, 'second': 0, 'third': 0})
-    
-    for student in data:
-        # 统计第一志愿
-        major_stats[student['第一志愿']]['first'] += 1
-        # 统计第二志愿
-        major_stats[student['第二志愿']]['second'] += 1
-        # 统计第三志愿
-        major_stats[student['第三志愿']]['third'] += 1
-    
-    return major_stats
+    return preference_stats(analyze(data)['preferences'])
 
-def write_results(stats, output_file):
-    """将统计结果写入新的Excel文件"""
-    wb = xlwt.Workbook()
+def _write_frame(ws, frame):
+    """表头为索引名与各列名"""
+    headers = [frame.index.name] + [str(column) for column in frame.columns]
+    for i, header in enumerate(headers):
+        ws.write(0, i, header)
+    for row, (label, counts) in enumerate(zip(frame.index, frame.to_numpy().tolist()), 1):
+        ws.write(row, 0, label)
+        for column, count in enumerate(counts, 1):
+            ws.write(row, column, count)
+
+def write_results(stats, output_file, crosstab=None, score_bands=None):
+    """将统计结果写入新的Excel文件；交叉表和分数段分布另起工作表"""
+    wb = xlwt.Workbook(encoding='utf-8')
     ws = wb.add_sheet('专业统计')
     
     # 写入表头
@@ -51,22 +165,28 @@ def write_results(stats, output_file):
         ws.write(row, 3, counts['third'])
         ws.write(row, 4, total)
     
+    if crosstab is not None:
+        _write_frame(wb.add_sheet('志愿×录取专业'), crosstab)
+    if score_bands is not None:
+        _write_frame(wb.add_sheet('分数段第一志愿'), score_bands)
+    
     wb.save(output_file)
 
 def main():
-    input_file = 'data/example_students.xls'
-    output_file = 'data/major_statistics.xls'
+    input_file = sys.argv[1] if len(sys.argv) > 1 else 'data/example_students.xls'
+    output_file = sys.argv[2] if len(sys.argv) > 2 else 'data/major_statistics.xls'
     
     # 读取数据
     data = read_excel(input_file)
     
-    # 处理数据
-    stats = process_data(data)
+    # 统计
+    analysis = analyze(data)
+    stats = preference_stats(analysis['preferences'])
     
     # 写入结果
-    write_results(stats, output_file)
+    write_results(stats, output_file, analysis['crosstab'], analysis['score_bands'])
     
     print(f"处理完成！结果已保存到 {output_file}")
 
 if __name__ == '__main__':
-    main() 
\ No newline at end of file
+    main()
@@ -0,0 +1,37 @@
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+import pytest
+
+# 测试直接导入 src 下的模块
+SRC_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'src')
+if SRC_DIR not in sys.path:
+    sys.path.insert(0, SRC_DIR)
+
+from core.preferences import MAJORS, PREFERENCE_MAPPING
+
+TESTS_DIR = os.path.dirname(os.path.abspath(__file__))
+SAMPLE_FILE = os.path.join(TESTS_DIR, 'test_sample.csv')
+
+
+def make_cohort(rng, n):
+    """随机生成一届学生：排名、分数都有大量重复，用于检查同分处理"""
+    return pd.DataFrame({
+        '学号': [f'S{i:05d}' for i in rng.permutation(n)],
+        '排名': rng.integers(1, max(n // 3, 2), n),
+        '分数': np.round(rng.uniform(60, 70, n), 0),
+        '志愿选择': rng.choice(list(PREFERENCE_MAPPING), n)
+    })
+
+
+def make_quotas(rng, n):
+    return {major: int(rng.integers(0, max(n // 3, 1) + 1)) for major in MAJORS}
+
+
+@pytest.fixture
+def rng(request):
+    # 每个参数化用例一个固定种子，失败时可复现
+    seed = getattr(request, 'param', 0)
+    return np.random.default_rng(seed)
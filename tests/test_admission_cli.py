@@ -0,0 +1,24 @@
+"""命令行：名额中的专业检查"""
+import admission_cli
+from conftest import SAMPLE_FILE
+
+
+def test_unknown_major_exits_with_2(tmp_path):
+    output = str(tmp_path / 'result.csv')
+    assert admission_cli.main([SAMPLE_FILE, '-o', output, '-q', '电子信息=5', '--no-cache']) == 2
+    assert not (tmp_path / 'result.csv').exists()
+
+
+def test_unspecified_majors_get_zero_quota(tmp_path):
+    stats = admission_cli.run(SAMPLE_FILE, str(tmp_path / 'result.csv'), {'电子信息工程': 5})
+    assert list(stats['majors']) == ['电子信息工程', '通信工程', '电磁场与无线技术']
+    assert stats['majors']['通信工程']['quota'] == 0
+    assert stats['majors']['通信工程']['total'] == 0
+    assert stats['majors']['电子信息工程']['total'] == 5
+
+
+def test_majors_from_preference_lists_are_known(tmp_path):
+    input_file = tmp_path / 'students.csv'
+    input_file.write_text('学号,姓名,分数,志愿选择\n1,a,90,人工智能—通信工程\n2,b,80,A\n', encoding='utf-8')
+    stats = admission_cli.run(str(input_file), str(tmp_path / 'result.csv'), {'人工智能': 1})
+    assert stats['majors']['人工智能']['normal'] == 1
@@ -0,0 +1,93 @@
+"""向量化录取、逐行录取、延迟接受三种实现的结果一致性"""
+import pandas as pd
+import pytest
+
+from admission_algorithm import AdmissionAlgorithm
+from conftest import SAMPLE_FILE, make_cohort, make_quotas
+from core.preferences import MAJORS
+from deferred_acceptance import DeferredAcceptance
+
+SEEDS = range(100)
+
+
+def outcome(results):
+    return list(zip(results['学号'], results['录取专业']))
+
+
+@pytest.mark.parametrize('rng', SEEDS, indirect=True)
+def test_vectorized_matches_loop(rng):
+    n = int(rng.integers(1, 120))
+    students = make_cohort(rng, n)
+    quotas = make_quotas(rng, n)
+    
+    vectorized = AdmissionAlgorithm(quotas)
+    loop = AdmissionAlgorithm(quotas)
+    assert outcome(vectorized.process_admissions(students)) == outcome(loop.process_admissions(students, engine='loop'))
+    assert vectorized.get_remaining_quotas() == loop.get_remaining_quotas()
+
+
+@pytest.mark.parametrize('rng', SEEDS, indirect=True)
+def test_vectorized_matches_loop_with_preference_lists(rng):
+    n = int(rng.integers(1, 80))
+    students = make_cohort(rng, n).drop(columns='志愿选择')
+    lengths = rng.integers(1, len(MAJORS) + 1, n)
+    students['志愿列表'] = [list(rng.permutation(MAJORS)[:length]) for length in lengths]
+    quotas = make_quotas(rng, n)
+    
+    vectorized = AdmissionAlgorithm(quotas).process_admissions(students)
+    loop = AdmissionAlgorithm(quotas).process_admissions(students, engine='loop')
+    assert outcome(vectorized) == outcome(loop)
+
+
+def test_vectorized_matches_loop_on_sample():
+    students = pd.read_csv(SAMPLE_FILE)
+    students['排名'] = students['序号']
+    quotas = {'电子信息工程': 5, '通信工程': 5, '电磁场与无线技术': 3}
+    vectorized = AdmissionAlgorithm(quotas).process_admissions(students)
+    loop = AdmissionAlgorithm(quotas).process_admissions(students, engine='loop')
+    assert outcome(vectorized) == outcome(loop)
+
+
+@pytest.mark.parametrize('rng', SEEDS, indirect=True)
+def test_deferred_acceptance_matches_serial(rng):
+    # 所有专业都用统一排名时，稳定匹配就是按排名依次录取
+    n = int(rng.integers(1, 120))
+    students = make_cohort(rng, n)
+    quotas = make_quotas(rng, n)
+    
+    serial = AdmissionAlgorithm(quotas)
+    matching = DeferredAcceptance(quotas)
+    assert outcome(matching.process_admissions(students)) == outcome(serial.process_admissions(students))
+    assert matching.get_remaining_quotas() == serial.get_remaining_quotas()
+
+
+@pytest.mark.parametrize('rng', range(30), indirect=True)
+def test_deferred_acceptance_is_stable(rng):
+    # 有专业按自己的分数排序时，不存在学生与专业都更愿意互选的一对
+    n = int(rng.integers(2, 60))
+    students = make_cohort(rng, n)
+    students['数学'] = rng.integers(0, 10, n)
+    quotas = make_quotas(rng, n)
+    
+    results = DeferredAcceptance(quotas, priorities={MAJORS[0]: '-数学'}).process_admissions(students)
+    mapping = AdmissionAlgorithm.MAJOR_MAPPING
+    position = {student_id: i for i, student_id in enumerate(results['学号'])}
+    holders = {major: [] for major in MAJORS}
+    for _, student in results.iterrows():
+        if student['录取专业'] in holders:
+            holders[student['录取专业']].append(student)
+    
+    def better(major, a, b):
+        # 专业 major 是否更愿意录取 a 而不是 b
+        if major == MAJORS[0] and a['数学'] != b['数学']:
+            return a['数学'] > b['数学']
+        return position[a['学号']] < position[b['学号']]
+    
+    for _, student in results.iterrows():
+        preferences = mapping[student['志愿选择']]
+        current = student['录取专业']
+        wanted = preferences[:preferences.index(current)] if current in preferences else preferences
+        for major in wanted:
+            admitted = holders[major]
+            assert len(admitted) == quotas[major]
+            assert not any(better(major, student, other) for other in admitted)
@@ -0,0 +1,64 @@
+"""解析结果缓存：读回、源文件改动后失效、按使用时间淘汰"""
+import os
+
+import pandas as pd
+
+from core.cache import CohortCache
+from core.importer import read_students
+from core.store import StudentStore
+
+CONTENT = '学号,姓名,分数,志愿选择\n1,甲,90,A\n2,乙,85,B\n3,丙,80,C\n'
+
+
+def write_students(path, content=CONTENT):
+    path.write_text(content, encoding='utf-8')
+    return str(path)
+
+
+def test_round_trip(tmp_path):
+    input_file = write_students(tmp_path / 'students.csv')
+    cache = CohortCache(str(tmp_path / 'cache'))
+    parsed = StudentStore()
+    assert not read_students(input_file, parsed, cache)
+    
+    cached = StudentStore()
+    assert cache.load_students(cache.key(input_file), cached)
+    pd.testing.assert_frame_equal(cached.to_frame(), parsed.to_frame())
+
+
+def test_editing_source_invalidates_entry(tmp_path):
+    input_file = write_students(tmp_path / 'students.csv')
+    cache = CohortCache(str(tmp_path / 'cache'))
+    read_students(input_file, StudentStore(), cache)
+    stat = os.stat(input_file)
+    
+    # 大小不变的改动靠修改时间发现，重新计算哈希
+    write_students(tmp_path / 'students.csv', CONTENT.replace('90', '95'))
+    os.utime(input_file, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+    key = cache.key(input_file)
+    assert not cache.load_students(key, StudentStore())
+    
+    students = StudentStore()
+    read_students(input_file, students, cache)
+    assert students.scores_array().tolist() == [95.0, 85.0, 80.0]
+    assert cache.load_students(key, StudentStore())
+
+
+def test_least_recently_used_entry_is_evicted(tmp_path):
+    first = write_students(tmp_path / 'first.csv')
+    second = write_students(tmp_path / 'second.csv', CONTENT + '4,丁,75,D\n')
+    cache = CohortCache(str(tmp_path / 'cache'))
+    read_students(first, StudentStore(), cache)
+    entry_bytes = sum(entry['bytes'] for entry in cache._index['entries'].values())
+    
+    # 上限只够放一份缓存，写入第二份时淘汰较早的一份
+    cache.max_bytes = entry_bytes + 100
+    read_students(second, StudentStore(), cache)
+    assert not cache.load_students(cache.key(first), StudentStore())
+    assert cache.load_students(cache.key(second), StudentStore())
+    assert len(cache._index['entries']) == 1
+    
+    # 淘汰结果写入索引，重新打开缓存后一致
+    reopened = CohortCache(cache.directory)
+    assert list(reopened._index['entries']) == list(cache._index['entries'])
+    assert sorted(os.listdir(cache.directory)) == sorted(['index.json'] + list(cache._index['entries']))
@@ -0,0 +1,56 @@
+"""列存结果文件：写出后读回，拒绝截断或其它格式的文件"""
+import numpy as np
+import pytest
+
+from core.allocation import UNASSIGNED_CODE
+from core.columnar import ColumnarFile
+from core.exporter import write_results
+from core.importer import load_columnar
+from core.run_diff import ResultSet
+from core.store import StudentStore
+
+
+def make_students():
+    students = StudentStore()
+    students.append_columns(
+        np.arange(1, 5), ['S1', 'S2', 'S3', 'S4'], ['甲', '乙', '丙', '丁'],
+        np.array([90.0, 85.5, 80.0, 75.0]), np.array([0, 1, 2, 0]), list('ABCDEF')
+    )
+    students.set_results([0, 1, UNASSIGNED_CODE, 2], [False, True, False, True])
+    return students
+
+
+def test_round_trip_keeps_results_and_adjusted_flags(tmp_path):
+    students = make_students()
+    file_name = str(tmp_path / 'result.adm')
+    write_results(file_name, students)
+    
+    loaded = StudentStore()
+    load_columnar(file_name, loaded)
+    with ColumnarFile(file_name) as columns:
+        assert columns.meta['majors'] == students.majors
+        loaded.set_result_codes(columns.array('录取专业'))
+    assert loaded.columns() == students.columns()
+    assert loaded.adjusted_array().tolist() == [False, True, False, True]
+    assert [loaded.result_label(i) for i in range(4)] == ['电子信息工程', '通信工程(调剂)', '未分配', '电磁场与无线技术(调剂)']
+    
+    results = ResultSet.read(file_name)
+    assert results.student_ids == students.student_ids
+    assert [results.labels[code] for code in results.codes] == [students.result_label(i) for i in range(4)]
+
+
+@pytest.mark.parametrize('size', [0, 8, 40, -1])
+def test_truncated_file_is_rejected(tmp_path, size):
+    file_name = tmp_path / 'result.adm'
+    write_results(str(file_name), make_students())
+    content = file_name.read_bytes()
+    file_name.write_bytes(content[:size])
+    with pytest.raises(ValueError):
+        ColumnarFile(str(file_name))
+
+
+def test_foreign_file_is_rejected(tmp_path):
+    file_name = tmp_path / 'result.adm'
+    file_name.write_text('学号,姓名,录取专业\nS1,甲,通信工程\n', encoding='utf-8')
+    with pytest.raises(ValueError, match='不是列存结果文件'):
+        ColumnarFile(str(file_name))
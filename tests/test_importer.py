@@ -0,0 +1,56 @@
+"""按批读取：校验报告中的行号跨批次仍与表格一致"""
+import pytest
+
+from core.importer import iter_student_batches
+from core.validation import StudentValidator
+
+HEADERS = ['学号', '姓名', '分数', '志愿选择']
+ROWS = [
+    ['1', '甲', '90', 'A'],
+    ['2', '乙', '', 'B'],
+    [],
+    ['4', '', '80', 'C'],
+    ['5', '戊', '75', 'Z'],
+    ['1', '己', '70', 'A'],
+    ['7', '庚', 'x', 'B']
+]
+EXPECTED = [
+    (3, '分数', '缺少分数'),
+    (5, '姓名', '缺少姓名'),
+    (6, '志愿选择', '无法识别的志愿，参加调剂'),
+    (7, '学号', '学号重复'),
+    (8, '分数', '分数不是数字')
+]
+
+
+def write_csv(path):
+    lines = [','.join(HEADERS)] + [','.join(row) for row in ROWS]
+    path.write_text('\n'.join(lines) + '\n', encoding='utf-8')
+
+
+def write_xlsx(path):
+    from openpyxl import Workbook
+    
+    wb = Workbook()
+    ws = wb.active
+    for row_number, row in enumerate([HEADERS] + ROWS, 1):
+        for column, value in enumerate(row, 1):
+            ws.cell(row_number, column, int(value) if value.isdigit() else value or None)
+    wb.save(path)
+
+
+@pytest.mark.parametrize('extension, write', [('csv', write_csv), ('xlsx', write_xlsx)])
+@pytest.mark.parametrize('batch_size', [1, 2, 3, 100])
+def test_rows_are_numbered_across_batches(tmp_path, extension, write, batch_size):
+    input_file = tmp_path / f'students.{extension}'
+    write(input_file)
+    validator = StudentValidator()
+    batches = list(iter_student_batches(str(input_file), batch_size, validator))
+    
+    assert [student_id for batch in batches for student_id in batch.columns['学号']] == ['1', '4', '5', '1']
+    assert all(len(batch) <= batch_size for batch in batches)
+    issues = validator.report.sorted_issues()
+    assert [(row, column, problem) for row, column, _, problem, _ in issues] == EXPECTED
+    assert issues[3][2] == '1（同第 2 行）'
+    # 序号列省略时按数据行的顺序排列，空行和未导入的行也占序号
+    assert [rank for batch in batches for rank in batch.columns['序号']] == [1, 4, 5, 6]
@@ -0,0 +1,97 @@
+"""增量录取与整批重新录取的结果一致性"""
+import numpy as np
+import pandas as pd
+import pytest
+
+from admission_algorithm import AdmissionAlgorithm
+from conftest import make_cohort, make_quotas
+from core.preferences import MAJORS
+from incremental_admission import IncrementalAdmission
+
+SEEDS = range(100)
+
+
+def full_rerun(students, quotas):
+    algorithm = AdmissionAlgorithm(quotas)
+    results = algorithm.process_admissions(students)
+    return list(zip(results['学号'], results['录取专业'])), algorithm.get_remaining_quotas()
+
+
+def incremental_state(incremental):
+    results = incremental.results()
+    return list(zip(results['学号'], results['录取专业'])), incremental.get_remaining_quotas()
+
+
+def new_student(rng, students, student_id):
+    return {
+        '学号': student_id,
+        # 取已有的排名、分数，保证与别人同分
+        '排名': int(rng.choice(students['排名'])),
+        '分数': float(rng.choice(students['分数'])),
+        '志愿选择': str(rng.choice(list(AdmissionAlgorithm.MAJOR_MAPPING)))
+    }
+
+
+@pytest.mark.parametrize('rng', SEEDS, indirect=True)
+def test_set_quota_matches_full_rerun(rng):
+    n = int(rng.integers(1, 150))
+    students = make_cohort(rng, n)
+    quotas = make_quotas(rng, n)
+    incremental = IncrementalAdmission(students, quotas, checkpoint_interval=int(rng.integers(1, 20)))
+    
+    for _ in range(5):
+        major = str(rng.choice(MAJORS))
+        quotas[major] = int(rng.integers(0, n + 1))
+        incremental.set_quota(major, quotas[major])
+        assert incremental_state(incremental) == full_rerun(students, quotas)
+
+
+@pytest.mark.parametrize('rng', SEEDS, indirect=True)
+def test_add_student_matches_full_rerun(rng):
+    n = int(rng.integers(1, 150))
+    students = make_cohort(rng, n)
+    quotas = make_quotas(rng, n)
+    incremental = IncrementalAdmission(students, quotas, checkpoint_interval=int(rng.integers(1, 20)))
+    
+    for index in range(5):
+        student = new_student(rng, students, f'N{index:03d}')
+        incremental.add_student(student)
+        students = pd.concat([students, pd.DataFrame([student])], ignore_index=True)
+        assert incremental_state(incremental) == full_rerun(students, quotas)
+
+
+@pytest.mark.parametrize('rng', SEEDS, indirect=True)
+def test_remove_student_matches_full_rerun(rng):
+    n = int(rng.integers(5, 150))
+    students = make_cohort(rng, n)
+    quotas = make_quotas(rng, n)
+    incremental = IncrementalAdmission(students, quotas, checkpoint_interval=int(rng.integers(1, 20)))
+    
+    for student_id in rng.choice(students['学号'], 3, replace=False):
+        incremental.remove_student(student_id)
+        students = students[students['学号'] != student_id]
+        assert incremental_state(incremental) == full_rerun(students, quotas)
+
+
+@pytest.mark.parametrize('rng', SEEDS, indirect=True)
+def test_update_rank_matches_full_rerun(rng):
+    n = int(rng.integers(5, 150))
+    students = make_cohort(rng, n)
+    quotas = make_quotas(rng, n)
+    incremental = IncrementalAdmission(students, quotas, checkpoint_interval=int(rng.integers(1, 20)))
+    
+    for student_id in rng.choice(students['学号'], 3, replace=False):
+        rank = int(rng.choice(students['排名']))
+        incremental.update_rank(student_id, rank)
+        students = students.copy()
+        students.loc[students['学号'] == student_id, '排名'] = rank
+        assert incremental_state(incremental) == full_rerun(students, quotas)
+
+
+def test_float_rank_is_stored_with_column_dtype():
+    students = make_cohort(np.random.default_rng(1), 20)
+    incremental = IncrementalAdmission(students, {major: 5 for major in MAJORS})
+    incremental.add_student({'学号': 'N001', '排名': 3.0, '分数': 65.0, '志愿选择': 'A'})
+    incremental.update_rank('N001', 4.0)
+    incremental.remove_student('N001')
+    assert 'N001' not in set(incremental.results()['学号'])
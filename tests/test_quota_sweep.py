@@ -0,0 +1,54 @@
+"""名额推演：无效志愿与统计列"""
+import pandas as pd
+
+from admission_algorithm import AdmissionAlgorithm
+from conftest import SAMPLE_FILE
+from core.exporter import write_results
+from core.importer import read_students
+from core.store import StudentStore
+from quota_sweep import QuotaSweep, main
+
+
+def make_students():
+    return pd.DataFrame({
+        '学号': ['1', '2', '3', '4'],
+        '排名': [1, 2, 3, 4],
+        '分数': [90.0, 85.0, 80.0, 75.0],
+        '志愿选择': ['A', '', 'E', 'Z']
+    })
+
+
+def test_blank_and_unknown_preferences_are_never_admitted():
+    sweep = QuotaSweep(make_students())
+    assert sweep.invalid == 2
+    
+    row = sweep.evaluate({'电子信息工程': 4, '通信工程': 4, '电磁场与无线技术': 4})
+    assert row['未分配人数'] == 2
+    assert row['非第一志愿人数'] == 0
+    assert '调剂人数' not in row
+
+
+def test_matches_admission_algorithm_on_valid_students():
+    students = make_students()
+    quotas = {'电子信息工程': 1, '通信工程': 0, '电磁场与无线技术': 1}
+    row = QuotaSweep(students).evaluate(quotas)
+    
+    results = AdmissionAlgorithm(quotas).process_admissions(students.iloc[[0, 2]])
+    assert results['录取专业'].tolist() == ['电子信息工程', '电磁场与无线技术']
+    assert row['电磁场与无线技术最低排名'] == 3
+    assert row['非第一志愿人数'] == 1
+
+
+def test_columnar_input_matches_spreadsheet(tmp_path):
+    """列存文件直接映射读取，推演结果与原表格相同"""
+    students = StudentStore()
+    read_students(SAMPLE_FILE, students)
+    columnar_file = str(tmp_path / 'students.adm')
+    write_results(columnar_file, students)
+    
+    outputs = []
+    for input_file in (SAMPLE_FILE, columnar_file):
+        output = str(tmp_path / f"sweep_{len(outputs)}.csv")
+        assert main([input_file, '-o', output, '-r', '电子信息工程=20:40:10', '-j', '1']) == 0
+        outputs.append(pd.read_csv(output))
+    pd.testing.assert_frame_equal(outputs[0], outputs[1])
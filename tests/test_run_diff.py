@@ -0,0 +1,82 @@
+"""两次录取结果的对比"""
+import pytest
+
+from core.run_diff import CHANGE_KINDS, ResultSet, diff_runs
+
+MAJORS = ['电子信息工程', '通信工程']
+
+
+def result_set(results):
+    """[(学号, 录取专业文字)] -> ResultSet"""
+    return ResultSet.from_rows(
+        ['学号', '姓名', '录取专业'],
+        [(student_id, f'名{student_id}', label) for student_id, label in results]
+    )
+
+
+OLD = [
+    ('1', '电子信息工程'),         # 未分配：新未分配
+    ('2', '通信工程'),             # 改为调剂到电子信息工程：新调剂
+    ('3', '未分配'),               # 新录取
+    ('4', '电子信息工程'),         # 改录通信工程
+    ('5', '通信工程(调剂)'),       # 同专业不再调剂
+    ('6', '通信工程'),             # 已移除
+    ('7', '电子信息工程'),         # 不变
+    ('8', '通信工程'),             # 同专业改为调剂：新调剂
+]
+NEW = [
+    ('1', '未分配'),
+    ('2', '电子信息工程(调剂)'),
+    ('3', '通信工程'),
+    ('4', '通信工程'),
+    ('5', '通信工程'),
+    ('7', '电子信息工程'),
+    ('8', '通信工程(调剂)'),
+    ('9', '电子信息工程'),         # 只在新结果中：新录取
+]
+
+
+@pytest.fixture
+def diff():
+    return diff_runs(result_set(OLD), result_set(NEW), MAJORS)
+
+
+def test_each_change_kind(diff):
+    kinds = {student_id: kind for student_id, _, _, _, kind in diff.changes}
+    assert kinds == {
+        '1': 'unassigned', '2': 'adjusted', '3': 'admitted', '4': 'moved',
+        '5': 'unadjusted', '6': 'removed', '8': 'adjusted', '9': 'admitted'
+    }
+    assert set(diff.kinds) == set(CHANGE_KINDS)
+    assert diff.kinds == {
+        'unassigned': 1, 'adjusted': 2, 'admitted': 2, 'moved': 1, 'unadjusted': 1, 'removed': 1
+    }
+
+
+def test_change_rows_show_both_results(diff):
+    rows = {change[0]: change for change in diff.changes}
+    assert rows['2'] == ('2', '名2', '通信工程', '电子信息工程(调剂)', 'adjusted')
+    assert rows['6'] == ('6', '名6', '通信工程', '', 'removed')
+    assert rows['9'] == ('9', '名9', '', '电子信息工程', 'admitted')
+
+
+def test_flows_count_only_major_changes(diff):
+    # 5、8 只在通信工程内改变调剂状态，不算转入转出
+    assert diff.flows['电子信息工程'] == {'before': 3, 'after': 3, 'in': 2, 'out': 2, 'net': 0}
+    assert diff.flows['通信工程'] == {'before': 4, 'after': 4, 'in': 2, 'out': 2, 'net': 0}
+    for flow in diff.flows.values():
+        assert flow['after'] - flow['before'] == flow['net']
+
+
+def test_same_students_in_same_order_uses_fast_path():
+    old = result_set([('1', '通信工程(调剂)'), ('2', '电子信息工程')])
+    new = result_set([('1', '通信工程'), ('2', '电子信息工程')])
+    diff = diff_runs(old, new, MAJORS)
+    assert [change[4] for change in diff.changes] == ['unadjusted']
+    assert diff.flows['通信工程']['in'] == diff.flows['通信工程']['out'] == 0
+
+
+def test_duplicate_student_ids_are_rejected():
+    old = result_set([('1', '通信工程'), ('1', '电子信息工程')])
+    with pytest.raises(ValueError):
+        diff_runs(old, result_set([('2', '通信工程')]), MAJORS)
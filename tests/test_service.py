@@ -0,0 +1,92 @@
+"""录取服务：录取结果的版本、只监听回环地址、快照"""
+import asyncio
+import os
+import threading
+
+import pytest
+
+from conftest import SAMPLE_FILE
+import admission_service
+from core.columnar import ColumnarFile
+from core.service import AdmissionService, ServiceError, is_loopback
+from core.service_client import ServiceClient
+
+QUOTAS = {'电子信息工程': 5, '通信工程': 4, '电磁场与无线技术': 3}
+
+
+@pytest.fixture
+def service(tmp_path):
+    # 服务在后台线程的事件循环中运行，测试用同步的 ServiceClient 访问
+    service = AdmissionService(snapshot_dir=str(tmp_path / 'snapshots'))
+    loop = asyncio.new_event_loop()
+    server = loop.run_until_complete(service.start('127.0.0.1', 0))
+    thread = threading.Thread(target=loop.run_forever, daemon=True)
+    thread.start()
+    port = server.sockets[0].getsockname()[1]
+    yield service, loop, ServiceClient(f'http://127.0.0.1:{port}')
+    loop.call_soon_threadsafe(loop.stop)
+    thread.join()
+    server.close()
+    loop.run_until_complete(server.wait_closed())
+    loop.close()
+
+
+def test_allocate_returns_results_with_version(service):
+    """录取返回统计信息、结果版本和本次的录取专业编码"""
+    _, _, client = service
+    cohort = client.load(SAMPLE_FILE)
+    first = client.allocate(cohort['id'], QUOTAS)
+    second = client.allocate(cohort['id'], dict(QUOTAS, 电子信息工程=0))
+    assert second['results_version'] == first['results_version'] + 1
+    assert first['majors']['电子信息工程']['total'] == QUOTAS['电子信息工程']
+    assert second['majors']['电子信息工程']['total'] == 0
+    assert len(first['codes']) == first['total'] == cohort['rows']
+    assert (client.result_codes(cohort['id'], second['results_version']) == second['codes']).all()
+    assert not (first['codes'] == second['codes']).all()
+
+
+def test_stale_version_is_rejected(service, tmp_path):
+    """结果已被别人重新录取时，按旧版本取结果或导出返回 409"""
+    _, _, client = service
+    cohort = client.load(SAMPLE_FILE)
+    version = client.allocate(cohort['id'], QUOTAS)['results_version']
+    client.allocate(cohort['id'], dict(QUOTAS, 通信工程=0))
+    
+    output = tmp_path / 'result.csv'
+    for request in (
+        lambda: client.result_codes(cohort['id'], version),
+        lambda: client.export(cohort['id'], str(output), version)
+    ):
+        with pytest.raises(ServiceError) as error:
+            request()
+        assert error.value.status == 409
+    assert not output.exists()
+
+
+def test_only_loopback_addresses_are_served(service):
+    service, loop, _ = service
+    assert is_loopback('127.0.0.1') and is_loopback('::1') and is_loopback('localhost')
+    assert not is_loopback('0.0.0.0') and not is_loopback('192.168.1.1')
+    with pytest.raises(ValueError):
+        asyncio.run_coroutine_threadsafe(service.start('0.0.0.0', 0), loop).result()
+    with pytest.raises(SystemExit):
+        admission_service.build_parser().parse_args(['--host', '0.0.0.0'])
+
+
+def test_snapshot_does_not_rewrite_mapped_file(service):
+    """重新快照时替换文件，已映射的旧快照仍可读取"""
+    service, _, client = service
+    cohort = client.load(SAMPLE_FILE)
+    client.allocate(cohort['id'], QUOTAS)
+    first = client.snapshot(cohort['id'])
+    
+    with ColumnarFile(first) as old:
+        before = old.array('录取专业').copy()
+        client.allocate(cohort['id'], dict(QUOTAS, 电子信息工程=0))
+        second = client.snapshot(cohort['id'])
+        assert second == first
+        assert (old.array('录取专业') == before).all()
+    
+    with ColumnarFile(second) as new:
+        assert not (new.array('录取专业') == before).all()
+    assert os.listdir(service.snapshot_dir) == [os.path.basename(second)]
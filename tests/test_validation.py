@@ -0,0 +1,63 @@
+"""数据校验：问题行的行号与说明"""
+from core.importer import read_students
+from core.store import StudentStore
+from core.validation import IMPORTED, SKIPPED, StudentValidator
+
+HEADERS = ['学号', '姓名', '排名', '成绩', '选课选项']
+ROWS = [
+    ['1', '甲', '1', '90', 'A'],
+    ['2', '乙', '2', '85', ''],
+    ['3', '丙', 'x', '80', 'z'],
+    ['1', '丁', '4', '75', 'B'],
+    ['5', '戊', '5', 'abc', 'C']
+]
+
+
+def validate(rows, first_row=2):
+    validator = StudentValidator()
+    validator.map_columns(HEADERS)
+    return validator, validator.validate(rows, first_row)
+
+
+def test_reports_each_problem_with_its_row():
+    validator, batch = validate(ROWS)
+    assert validator.report.sorted_issues() == [
+        (3, '志愿选择', '', '缺少志愿，参加调剂', IMPORTED),
+        (4, '序号', 'x', '序号不是整数，按行号处理', IMPORTED),
+        (4, '志愿选择', 'z', '无法识别的志愿，参加调剂', IMPORTED),
+        (5, '学号', '1（同第 2 行）', '学号重复', IMPORTED),
+        (6, '分数', 'abc', '分数不是数字', SKIPPED)
+    ]
+    assert validator.report.rows == 5
+    assert validator.report.skipped == 1
+    
+    # 有问题但可导入的行照常导入，无效的排名按数据行的顺序代替
+    assert batch.columns['学号'] == ['1', '2', '3', '1']
+    assert batch.columns['序号'] == [1, 2, 3, 4]
+    assert batch.columns['志愿选择'] == ['A', '', 'Z', 'B']
+
+
+def test_duplicates_are_found_across_batches():
+    validator = StudentValidator()
+    validator.map_columns(HEADERS)
+    validator.validate(ROWS[:1], 2)
+    validator.validate(ROWS[3:4], 10)
+    assert validator.report.issues == [(10, '学号', '1（同第 2 行）', '学号重复', IMPORTED)]
+
+
+def test_read_students_reports_file_rows(tmp_path):
+    input_file = tmp_path / 'students.csv'
+    lines = [','.join(HEADERS)] + [','.join(row) for row in ROWS]
+    input_file.write_text('\n'.join(lines) + '\n', encoding='utf-8')
+    
+    students = StudentStore()
+    report = read_students(str(input_file), students)
+    assert len(students) == 4
+    assert [(row, column, problem) for row, column, _, problem, _ in report.sorted_issues()] == [
+        (3, '志愿选择', '缺少志愿，参加调剂'),
+        (4, '序号', '序号不是整数，按行号处理'),
+        (4, '志愿选择', '无法识别的志愿，参加调剂'),
+        (5, '学号', '学号重复'),
+        (6, '分数', '分数不是数字')
+    ]
+    assert '第 3 行 志愿选择：缺少志愿，参加调剂（空）' in report.format()